@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Repository Retrieval Index
+========================================
+Persistent BM25 index over line chunks of the repository's src/, api/ and
+docs/ trees, so a task can be given the code that best matches its
+description instead of whole files cut off at 50,000 characters.
+
+The index is an inverted index (term -> chunk, term frequency) in a SQLite
+database in WAL mode. refresh() compares every indexed file's (size, mtime)
+with disk and re-chunks only files that changed, so keeping it current costs
+one directory walk; queries read only the postings of the query's terms.
+
+Usage:
+    from context_index import ContextIndex
+
+    index = ContextIndex(project_dir, "ai_team_output/cache/context_index.sqlite3")
+    for chunk in index.query("chat message history endpoint", max_tokens=6000):
+        print(chunk.path, chunk.start_line, chunk.end_line, chunk.score)
+"""
+
+import os
+import re
+import math
+import time
+import sqlite3
+import threading
+from contextlib import closing
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+ROOTS = ("src", "api", "docs")
+EXTENSIONS = {".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".py", ".md", ".mdx", ".sql"}
+SKIP_DIRS = {"node_modules", ".git", "dist", "build", ".next", ".vercel", "coverage", "__pycache__"}
+MAX_FILE_BYTES = 1024 * 1024   # Bigger files are generated or data, not useful context
+CHUNK_LINES = 40
+REFRESH_INTERVAL = 30.0        # Seconds between directory walks within one process
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "if", "in", "into",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "with", "should", "will",
+    "const", "let", "var", "return", "import", "export", "default", "function", "new",
+    "true", "false", "null", "undefined", "async", "await", "type", "interface",
+}
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_WORD_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Lowercased terms; identifiers also yield their camelCase / snake_case parts"""
+    for word in _WORD.findall(text):
+        lower = word.lower()
+        if len(lower) > 1 and lower not in STOPWORDS:
+            yield lower
+        parts = _WORD_PART.findall(word)
+        if len(parts) > 1:
+            for part in parts:
+                part = part.lower()
+                if len(part) > 1 and part not in STOPWORDS:
+                    yield part
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+@dataclass
+class Chunk:
+    """A retrieved slice of a file (lines are 1-based, inclusive)"""
+    path: str
+    start_line: int
+    end_line: int
+    text: str
+    score: float = 0.0
+
+
+class ContextIndex:
+    """SQLite-backed BM25 index over line chunks of the repository"""
+
+    def __init__(self, project_dir: str, path: str, roots: Iterable[str] = ROOTS,
+                 chunk_lines: int = CHUNK_LINES):
+        self.project_dir = project_dir
+        self.path = path
+        self.roots = tuple(roots)
+        self.chunk_lines = chunk_lines
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    start_line INTEGER NOT NULL,
+                    end_line INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chunks_path ON chunks(path);
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    chunk_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, chunk_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings(chunk_id);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Indexable files under the roots: relative path -> (size, mtime_ns)"""
+        found = {}
+        for root in self.roots:
+            top = os.path.join(self.project_dir, root)
+            for dirpath, dirnames, filenames in os.walk(top):
+                dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+                for name in filenames:
+                    if os.path.splitext(name)[1].lower() not in EXTENSIONS:
+                        continue
+                    full_path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(full_path)
+                    except OSError:
+                        continue
+                    if st.st_size <= MAX_FILE_BYTES:
+                        rel = os.path.relpath(full_path, self.project_dir).replace(os.sep, "/")
+                        found[rel] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def _chunk_file(self, rel_path: str) -> List[Tuple[int, int, str]]:
+        """Split a file into (start_line, end_line, text) windows of chunk_lines lines"""
+        with open(os.path.join(self.project_dir, rel_path), "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        chunks = []
+        for start in range(0, len(lines), self.chunk_lines):
+            text = "\n".join(lines[start:start + self.chunk_lines])
+            if text.strip():
+                chunks.append((start + 1, min(len(lines), start + self.chunk_lines), text))
+        return chunks
+
+    def _remove(self, conn: sqlite3.Connection, rel_path: str):
+        conn.execute(
+            "DELETE FROM postings WHERE chunk_id IN (SELECT id FROM chunks WHERE path = ?)", (rel_path,)
+        )
+        conn.execute("DELETE FROM chunks WHERE path = ?", (rel_path,))
+        conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+
+    def refresh(self, force: bool = False) -> Tuple[int, int]:
+        """
+        Bring the index up to date with disk, re-indexing only changed files.
+        Returns (files re-indexed, files removed). Skipped if the last refresh
+        in this process was under REFRESH_INTERVAL seconds ago.
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < REFRESH_INTERVAL:
+                return 0, 0
+            on_disk = self._scan()
+            with closing(self._connect()) as conn:
+                indexed = {path: (size, mtime) for path, size, mtime
+                           in conn.execute("SELECT path, size, mtime_ns FROM files")}
+                changed = [path for path, stat in on_disk.items() if indexed.get(path) != stat]
+                removed = [path for path in indexed if path not in on_disk]
+                if changed or removed:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        for path in removed:
+                            self._remove(conn, path)
+                        for path in changed:
+                            self._remove(conn, path)
+                            try:
+                                chunks = self._chunk_file(path)
+                            except (OSError, UnicodeDecodeError):
+                                chunks = []  # Recorded anyway, so it is not retried until it changes
+                            for start_line, end_line, text in chunks:
+                                terms = Counter(tokenize(text))
+                                chunk_id = conn.execute(
+                                    "INSERT INTO chunks (path, start_line, end_line, length, text) "
+                                    "VALUES (?, ?, ?, ?, ?)",
+                                    (path, start_line, end_line, sum(terms.values()), text),
+                                ).lastrowid
+                                conn.executemany(
+                                    "INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)",
+                                    [(term, chunk_id, tf) for term, tf in terms.items()],
+                                )
+                            size, mtime = on_disk[path]
+                            conn.execute(
+                                "INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                (path, size, mtime),
+                            )
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+            self._refreshed_at = time.monotonic()
+            return len(changed), len(removed)
+
+    def covers(self, rel_path: str) -> bool:
+        """
+        True if the file at this relative path is indexed: under a root, not in
+        a skipped directory, with an indexed extension and within MAX_FILE_BYTES.
+        Callers send files that are not covered some other way.
+        """
+        rel_path = rel_path.replace(os.sep, "/")
+        parts = rel_path.split("/")
+        if (parts[0] not in self.roots
+                or any(d in SKIP_DIRS or d.startswith(".") for d in parts[1:-1])
+                or os.path.splitext(rel_path)[1].lower() not in EXTENSIONS):
+            return False
+        try:
+            return os.path.getsize(os.path.join(self.project_dir, rel_path)) <= MAX_FILE_BYTES
+        except OSError:
+            return False
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def search(self, text: str, limit: int = 20,
+               boost_paths: Iterable[str] = ()) -> List[Chunk]:
+        """Best BM25 matches for `text`; chunks of `boost_paths` score double"""
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+        boost = {p.replace(os.sep, "/") for p in boost_paths}
+        placeholders = ",".join("?" * len(terms))
+        with closing(self._connect()) as conn:
+            n_chunks, avg_length = conn.execute(
+                "SELECT COUNT(*), COALESCE(AVG(length), 0) FROM chunks"
+            ).fetchone()
+            if not n_chunks:
+                return []
+            df = dict(conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({placeholders}) GROUP BY term",
+                list(terms),
+            ))
+            scores: Dict[int, float] = {}
+            rows = conn.execute(
+                f"SELECT p.term, p.chunk_id, p.tf, c.length FROM postings p "
+                f"JOIN chunks c ON c.id = p.chunk_id WHERE p.term IN ({placeholders})",
+                list(terms),
+            )
+            for term, chunk_id, tf, length in rows:
+                idf = math.log(1 + (n_chunks - df[term] + 0.5) / (df[term] + 0.5))
+                norm = K1 * (1 - B + B * length / (avg_length or 1))
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+            if not scores:
+                return []
+
+            candidates = sorted(scores, key=scores.get, reverse=True)[:limit * 4]
+            rows = conn.execute(
+                f"SELECT id, path, start_line, end_line, text FROM chunks "
+                f"WHERE id IN ({','.join('?' * len(candidates))})",
+                candidates,
+            ).fetchall()
+        results = [
+            Chunk(path, start, end, chunk_text,
+                  scores[chunk_id] * (2.0 if path in boost else 1.0))
+            for chunk_id, path, start, end, chunk_text in rows
+        ]
+        results.sort(key=lambda c: c.score, reverse=True)
+        return results[:limit]
+
+    def query(self, text: str, max_tokens: int, boost_paths: Iterable[str] = (),
+              count_tokens: Optional[Callable[[str], int]] = None) -> List[Chunk]:
+        """
+        Best-matching chunks that fit in `max_tokens`, refreshing the index
+        first if it may be stale. Results are in score order.
+        """
+        self.refresh()
+        count_tokens = count_tokens or _estimate_tokens
+        selected, used = [], 0
+        for chunk in self.search(text, limit=max(20, max_tokens // 100), boost_paths=boost_paths):
+            cost = count_tokens(chunk.text)
+            if used + cost > max_tokens:
+                continue
+            selected.append(chunk)
+            used += cost
+        return selected
+
+    def stats(self) -> Dict[str, int]:
+        """Indexed file, chunk and posting counts"""
+        with closing(self._connect()) as conn:
+            files, = conn.execute("SELECT COUNT(*) FROM files").fetchone()
+            chunks, = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()
+            postings, = conn.execute("SELECT COUNT(*) FROM postings").fetchone()
+        return {"files": files, "chunks": chunks, "postings": postings}
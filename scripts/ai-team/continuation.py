@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Continuation of Truncated Responses
+=================================================
+A response that stops at max_tokens (finish_reason "length" on
+OpenAI-compatible APIs, MAX_TOKENS on Gemini) is continued with a follow-up
+request instead of being saved half-written or re-run with a bigger limit.
+The follow-up repeats the task prompt and quotes the last TAIL_CHARS of the
+response so far; the continuation is then stitched on.
+
+Models often restart the line they were cut off in, repeat a few lines, or
+reopen the code fence they were inside. stitch() drops that overlap, so the
+joined text reads as one response.
+
+Usage:
+    from continuation import continuation_prompt, stitch
+
+    text = first_part
+    while truncated:
+        more = call(continuation_prompt(prompt, text))
+        text = stitch(text, more)
+"""
+
+import re
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+
+MAX_CONTINUATIONS = 4       # Follow-up requests per response before giving up
+TAIL_CHARS = 3000           # Response tail quoted in a follow-up (~750 tokens)
+OVERLAP_WINDOW = 2000       # Longest repeated text looked for at the seam
+MIN_OVERLAP = 24            # Shorter repeats only count if they restart the cut-off line
+
+_FENCE = re.compile(r"^[ \t]*```", re.MULTILINE)
+_OPENING_FENCE = re.compile(r"\s*```[\w+#.-]+[^\n`]*\n")  # With a language, so not a closing fence
+
+CONTINUE_INSTRUCTIONS = """
+
+## Continuation
+Your previous response was cut off by the length limit. It ended with:
+
+----- RESPONSE SO FAR (END) -----
+{tail}
+----- CUT OFF HERE -----
+
+Continue from exactly where it stops. Do not repeat any of it, do not restart
+the file and do not add a preamble; if it stops inside a code block, keep
+writing the code without opening a new block.
+"""
+
+
+def continuation_prompt(prompt: str, response_so_far: str, tail_chars: int = TAIL_CHARS) -> str:
+    """The original prompt plus the tail of the response so far and a request to continue"""
+    tail = response_so_far[-tail_chars:]
+    if len(response_so_far) > tail_chars and "\n" in tail:
+        tail = tail[tail.index("\n") + 1:]  # Start the quote on a whole line
+    return prompt + CONTINUE_INSTRUCTIONS.format(tail=tail)
+
+
+def _inside_fence(text: str) -> bool:
+    return len(_FENCE.findall(text)) % 2 == 1
+
+
+def overlap_length(previous: str, continuation: str) -> int:
+    """
+    Characters at the start of `continuation` that repeat the end of
+    `previous`: the longest such repeat of at least MIN_OVERLAP characters,
+    or else the cut-off last line of `previous` when the continuation starts
+    that line over and carries on with it. A continuation that starts a new
+    line is never trimmed on a shorter match - the repeat may be real code.
+    """
+    for k in range(min(len(previous), len(continuation), OVERLAP_WINDOW), MIN_OVERLAP - 1, -1):
+        if previous.endswith(continuation[:k]):
+            return k
+    partial = previous[previous.rfind("\n") + 1:]
+    k = len(partial)
+    if partial and continuation.startswith(partial) and continuation[k:k + 1] not in ("", "\n"):
+        return k
+    return 0
+
+
+def trim_continuation(previous: str, continuation: str) -> str:
+    """The part of `continuation` that is new after `previous`"""
+    if _inside_fence(previous):
+        fence = _OPENING_FENCE.match(continuation)
+        if fence:
+            continuation = continuation[fence.end():]
+    return continuation[overlap_length(previous, continuation):]
+
+
+def stitch(previous: str, continuation: str) -> str:
+    """Join a response and its continuation without the repeated seam"""
+    return previous + trim_continuation(previous, continuation)
+
+
+def trim_stream(previous: str, chunks: Iterable[str], probe_chars: int = OVERLAP_WINDOW) -> Iterator[str]:
+    """
+    Stream the new part of a continuation: the first `probe_chars` characters
+    are held back until the overlap with `previous` is known, then everything
+    passes straight through.
+    """
+    held = []
+    held_chars = 0
+    chunks = iter(chunks)
+    try:
+        for chunk in chunks:
+            held.append(chunk)
+            held_chars += len(chunk)
+            if held_chars >= probe_chars:
+                break
+        head = trim_continuation(previous, "".join(held))
+        if head:
+            yield head
+        yield from chunks
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()  # Abandoning the trimmed stream abandons the request under it
+
+
+async def trim_stream_async(previous: str, chunks: AsyncIterable[str],
+                            probe_chars: int = OVERLAP_WINDOW) -> AsyncIterator[str]:
+    """Async counterpart of trim_stream"""
+    held = []
+    held_chars = 0
+    chunks = chunks.__aiter__()
+    try:
+        async for chunk in chunks:
+            held.append(chunk)
+            held_chars += len(chunk)
+            if held_chars >= probe_chars:
+                break
+        head = trim_continuation(previous, "".join(held))
+        if head:
+            yield head
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -20,21 +20,36 @@ import sys
 import json
 import re
 import time
+import io
 import hashlib
+import random
 import asyncio
+import queue
+from collections import OrderedDict, deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterator, AsyncIterator, Callable, Iterable
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 from abc import ABC, abstractmethod
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+from http_pool import get_openai_client, get_async_openai_client, prewarm, prewarm_async, aclose_async_clients
+from response_cache import ResponseCache
+from quota_ledger import QuotaLedger, key_fingerprint, quota_window
+from file_cache import get_file_cache, read_head_tail, looks_binary, BinaryFileError
+from context_index import ContextIndex
+from symbol_index import SymbolIndex, ContextFile, pack_context, TIER_SIGNATURES, TIER_BODIES
+from token_accounting import get_token_accountant, usage_from_response, TokenUsage
+from output_budget import get_output_estimator
+from continuation import MAX_CONTINUATIONS, continuation_prompt, stitch, trim_stream, trim_stream_async
+from stream_scan import replace_stream
+
 
 # Rich console for pretty output
 try:
@@ -107,6 +122,79 @@ class ProviderConfig:
             "llama-4-scout": {"rpd": 14400, "tpm": 60000},
         },
     }
+    
+    # Context windows in tokens (prompt + completion). Cerebras' free tier caps
+    # every model at 8K whatever the model supports.
+    CONTEXT_WINDOWS = {
+        "gemini": {
+            "gemini-2.0-flash": 1048576,
+            "gemini-2.5-flash": 1048576,
+            "gemini-2.5-pro": 1048576,
+        },
+        "groq": {
+            "llama-3.3-70b-versatile": 131072,
+            "llama-3.1-8b-instant": 131072,
+            "llama-4-scout-17b-16e-instruct": 131072,
+            "qwen-qwq-32b": 131072,
+            "deepseek-r1-distill-llama-70b": 131072,
+        },
+        "cerebras": {
+            "llama-3.3-70b": 8192,
+            "llama-3.1-8b": 8192,
+            "qwen-3-32b": 8192,
+            "llama-4-scout": 8192,
+        },
+        "openrouter": {
+            "deepseek/deepseek-r1:free": 163840,
+            "deepseek/deepseek-chat-v3-0324:free": 163840,
+            "qwen/qwen-2.5-coder-32b-instruct:free": 32768,
+            "qwen/qwen-2.5-72b-instruct:free": 32768,
+            "meta-llama/llama-3.3-70b-instruct:free": 131072,
+            "meta-llama/llama-4-scout:free": 131072,
+            "mistralai/mistral-small-3.1-24b-instruct:free": 96000,
+            "google/gemma-3-27b-it:free": 96000,
+        },
+        "opencode": {
+            "x-ai/grok-code-fast-1": 256000,
+        },
+    }
+    DEFAULT_CONTEXT_WINDOW = 32768
+    
+    # Adaptive in-flight limits per provider: (initial, maximum)
+    CONCURRENCY = {
+        "groq": (4, 32),
+        "cerebras": (4, 32),
+        "gemini": (2, 16),
+        "openrouter": (1, 4),   # 20 rpm free tier
+        "opencode": (2, 8),
+    }
+    
+    @classmethod
+    def get_limits(cls, provider: str, model: str) -> Dict[str, int]:
+        """Published rpm/tpm/rpd/tpd limits for a provider's model ({} if unknown)"""
+        if provider == "openrouter":
+            # OpenRouter's free tier limits are per key, across all free models
+            limits = cls.OPENROUTER["rate_limit"]
+            return {"rpm": limits["requests_per_minute"], "rpd": limits["requests_per_day"]}
+        
+        config = {"gemini": cls.GEMINI, "groq": cls.GROQ, "cerebras": cls.CEREBRAS}.get(provider)
+        if not config:
+            return {}
+        models = config["models"]
+        if model in models:
+            return dict(models[model])
+        # Versioned names (e.g. gemini-2.5-pro-preview-05-06) use their base model's limits
+        matches = [name for name in models if model and model.startswith(name)]
+        return dict(models[max(matches, key=len)]) if matches else {}
+    
+    @classmethod
+    def get_context_window(cls, provider: str, model: str) -> int:
+        """Context window of a provider's model in tokens (a conservative default if unknown)"""
+        windows = cls.CONTEXT_WINDOWS.get(provider, {})
+        if model in windows:
+            return windows[model]
+        matches = [name for name in windows if model and model.startswith(name)]
+        return windows[max(matches, key=len)] if matches else cls.DEFAULT_CONTEXT_WINDOW
 
 
 
@@ -156,6 +244,17 @@ class TaskStatus(Enum):
     RETRYING = "retrying"
 
 
+@dataclass
+class TaskAttempt:
+    """One try of a task on one worker"""
+    worker: WorkerType
+    started_at: datetime = field(default_factory=datetime.now)
+    waited: float = 0.0  # Backoff slept before this attempt
+    latency: float = 0.0
+    error_class: Optional[str] = None  # See classify_error; None if the attempt succeeded
+    error: Optional[str] = None
+
+
 @dataclass
 class Task:
     """Represents a task to delegate to an AI worker"""
@@ -177,6 +276,11 @@ class Task:
     created_at: datetime = field(default_factory=datetime.now)
     completed_at: Optional[datetime] = None
     tokens_used: int = 0
+    context_mode: str = "full"  # "full" files, "skeleton" (TypeScript declarations only) or "retrieval"
+    task_type: str = ""  # Groups tasks for output size estimates; defaults to the id without its number
+    time_budget: float = 900.0  # Seconds after the first attempt in which retries may start
+    attempts: List[TaskAttempt] = field(default_factory=list)
+    truncated: bool = False  # Result still cut off at max_tokens after MAX_CONTINUATIONS
 
 
 @dataclass
@@ -188,9 +292,48 @@ class WorkerStats:
     failed_requests: int = 0
     total_tokens: int = 0
     avg_response_time: float = 0.0
+    ewma_latency: float = 0.0
+    ewma_error_rate: float = 0.0
     last_used: Optional[datetime] = None
     is_available: bool = True
     rate_limit_reset: Optional[datetime] = None
+    rate_limit_waits: int = 0
+    rate_limit_wait_time: float = 0.0
+    cache_hits: int = 0
+    streamed_requests: int = 0
+    avg_time_to_first_token: float = 0.0
+    avg_tokens_per_second: float = 0.0
+    estimated_tokens: int = 0  # Part of total_tokens not reported by the provider
+    continuations: int = 0  # Follow-up requests for replies cut off at max_tokens
+    truncated_responses: int = 0  # Replies still cut off after MAX_CONTINUATIONS
+
+
+@dataclass
+class StreamUsage:
+    """Usage for one response; a streamed one fills it in as it is consumed"""
+    tokens: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    exact: bool = False  # True once the provider has reported usage
+    chunks: int = 0
+    time_to_first_token: Optional[float] = None
+    tokens_per_second: float = 0.0
+    finish_reason: Optional[str] = None
+    
+    @property
+    def truncated(self) -> bool:
+        """True if the reply stopped at max_tokens ("length", or Gemini's MAX_TOKENS)"""
+        return self.finish_reason in ("length", "MAX_TOKENS")
+    
+    def add(self, other: "StreamUsage"):
+        """Fold in the usage of a continuation of this response"""
+        self.tokens += other.tokens
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.exact = self.exact and other.exact
+        self.chunks += other.chunks
+        # A continuation that was not sent (prompt too large) leaves the reply cut off
+        self.finish_reason = other.finish_reason or self.finish_reason
 
 
 
@@ -202,6 +345,15 @@ class DataSanitizer:
     """
     Sanitizes sensitive data before sending to free models.
     Uses a reversible dictionary approach so code still works.
+    
+    An instance is a session: EnhancedOrchestrator opens one per task and drops
+    it after restore. The compiled patterns are shared read-only by all
+    sessions; the maps are per session and guarded by a lock.
+    
+    A `namespace` (e.g. "QXKT") is added to every placeholder (<EMAIL_QXKT_1>).
+    Context file segments are sanitized in a namespace derived from their
+    content hash, so a cached segment can be adopted into any task's session
+    without clashing with the task's own placeholders.
     """
     
     # Patterns to detect and replace
@@ -225,14 +377,58 @@ class DataSanitizer:
         'SGAQualityAssurance': 'QASite',
     }
     
-    def __init__(self):
+    COMPANY_GROUP = "company_term"
+    BULK_MIN_CHARS = 1_000_000  # Below this a batch runs inline; process start-up costs more
+    STREAM_OVERLAP = 4096       # Longest value sanitize_stream is sure to catch across chunks
+    PLACEHOLDER = re.compile(r"<[A-Z][A-Z_]*_\d+>")
+    _compiled: Dict[str, "re.Pattern"] = {}  # level -> combined regex, shared by all instances
+    
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
         self.redaction_map: Dict[str, str] = {}
         self.reverse_map: Dict[str, str] = {}
         self.counter = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _trie_pattern(words) -> str:
+        """Regex for a set of literals, factored as a trie so shared prefixes are matched once"""
+        trie: Dict[str, dict] = {}
+        for word in words:
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[""] = {}  # End of a word
+        
+        def build(node: dict) -> str:
+            branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # Optional continuation is greedy, so the longest term wins
+            return f"(?:{body})?" if "" in node else body
+        
+        return build(trie)
+    
+    @classmethod
+    def _get_regex(cls, level: str) -> "re.Pattern":
+        """
+        All PATTERNS (case-insensitive) as one alternation of named groups, plus
+        the company terms (case-sensitive) at the "high" level. Compiled once.
+        """
+        regex = cls._compiled.get(level)
+        if regex is None:
+            alternatives = [f"(?P<{name}>(?i:{pattern}))" for name, pattern in cls.PATTERNS.items()]
+            if level == "high" and cls.COMPANY_TERMS:
+                alternatives.append(f"(?P<{cls.COMPANY_GROUP}>{cls._trie_pattern(cls.COMPANY_TERMS)})")
+            regex = cls._compiled[level] = re.compile("|".join(alternatives))
+        return regex
     
     def _generate_placeholder(self, pattern_type: str) -> str:
         """Generate a unique placeholder"""
         self.counter += 1
+        if self.namespace:
+            return f"<{pattern_type.upper()}_{self.namespace}_{self.counter}>"
         return f"<{pattern_type.upper()}_{self.counter}>"
     
     def sanitize(self, text: str, level: str = "standard") -> str:
@@ -247,43 +443,825 @@ class DataSanitizer:
         if level == "none":
             return text
         
-        result = text
-        
-        # Replace patterns with unique placeholders
-        for pattern_name, pattern in self.PATTERNS.items():
-            matches = re.findall(pattern, result, re.IGNORECASE)
+        # One scan of the text finds every pattern (and company term) at once
+        matches = list(self._get_regex(level).finditer(text))
+        if not matches:
+            return text
+        return self._replace(text, matches, 0, len(text))
+    
+    def _replace(self, text: str, matches: List["re.Match"], start: int, end: int) -> str:
+        """text[start:end] with every match swapped for its placeholder (or company alias)"""
+        # New values are numbered by first appearance, so a streamed text gets
+        # the same placeholders as the whole text in one call
+        with self._lock:
+            parts = []
+            last = start
             for match in matches:
-                if isinstance(match, tuple):
-                    match = match[0]
-                if match not in self.redaction_map:
-                    placeholder = self._generate_placeholder(pattern_name)
-                    self.redaction_map[match] = placeholder
-                    self.reverse_map[placeholder] = match
-                result = result.replace(match, self.redaction_map[match])
+                value = match.group()
+                parts.append(text[last:match.start()])
+                if match.lastgroup == self.COMPANY_GROUP:
+                    parts.append(self.COMPANY_TERMS[value])
+                else:
+                    placeholder = self.redaction_map.get(value)
+                    if placeholder is None:
+                        placeholder = self._generate_placeholder(match.lastgroup)
+                        self.redaction_map[value] = placeholder
+                        self.reverse_map[placeholder] = value
+                    parts.append(placeholder)
+                last = match.end()
+        parts.append(text[last:end])
+        return "".join(parts)
+    
+    def sanitize_stream(self, chunks: Iterable[str], write: Callable[[str], Any],
+                        level: str = "standard", overlap: int = STREAM_OVERLAP):
+        """
+        Sanitize text that arrives in chunks, passing sanitized text to
+        `write` as it goes (see stream_scan.replace_stream). The output and
+        placeholders are the same as sanitize() on the whole text.
+        """
+        if level == "none":
+            for chunk in chunks:
+                write(chunk)
+            return
+        replace_stream(chunks, self._get_regex(level), self._replace, write, overlap)
+    
+    @classmethod
+    def sanitize_bulk(cls, texts: List[str], level: str = "standard",
+                      namespaces: Optional[List[str]] = None,
+                      max_workers: Optional[int] = None) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Sanitize many independent texts (prompts or file segments) across a
+        process pool, returning (sanitized text, redaction map) for each.
         
-        # High security: also anonymize company terms
-        if level == "high":
-            for term, replacement in self.COMPANY_TERMS.items():
-                result = result.replace(term, replacement)
+        Every text gets a fresh sanitizer in its own namespace, so results
+        never share placeholders; the caller merges each map into the right
+        session with adopt(). Each process compiles the patterns once.
+        """
+        jobs = [(text, namespace, level)
+                for text, namespace in zip(texts, namespaces or [""] * len(texts))]
+        if len(jobs) < 2 or sum(len(text) for text in texts) < cls.BULK_MIN_CHARS:
+            return [_sanitize_job(job) for job in jobs]
         
-        return result
+        max_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(jobs) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sanitizer_process,
+                                 initargs=(level,)) as pool:
+            return list(pool.map(_sanitize_job, jobs, chunksize=chunksize))
+    
+    def adopt(self, redaction_map: Dict[str, str]) -> bool:
+        """
+        Take over placeholders minted by another sanitizer (a cached segment).
+        Returns False, adopting nothing, if any placeholder already means
+        something else in this session.
+        """
+        with self._lock:
+            if any(self.reverse_map.get(placeholder, value) != value
+                   for value, placeholder in redaction_map.items()):
+                return False
+            for value, placeholder in redaction_map.items():
+                self.redaction_map.setdefault(value, placeholder)
+                self.reverse_map[placeholder] = value
+            return True
     
     def restore(self, text: str) -> str:
-        """Restore original values from placeholders"""
-        result = text
-        for placeholder, original in self.reverse_map.items():
-            result = result.replace(placeholder, original)
-        return result
+        """Restore original values from placeholders (one scan, however large the map)"""
+        reverse_map = self.reverse_map
+        return self.PLACEHOLDER.sub(lambda m: reverse_map.get(m.group(), m.group()), text)
+    
+    def stream_restorer(self) -> "PlaceholderRestorer":
+        """Restorer for a streamed response whose chunks may split a placeholder"""
+        return PlaceholderRestorer(self)
     
     def get_redaction_report(self) -> Dict[str, int]:
         """Get a count of redacted items by type"""
+        with self._lock:
+            placeholders = list(self.reverse_map)
+        kinds = sorted((name.upper() for name in self.PATTERNS), key=len, reverse=True)
         report = {}
-        for placeholder in self.reverse_map.keys():
-            pattern_type = placeholder.split('_')[0].strip('<>')
+        for placeholder in placeholders:
+            body = placeholder.strip('<>')
+            # Longest known type prefix, so a segment namespace is not counted as part of the type
+            pattern_type = next((k for k in kinds if body.startswith(k + "_")), body.rsplit('_', 1)[0])
             report[pattern_type] = report.get(pattern_type, 0) + 1
         return report
 
 
+def _init_sanitizer_process(level: str):
+    """ProcessPoolExecutor initializer: compile the patterns once per process"""
+    DataSanitizer._get_regex(level)
+
+
+def _sanitize_job(job: Tuple[str, str, str]) -> Tuple[str, Dict[str, str]]:
+    """Sanitize one (text, namespace, level) job with a fresh sanitizer"""
+    text, namespace, level = job
+    sanitizer = DataSanitizer(namespace=namespace)
+    return sanitizer.sanitize(text, level), sanitizer.redaction_map
+
+
+class PlaceholderRestorer:
+    """
+    Incremental restore for streamed text.
+    
+    A chunk ending in what could be the start of a placeholder ("<EMA") is
+    held back until the next chunk completes or rules it out.
+    """
+    
+    PARTIAL = re.compile(r"<(?:[A-Z][A-Z_]*(?:_\d*)?)?")
+    MAX_PENDING = 64  # Longer than any placeholder
+    
+    def __init__(self, sanitizer: DataSanitizer):
+        self.sanitizer = sanitizer
+        self.pending = ""
+    
+    def feed(self, chunk: str) -> str:
+        """Restore a chunk, returning everything that is safe to emit so far"""
+        text = self.pending + chunk
+        self.pending = ""
+        start = text.rfind("<")
+        if start != -1 and len(text) - start < self.MAX_PENDING and self.PARTIAL.fullmatch(text, start):
+            self.pending = text[start:]
+            text = text[:start]
+        return self.sanitizer.restore(text)
+    
+    def flush(self) -> str:
+        """Emit whatever is still held back at the end of the stream"""
+        text, self.pending = self.pending, ""
+        return self.sanitizer.restore(text)
+
+
+class SanitizedSegmentCache:
+    """
+    Process-wide cache of sanitized context file segments.
+    
+    A segment is one file's "### File:" block, sanitized once in a namespace
+    taken from its content hash. Entries are found by path and validated by
+    (size, mtime) without reading the file; a changed stat falls back to the
+    content hash, so a touched-but-identical file is still a hit. A task's
+    session adopts the segment's redaction map, which is a few dict inserts
+    instead of a regex scan of the file. Least-recently-used segments are
+    dropped beyond `max_bytes`.
+    
+    Files are read as chunk iterators and sanitized with sanitize_stream, so
+    a miss on a large file never holds more than a chunk of raw text.
+    """
+    
+    NAMESPACE_LENGTH = 4
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # (path, level) -> (size, mtime_ns, digest)
+        self._stats: Dict[Tuple[str, str], Tuple[int, int, str]] = {}
+        # (digest, label, level) -> (segment, redaction_map), oldest first
+        self._segments: "OrderedDict[Tuple[str, str, str], Tuple[str, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def namespace_for(cls, digest: str) -> str:
+        """Placeholder namespace (uppercase letters) derived from a content hash"""
+        value = int(digest[:16], 16)
+        letters = []
+        for _ in range(cls.NAMESPACE_LENGTH):
+            value, index = divmod(value, 26)
+            letters.append(chr(ord("A") + index))
+        return "".join(letters)
+    
+    @staticmethod
+    def format_segment(label: str, content: str) -> str:
+        return f"### File: {label}\n```\n{content}\n```\n"
+    
+    @staticmethod
+    def segment_chunks(label: str, chunks: Iterable[str]) -> Iterator[str]:
+        """format_segment for content that arrives in chunks"""
+        yield f"### File: {label}\n```\n"
+        yield from chunks
+        yield "\n```\n"
+    
+    @staticmethod
+    def _digest(chunks: Iterable[str]) -> str:
+        digest = hashlib.sha256()
+        for chunk in chunks:
+            digest.update(chunk.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+    
+    def _sanitize_into(self, sanitizer: DataSanitizer, label: str, chunks: Iterable[str],
+                       level: str) -> str:
+        buffer = io.StringIO()
+        sanitizer.sanitize_stream(self.segment_chunks(label, chunks), buffer.write, level)
+        return buffer.getvalue()
+    
+    def _lookup(self, key: Tuple[str, str, str]) -> Optional[Tuple[str, Dict[str, str]]]:
+        entry = self._segments.get(key)
+        if entry is not None:
+            self._segments.move_to_end(key)
+        return entry
+    
+    def _store(self, key: Tuple[str, str, str], entry: Tuple[str, Dict[str, str]]):
+        if key in self._segments:
+            return
+        self._segments[key] = entry
+        self.total_bytes += len(entry[0])
+        while self.total_bytes > self.max_bytes and len(self._segments) > 1:
+            _, (segment, _) = self._segments.popitem(last=False)
+            self.total_bytes -= len(segment)
+    
+    def get(self, full_path: str, label: str, read: Callable[[str], Iterable[str]],
+            session: DataSanitizer, level: str = "standard") -> str:
+        """
+        Sanitized segment for a file, with its placeholders adopted into `session`.
+        `read` yields the file's (truncated) content in chunks; it is called
+        on a miss only.
+        """
+        st = os.stat(full_path)
+        stat_key = (full_path, level)
+        entry = None
+        with self._lock:
+            known = self._stats.get(stat_key)
+            if known and known[:2] == (st.st_size, st.st_mtime_ns):
+                entry = self._lookup((known[2], label, level))
+        
+        if entry is None:
+            # Stat changed (or never seen): identical content is still a hit by hash
+            digest = self._digest(read(full_path))
+            key = (digest, label, level)
+            with self._lock:
+                self._stats[stat_key] = (st.st_size, st.st_mtime_ns, digest)
+                entry = self._lookup(key)
+        
+        if entry is None:
+            # The namespace comes from the hash, so sanitizing takes a second pass
+            segment_sanitizer = DataSanitizer(namespace=self.namespace_for(digest))
+            segment = self._sanitize_into(segment_sanitizer, label, read(full_path), level)
+            entry = (segment, dict(segment_sanitizer.redaction_map))
+            with self._lock:
+                self.misses += 1
+                self._store(key, entry)
+        else:
+            with self._lock:
+                self.hits += 1
+        
+        segment, redaction_map = entry
+        if session.adopt(redaction_map):
+            return segment
+        # Namespace clash with a placeholder already in this session (very rare):
+        # sanitize this copy in the session itself
+        return self._sanitize_into(session, label, read(full_path), level)
+    
+    def warm(self, files: List[Tuple[str, str]], read: Callable[[str], Iterable[str]],
+             level: str = "standard", max_workers: Optional[int] = None) -> int:
+        """
+        Sanitize every (full_path, label) not cached yet in one bulk pass
+        across processes. Returns the number of segments added; unreadable
+        files are skipped (get() reports them when the task runs).
+        """
+        pending: Dict[Tuple[str, str, str], str] = {}
+        for full_path, label in files:
+            try:
+                st = os.stat(full_path)
+                stat_key = (full_path, level)
+                with self._lock:
+                    known = self._stats.get(stat_key)
+                    if (known and known[:2] == (st.st_size, st.st_mtime_ns)
+                            and (known[2], label, level) in self._segments):
+                        continue
+                content = "".join(read(full_path))
+            except (OSError, ValueError):  # Unreadable, undecodable or binary
+                continue
+            digest = hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+            key = (digest, label, level)
+            with self._lock:
+                self._stats[stat_key] = (st.st_size, st.st_mtime_ns, digest)
+                if key in self._segments:
+                    continue
+            pending.setdefault(key, content)
+        
+        if not pending:
+            return 0
+        keys = list(pending)
+        results = DataSanitizer.sanitize_bulk(
+            [self.format_segment(label, pending[(digest, label, lvl)]) for digest, label, lvl in keys],
+            level,
+            namespaces=[self.namespace_for(digest) for digest, _, _ in keys],
+            max_workers=max_workers,
+        )
+        with self._lock:
+            for key, entry in zip(keys, results):
+                self.misses += 1
+                self._store(key, entry)
+        return len(keys)
+
+
+_segment_cache = SanitizedSegmentCache()
+
+
+def get_segment_cache() -> SanitizedSegmentCache:
+    """The process-wide sanitized segment cache"""
+    return _segment_cache
+
+
+
+# ============================================================================
+# RATE LIMITER - Stay inside provider limits instead of hitting 429s
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting before a request"""
+    return max(1, len(text) // 4) if text else 0
+
+
+class TokenBucket:
+    """Token bucket holding up to `capacity` units, refilled evenly over `period` seconds"""
+    
+    def __init__(self, capacity: float, period: float):
+        self.period = period
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (requests larger than the bucket wait for a full bucket)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+    
+    def consume(self, amount: float):
+        self.level -= min(amount, self.capacity)
+    
+    def fraction(self, now: float) -> float:
+        """Share of the bucket currently available (0.0 - 1.0)"""
+        self._refill(now)
+        return max(0.0, self.level) / self.capacity
+    
+    def adjust(self, amount: float):
+        """Give back (positive) or take extra (negative) units after real usage is known"""
+        self.level = min(self.capacity, self.level + amount)
+
+
+class DailyQuotaExhaustedError(Exception):
+    """Raised instead of waiting (for up to a day) until a daily rpd/tpd bucket refills"""
+    pass
+
+
+class RateLimiter:
+    """
+    Proactive limiter for one provider/model/key.
+    
+    Keeps a request bucket for each of rpm/rpd and a token bucket for each of
+    tpm/tpd from ProviderConfig. Callers block (or await) until every
+    per-minute bucket can cover the request, so we send at the allowed rate
+    instead of discovering it through 429s. A daily bucket that cannot cover
+    it raises DailyQuotaExhaustedError instead, so the task can go to another
+    provider rather than hold its thread for most of an hour.
+    """
+    
+    PERIODS = {"rpm": 60, "tpm": 60, "rpd": 86400, "tpd": 86400}
+    
+    def __init__(self, name: str, limits: Dict[str, int]):
+        self.name = name
+        self.limits = limits
+        self.request_buckets = [
+            TokenBucket(limits[k], self.PERIODS[k]) for k in ("rpm", "rpd") if limits.get(k)
+        ]
+        self.token_buckets = [
+            TokenBucket(limits[k], self.PERIODS[k]) for k in ("tpm", "tpd") if limits.get(k)
+        ]
+        self._lock = threading.Lock()
+    
+    def try_acquire(self, tokens: int) -> float:
+        """Take one request and `tokens` from every bucket, or return seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            if any(b.delay_for(1, now) > 0 for b in self.request_buckets if b.period >= 86400) or any(
+                b.delay_for(tokens, now) > 0 for b in self.token_buckets if b.period >= 86400
+            ):
+                raise DailyQuotaExhaustedError(f"{self.name}: daily request or token budget used up")
+            delay = max(
+                [b.delay_for(1, now) for b in self.request_buckets] +
+                [b.delay_for(tokens, now) for b in self.token_buckets] +
+                [0.0]
+            )
+            if delay > 0:
+                return delay
+            for bucket in self.request_buckets:
+                bucket.consume(1)
+            for bucket in self.token_buckets:
+                bucket.consume(tokens)
+            return 0.0
+    
+    def acquire(self, tokens: int) -> float:
+        """Block until the request fits; return total seconds waited"""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+    
+    async def acquire_async(self, tokens: int) -> float:
+        """Await until the request fits; return total seconds waited"""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+    
+    def headroom(self) -> float:
+        """Share of the tightest budget currently available (1.0 = untouched)"""
+        with self._lock:
+            now = time.monotonic()
+            buckets = self.request_buckets + self.token_buckets
+            return min([b.fraction(now) for b in buckets] + [1.0])
+    
+    def settle(self, reserved: int, actual: int):
+        """Correct the token buckets once the provider reports real usage"""
+        with self._lock:
+            for bucket in self.token_buckets:
+                bucket.adjust(min(reserved, bucket.capacity) - actual)
+    
+    def preload_daily(self, requests: int, tokens: int):
+        """Start the daily (rpd/tpd) buckets from usage already spent today, e.g. by earlier runs"""
+        with self._lock:
+            now = time.monotonic()
+            for buckets, used in ((self.request_buckets, requests), (self.token_buckets, tokens)):
+                for bucket in buckets:
+                    if bucket.period >= 86400:
+                        bucket._refill(now)
+                        bucket.level = min(bucket.level, bucket.capacity - used)
+    
+    def refill_daily(self):
+        """Fill the daily buckets again (at the provider's daily reset)"""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self.request_buckets + self.token_buckets:
+                if bucket.period >= 86400:
+                    bucket.level, bucket.updated = bucket.capacity, now
+    
+    def daily_exhausted(self) -> bool:
+        """True if a daily bucket cannot cover even one request"""
+        with self._lock:
+            now = time.monotonic()
+            return any(
+                b.fraction(now) * b.capacity < 1
+                for b in self.request_buckets + self.token_buckets if b.period >= 86400
+            )
+
+
+_rate_limiters: Dict[Tuple[str, str, int], RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str, account: int = 1) -> Optional[RateLimiter]:
+    """Shared limiter for a provider/model/account, or None if it has no published limits"""
+    scope = "*" if provider == "openrouter" else model
+    key = (provider, scope, account)
+    with _rate_limiters_lock:
+        if key not in _rate_limiters:
+            limits = ProviderConfig.get_limits(provider, model)
+            _rate_limiters[key] = RateLimiter(f"{provider}/{scope}#{account}", limits) if limits else None
+        return _rate_limiters[key]
+
+
+
+# ============================================================================
+# ADAPTIVE CONCURRENCY - Per-provider in-flight limits (AIMD)
+# ============================================================================
+
+def is_overload_error(error: BaseException) -> bool:
+    """Errors that mean 'send less' - rate limits and timeouts"""
+    if isinstance(error, DailyQuotaExhaustedError):
+        return False  # Refused locally; the provider never saw the request
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return True
+    if "timeout" in type(error).__name__.lower():
+        return True
+    message = str(error).lower()
+    return is_rate_limit_error(error) or "timed out" in message or "timeout" in message
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD in-flight limit for one provider.
+    
+    Each success raises the limit by 1/limit (about +1 per full window);
+    a rate-limit or timeout halves it (at most once per cooldown, so a burst
+    of 429s from one window counts once). Callers over the limit wait in this
+    provider's queue - threads on a Condition, coroutines on futures - so a
+    throttled provider never holds up another.
+    """
+    
+    def __init__(self, name: str, initial: int = 2, maximum: int = 16, minimum: int = 1,
+                 decrease_factor: float = 0.5, decrease_cooldown: float = 2.0):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+    
+    @property
+    def current_limit(self) -> int:
+        return max(self.minimum, int(self.limit))
+    
+    def acquire(self):
+        """Block until this provider has a free slot"""
+        with self._cond:
+            while self.in_flight >= self.current_limit:
+                self._cond.wait()
+            self.in_flight += 1
+    
+    async def acquire_async(self):
+        """Await a free slot without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_flight < self.current_limit:
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+    
+    def release(self, error: Optional[BaseException] = None):
+        """Free a slot and adapt the limit to how the request went"""
+        with self._cond:
+            self.in_flight -= 1
+            if error is None:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif is_overload_error(error):
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake_waiter, waiter)
+
+
+def _wake_waiter(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_concurrency_limits: Dict[str, AdaptiveConcurrencyLimit] = {}
+_concurrency_limits_lock = threading.Lock()
+
+
+def get_concurrency_limit(provider: str) -> AdaptiveConcurrencyLimit:
+    """Shared adaptive in-flight limit for a provider"""
+    with _concurrency_limits_lock:
+        if provider not in _concurrency_limits:
+            initial, maximum = ProviderConfig.CONCURRENCY.get(provider, (2, 8))
+            _concurrency_limits[provider] = AdaptiveConcurrencyLimit(provider, initial, maximum)
+        return _concurrency_limits[provider]
+
+
+
+# ============================================================================
+# CIRCUIT BREAKER - Stop sending to failing workers, honour provider reset times
+# ============================================================================
+
+class CircuitState(Enum):
+    CLOSED = "closed"        # Healthy - requests flow
+    OPEN = "open"            # Failing - no requests until the reset time
+    HALF_OPEN = "half_open"  # Reset time passed - one probe request allowed
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a worker whose circuit is open"""
+    pass
+
+
+class PromptTooLargeError(Exception):
+    """Raised instead of sending a prompt the model's context window or TPM limit cannot take"""
+    pass
+
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse '30', '1.5', '7.66s', '2m59.56s', '1h2m' or '250ms' into seconds"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+def parse_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Seconds the provider asked us to wait, if it said.
+    
+    Checks Retry-After / retry-after-ms first, then the x-ratelimit-reset-*
+    headers for any budget that is exhausted (OpenAI-compatible providers),
+    then the retry delay Gemini embeds in its error message.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        if headers.get("retry-after-ms"):
+            seconds = _parse_duration(headers["retry-after-ms"])
+            if seconds is not None:
+                return seconds / 1000
+        if headers.get("retry-after"):
+            seconds = _parse_duration(headers["retry-after"])
+            if seconds is None:
+                try:
+                    from email.utils import parsedate_to_datetime
+                    reset_at = parsedate_to_datetime(headers["retry-after"])
+                    seconds = max(0.0, reset_at.timestamp() - time.time())
+                except (TypeError, ValueError):
+                    seconds = None
+            if seconds is not None:
+                return seconds
+        resets = []
+        for name, value in headers.items():
+            name = name.lower()
+            if not name.startswith("x-ratelimit-reset"):
+                continue
+            remaining = headers.get(name.replace("reset", "remaining"))
+            if remaining is not None and remaining.strip() not in ("0", "0.0"):
+                continue
+            seconds = _parse_duration(value)
+            if seconds is not None:
+                resets.append(seconds)
+        if resets:
+            return max(resets)
+    
+    match = re.search(r'retry(?:_delay| in)\s*\{?\s*(?:seconds:\s*)?(\d+(?:\.\d+)?)', str(error), re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+_RATE_LIMIT_ERROR_TYPES = {"RateLimitError", "ResourceExhausted", "TooManyRequests"}  # openai, google.api_core
+_RATE_LIMIT_MESSAGE = re.compile(
+    r"\brate[ _-]?limit|\b429\b|resource[ _]exhausted|too many requests|\bquota\b", re.IGNORECASE
+)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for 429 / quota errors from any provider"""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    if any(cls.__name__ in _RATE_LIMIT_ERROR_TYPES for cls in type(error).__mro__):
+        return True
+    return bool(_RATE_LIMIT_MESSAGE.search(str(error)))
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Coarse class of a failed attempt, for retry decisions and the run summary:
+    rate_limit, circuit_open, prompt_too_large, quota_exhausted, timeout,
+    connection, auth, server (5xx), client (other 4xx) or other.
+    """
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, PromptTooLargeError):
+        return "prompt_too_large"
+    if isinstance(error, DailyQuotaExhaustedError):
+        return "quota_exhausted"
+    if is_rate_limit_error(error):
+        return "rate_limit"
+    name = type(error).__name__.lower()
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)) or "timeout" in name:
+        return "timeout"
+    if isinstance(error, ConnectionError) or "connection" in name:
+        return "connection"
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int):
+        if status in (401, 403):
+            return "auth"
+        if status >= 500:
+            return "server"
+        if status >= 400:
+            return "client"
+    return "other"
+
+
+class CircuitBreaker:
+    """
+    Per-worker circuit breaker.
+    
+    - Rate-limit errors open the circuit immediately, until the provider's
+      reset time (or a jittered backoff if it gave none).
+    - Other errors open it after `failure_threshold` consecutive failures.
+    - Each time it re-opens, the backoff doubles (with jitter) up to `max_delay`.
+    - Once the open period passes, one probe request is allowed (half-open);
+      success closes the circuit, failure re-opens it.
+    """
+    
+    def __init__(self, failure_threshold: int = 3, base_delay: float = 2.0,
+                 max_delay: float = 300.0, probe_timeout: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.probe_timeout = probe_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.open_until = 0.0
+        self.probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def _backoff(self) -> float:
+        """Exponential backoff with equal jitter"""
+        delay = min(self.max_delay, self.base_delay * (2 ** self.open_count))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def _probe_in_flight(self, now: float) -> bool:
+        return self.probe_started is not None and now - self.probe_started < self.probe_timeout
+    
+    def is_open(self) -> bool:
+        """True if a request right now would be refused (does not claim the probe)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CircuitState.OPEN:
+                return now < self.open_until
+            if self.state == CircuitState.HALF_OPEN:
+                return self._probe_in_flight(now)
+            return False
+    
+    def reopens_in(self) -> float:
+        """Seconds until a request would be let through again (0 if it would be now)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CircuitState.OPEN:
+                return max(0.0, self.open_until - now)
+            if self.state == CircuitState.HALF_OPEN and self._probe_in_flight(now):
+                return self.probe_timeout - (now - self.probe_started)
+            return 0.0
+    
+    def allow_request(self) -> bool:
+        """Check (and in half-open state, claim) permission to send a request"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                if now < self.open_until:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+            if self._probe_in_flight(now):
+                return False
+            self.probe_started = now
+            return True
+    
+    def release_probe(self):
+        """Give back the half-open probe of an abandoned request - neither success nor failure"""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self.probe_started = None
+    
+    def record_success(self):
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.consecutive_failures = 0
+            self.open_count = 0
+            self.probe_started = None
+    
+    def record_failure(self, rate_limited: bool = False, retry_after: Optional[float] = None) -> Optional[float]:
+        """Record a failure; return the open duration in seconds if the circuit opened"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self.probe_started = None
+            should_open = (
+                rate_limited
+                or self.state == CircuitState.HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            )
+            if not should_open:
+                return None
+            delay = retry_after + random.uniform(0, 1) if retry_after is not None else self._backoff()
+            self.state = CircuitState.OPEN
+            self.open_until = time.monotonic() + delay
+            self.open_count += 1
+            return delay
+
+
 
 # ============================================================================
 # BASE WORKER CLASS
@@ -292,12 +1270,32 @@ class DataSanitizer:
 class AIWorker(ABC):
     """Abstract base class for all AI workers"""
     
+    EWMA_ALPHA = 0.3  # Weight of the newest sample in latency / error-rate averages
+    TTFT_HISTORY = 50      # Recent time-to-first-token samples kept for hedging
+    TTFT_MIN_SAMPLES = 5   # Below this, percentiles are not trusted
+    
+    PROVIDER = ""
+    DEFAULT_SYSTEM_PROMPT = "You are an expert software developer."
+    MAX_TOKENS = 8192  # Completion allowance when a request does not ask for less
+    MIN_COMPLETION_TOKENS = 256  # A request with less room than this for the reply is not sent
+    PROMPT_BUDGET_MARGIN = 0.9  # Token estimates are approximate; plan prompts to 90% of the room
+    
     def __init__(self, worker_type: WorkerType):
         self.worker_type = worker_type
         self.stats = WorkerStats(worker=worker_type)
         self.client = None
         self.model = None
+        self.cache: Optional[ResponseCache] = None  # Attached by EnhancedOrchestrator
+        self.ledger: Optional[QuotaLedger] = None   # Attached by EnhancedOrchestrator
+        self.api_key: Optional[str] = None
+        self.breaker = CircuitBreaker()
+        self.ttft_samples: deque = deque(maxlen=self.TTFT_HISTORY)
         self._setup()
+        self.rate_limiter = get_rate_limiter(
+            self.PROVIDER, self.model, getattr(self, "account_num", 1)
+        )
+        self.concurrency = get_concurrency_limit(self.PROVIDER)
+        self.key_id = key_fingerprint(self.api_key)
     
     @abstractmethod
     def _setup(self):
@@ -305,39 +1303,538 @@ class AIWorker(ABC):
         pass
     
     @abstractmethod
-    def execute(self, prompt: str, system_prompt: str = None) -> Tuple[str, int]:
-        """Execute prompt, return (response, tokens_used)"""
+    def _execute(self, prompt: str, system_prompt: str = None, max_tokens: Optional[int] = None,
+                 usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        """Send prompt to the provider, return (response, tokens_used); `usage` gets the finish reason"""
         pass
     
+    async def _execute_async(self, prompt: str, system_prompt: str = None, max_tokens: Optional[int] = None,
+                             usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        """Provider call without blocking the event loop (thread fallback)"""
+        return await asyncio.to_thread(self._execute, prompt, system_prompt, max_tokens, usage)
+    
+    def _execute_stream(self, prompt: str, system_prompt: str = None,
+                        usage: Optional[StreamUsage] = None,
+                        max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Streaming provider call; workers without native streaming yield one chunk"""
+        start_time = time.time()
+        text, tokens = self._execute(prompt, system_prompt, max_tokens, usage)
+        if usage is not None:
+            usage.tokens = tokens
+            usage.time_to_first_token = time.time() - start_time
+        yield text
+    
+    async def _execute_stream_async(self, prompt: str, system_prompt: str = None,
+                                    usage: Optional[StreamUsage] = None,
+                                    max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """Async counterpart of _execute_stream"""
+        start_time = time.time()
+        text, tokens = await self._execute_async(prompt, system_prompt, max_tokens, usage)
+        if usage is not None:
+            usage.tokens = tokens
+            usage.time_to_first_token = time.time() - start_time
+        yield text
+    
+    # ------------------------------------------------------------------
+    # Request size - what one request to this model can hold
+    # ------------------------------------------------------------------
+    
+    def request_token_cap(self) -> int:
+        """
+        Most tokens (prompt plus max_tokens) a single request may ask for: the
+        context window, or the TPM limit if lower, since a request larger than
+        a whole minute's budget is rejected outright.
+        """
+        window = ProviderConfig.get_context_window(self.PROVIDER, self.model)
+        tpm = ProviderConfig.get_limits(self.PROVIDER, self.model).get("tpm")
+        return min(window, tpm) if tpm else window
+    
+    def max_completion_tokens(self, expected: Optional[int] = None) -> int:
+        """
+        Completion allowance: the expected output size if the caller knows it,
+        else MAX_TOKENS, leaving at least half of the request for the prompt
+        """
+        return min(expected or self.MAX_TOKENS, self.MAX_TOKENS, self.request_token_cap() // 2)
+    
+    def count_tokens(self, text: str) -> int:
+        """Estimated tokens of `text` for this model (calibrated from past usage)"""
+        return get_token_accountant().count(text, self.model)
+    
+    def prompt_budget(self, system_prompt: str = None, max_tokens: Optional[int] = None) -> int:
+        """Tokens the user prompt may be planned to use on this model, for a reply of `max_tokens`"""
+        room = self.request_token_cap() - self.max_completion_tokens(max_tokens)
+        return (int(room * self.PROMPT_BUDGET_MARGIN)
+                - get_token_accountant().count_prompt("", system_prompt or self.DEFAULT_SYSTEM_PROMPT, self.model))
+    
+    def _completion_tokens(self, prompt: str, system_prompt: str = None,
+                           max_tokens: Optional[int] = None) -> int:
+        """
+        max_tokens to send: the allowance for `max_tokens` (see
+        max_completion_tokens), clamped to the room the prompt leaves in one
+        request. Raises PromptTooLargeError if too little room is left.
+        """
+        wanted = self.max_completion_tokens(max_tokens)
+        prompt_tokens = get_token_accountant().count_prompt(
+            prompt, system_prompt or self.DEFAULT_SYSTEM_PROMPT, self.model
+        )
+        room = self.request_token_cap() - prompt_tokens
+        if room < min(wanted, self.MIN_COMPLETION_TOKENS):
+            raise PromptTooLargeError(
+                f"{self.worker_type.value}: prompt needs ~{prompt_tokens} tokens, "
+                f"{self.model} accepts {self.request_token_cap()} including the reply"
+            )
+        return min(wanted, room)
+    
+    # ------------------------------------------------------------------
+    # Response cache - checked before any request goes to the network
+    # ------------------------------------------------------------------
+    
+    def _cache_params(self) -> Dict[str, Any]:
+        """Model and sampling parameters that shape the response (part of the cache key)"""
+        return {"worker": type(self).__name__, "model": self.model}
+    
+    def _cache_key(self, prompt: str, system_prompt: str = None) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return ResponseCache.make_key(
+            prompt=prompt,
+            system_prompt=system_prompt or self.DEFAULT_SYSTEM_PROMPT,
+            **self._cache_params()
+        )
+    
+    def _cache_lookup(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        hit = self.cache.get(key)
+        if hit is None:
+            return None
+        self.stats.cache_hits += 1
+        return hit[0]
+    
+    def _cache_store(self, key: Optional[str], response: str, tokens: int):
+        if key is not None and response:
+            self.cache.put(key, response, tokens, model=self.model)
+    
+    # ------------------------------------------------------------------
+    # Rate limiting - wait for budget before sending
+    # ------------------------------------------------------------------
+    
+    def _token_reservation(self, prompt: str, system_prompt: str, max_tokens: int) -> int:
+        """Tokens a request may consume: prompt estimate plus its max_tokens"""
+        return (get_token_accountant().count_prompt(prompt, system_prompt or self.DEFAULT_SYSTEM_PROMPT, self.model)
+                + max_tokens)
+    
+    def _record_wait(self, waited: float):
+        if waited > 0:
+            self.stats.rate_limit_waits += 1
+            self.stats.rate_limit_wait_time += waited
+    
+    def _acquire_rate_limit(self, prompt: str, system_prompt: str, max_tokens: int) -> int:
+        if self.rate_limiter is None:
+            return 0
+        reserved = self._token_reservation(prompt, system_prompt, max_tokens)
+        self._record_wait(self.rate_limiter.acquire(reserved))
+        return reserved
+    
+    async def _acquire_rate_limit_async(self, prompt: str, system_prompt: str, max_tokens: int) -> int:
+        if self.rate_limiter is None:
+            return 0
+        reserved = self._token_reservation(prompt, system_prompt, max_tokens)
+        self._record_wait(await self.rate_limiter.acquire_async(reserved))
+        return reserved
+    
+    def _settle_rate_limit(self, reserved: int, actual: int):
+        if self.rate_limiter is not None:
+            self.rate_limiter.settle(reserved, actual)
+        if self.ledger is not None:
+            self.ledger.record(self.PROVIDER, self.key_id, self.model, tokens=actual)
+    
+    def quota_used_today(self) -> Tuple[int, int]:
+        """(requests, tokens) this worker's key/model has spent in the current daily window"""
+        if self.ledger is None:
+            return 0, 0
+        # OpenRouter's daily cap is per key across every free model
+        model = None if self.PROVIDER == "openrouter" else self.model
+        return self.ledger.usage(self.PROVIDER, self.key_id, model)
+    
+    def _charge_abandoned(self, prompt: str, system_prompt: Optional[str], usage: StreamUsage,
+                          sent: bool):
+        """A stream closed early (e.g. it lost a hedge) was still billed for its prompt"""
+        if sent and not usage.tokens:
+            usage.tokens = (get_token_accountant().count_prompt(
+                prompt, system_prompt or self.DEFAULT_SYSTEM_PROMPT, self.model
+            ) + usage.completion_tokens)
+    
+    # ------------------------------------------------------------------
+    # Execution - one request per call of a _send* method; execute*
+    # continue a reply cut off at max_tokens with follow-up requests
+    # ------------------------------------------------------------------
+    
+    def _send(self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int],
+              usage: StreamUsage) -> Tuple[str, int]:
+        """
+        One request through the circuit breaker, concurrency and rate limits.
+        A request refused before it is sent gives back the half-open probe it
+        claimed, so the breaker can try again once quota is back.
+        """
+        max_tokens = self._completion_tokens(prompt, system_prompt, max_tokens)
+        probe = self._check_circuit()
+        self.concurrency.acquire()
+        reserved, sent = 0, False
+        try:
+            reserved = self._acquire_rate_limit(prompt, system_prompt, max_tokens)
+            sent = True
+            response, tokens = self._execute(prompt, system_prompt, max_tokens, usage)
+        except Exception as e:
+            self.concurrency.release(e)
+            if sent:
+                self._settle_rate_limit(reserved, 0)
+            elif probe:
+                self.breaker.release_probe()
+            raise
+        self.concurrency.release()
+        self._settle_rate_limit(reserved, tokens)
+        return response, tokens
+    
+    async def _send_async(self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int],
+                          usage: StreamUsage) -> Tuple[str, int]:
+        """Async counterpart of _send; a cancelled request also gives back the probe"""
+        max_tokens = self._completion_tokens(prompt, system_prompt, max_tokens)
+        probe = self._check_circuit()
+        try:
+            await self.concurrency.acquire_async()
+        except asyncio.CancelledError:
+            if probe:
+                self.breaker.release_probe()
+            raise
+        reserved, sent = 0, False
+        try:
+            reserved = await self._acquire_rate_limit_async(prompt, system_prompt, max_tokens)
+            sent = True
+            response, tokens = await self._execute_async(prompt, system_prompt, max_tokens, usage)
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else None
+            self.concurrency.release(error)
+            if sent:
+                self._settle_rate_limit(reserved, 0)
+            if probe and (not sent or error is None):
+                self.breaker.release_probe()
+            raise
+        self.concurrency.release()
+        self._settle_rate_limit(reserved, tokens)
+        return response, tokens
+    
+    def _send_stream(self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int],
+                     usage: StreamUsage) -> Iterator[str]:
+        """One streamed request; an abandoned stream is still charged for its prompt"""
+        max_tokens = self._completion_tokens(prompt, system_prompt, max_tokens)
+        probe = self._check_circuit()
+        self.concurrency.acquire()
+        error = None
+        reserved, sent = 0, False  # Nothing is charged for a stream refused before sending
+        try:
+            reserved = self._acquire_rate_limit(prompt, system_prompt, max_tokens)
+            sent = True
+            yield from self._execute_stream(prompt, system_prompt, usage=usage, max_tokens=max_tokens)
+        except GeneratorExit as e:
+            error = e
+            self._charge_abandoned(prompt, system_prompt, usage, sent)
+            if probe:
+                self.breaker.release_probe()
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.concurrency.release(error)
+            if sent:
+                self._settle_rate_limit(reserved, usage.tokens)
+            elif probe:
+                self.breaker.release_probe()  # Refused before sending
+    
+    async def _send_stream_async(self, prompt: str, system_prompt: Optional[str],
+                                 max_tokens: Optional[int], usage: StreamUsage) -> AsyncIterator[str]:
+        """Async counterpart of _send_stream"""
+        max_tokens = self._completion_tokens(prompt, system_prompt, max_tokens)
+        probe = self._check_circuit()
+        try:
+            await self.concurrency.acquire_async()
+        except asyncio.CancelledError:
+            if probe:
+                self.breaker.release_probe()
+            raise
+        error = None
+        reserved, sent = 0, False
+        try:
+            reserved = await self._acquire_rate_limit_async(prompt, system_prompt, max_tokens)
+            sent = True
+            stream = self._execute_stream_async(prompt, system_prompt, usage=usage, max_tokens=max_tokens)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+        except (GeneratorExit, asyncio.CancelledError) as e:
+            error = e
+            self._charge_abandoned(prompt, system_prompt, usage, sent)
+            if probe:
+                self.breaker.release_probe()
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.concurrency.release(error)
+            if sent:
+                self._settle_rate_limit(reserved, usage.tokens)
+            elif probe:
+                self.breaker.release_probe()  # Refused before sending
+    
+    def _record_continuations(self, continuations: int, truncated: bool):
+        self.stats.continuations += continuations
+        if truncated:
+            self.stats.truncated_responses += 1
+    
+    def execute(self, prompt: str, system_prompt: str = None,
+                max_tokens: Optional[int] = None,
+                usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        """
+        Execute prompt, return (response, tokens_used). Cache hits use no tokens.
+        `max_tokens` is the expected reply size; by default MAX_TOKENS. A reply
+        cut off at that size is continued (up to MAX_CONTINUATIONS times);
+        `usage.truncated` tells whether it is still cut off.
+        """
+        usage = usage if usage is not None else StreamUsage()
+        key = self._cache_key(prompt, system_prompt)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            return cached, 0
+        response, tokens = self._send(prompt, system_prompt, max_tokens, usage)
+        truncated, continuations = usage.truncated, 0
+        while truncated and continuations < MAX_CONTINUATIONS:
+            segment = StreamUsage()
+            try:
+                more, more_tokens = self._send(continuation_prompt(prompt, response), system_prompt,
+                                               max_tokens, segment)
+            except PromptTooLargeError:
+                break
+            usage.add(segment)
+            response, tokens = stitch(response, more), tokens + more_tokens
+            truncated, continuations = segment.truncated and bool(more), continuations + 1
+        self._record_continuations(continuations, truncated)
+        if not truncated:
+            self._cache_store(key, response, tokens)
+        return response, tokens
+    
+    async def execute_async(self, prompt: str, system_prompt: str = None,
+                            max_tokens: Optional[int] = None,
+                            usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        """Execute prompt without blocking the event loop, return (response, tokens_used)"""
+        usage = usage if usage is not None else StreamUsage()
+        key = self._cache_key(prompt, system_prompt)
+        cached = await asyncio.to_thread(self._cache_lookup, key) if key else None
+        if cached is not None:
+            return cached, 0
+        response, tokens = await self._send_async(prompt, system_prompt, max_tokens, usage)
+        truncated, continuations = usage.truncated, 0
+        while truncated and continuations < MAX_CONTINUATIONS:
+            segment = StreamUsage()
+            try:
+                more, more_tokens = await self._send_async(continuation_prompt(prompt, response),
+                                                           system_prompt, max_tokens, segment)
+            except PromptTooLargeError:
+                break
+            usage.add(segment)
+            response, tokens = stitch(response, more), tokens + more_tokens
+            truncated, continuations = segment.truncated and bool(more), continuations + 1
+        self._record_continuations(continuations, truncated)
+        if key and not truncated:
+            await asyncio.to_thread(self._cache_store, key, response, tokens)
+        return response, tokens
+    
+    def execute_stream(self, prompt: str, system_prompt: str = None,
+                       usage: Optional[StreamUsage] = None,
+                       max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield response chunks as they arrive.
+        
+        Token counts and timings are written to `usage` once the stream ends.
+        A cache hit is yielded as a single chunk. A reply cut off at max_tokens
+        goes on streaming from follow-up requests, minus any text they repeat.
+        """
+        usage = usage if usage is not None else StreamUsage()
+        key = self._cache_key(prompt, system_prompt)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            usage.time_to_first_token = 0.0
+            yield cached
+            return
+        parts = []
+        stream = self._send_stream(prompt, system_prompt, max_tokens, usage)
+        try:
+            for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        finally:
+            stream.close()
+        truncated, continuations = usage.truncated, 0
+        while truncated and continuations < MAX_CONTINUATIONS:
+            so_far = "".join(parts)
+            segment = StreamUsage()
+            stream = trim_stream(so_far, self._send_stream(
+                continuation_prompt(prompt, so_far), system_prompt, max_tokens, segment
+            ))
+            try:
+                for chunk in stream:
+                    parts.append(chunk)
+                    yield chunk
+            except PromptTooLargeError:
+                break
+            finally:
+                stream.close()
+                usage.add(segment)
+            truncated, continuations = segment.truncated and segment.chunks > 0, continuations + 1
+        self._record_continuations(continuations, truncated)
+        if not truncated:
+            self._cache_store(key, "".join(parts), usage.tokens)
+    
+    async def execute_stream_async(self, prompt: str, system_prompt: str = None,
+                                   usage: Optional[StreamUsage] = None,
+                                   max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """Async counterpart of execute_stream"""
+        usage = usage if usage is not None else StreamUsage()
+        key = self._cache_key(prompt, system_prompt)
+        cached = await asyncio.to_thread(self._cache_lookup, key) if key else None
+        if cached is not None:
+            usage.time_to_first_token = 0.0
+            yield cached
+            return
+        parts = []
+        stream = self._send_stream_async(prompt, system_prompt, max_tokens, usage)
+        try:
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        truncated, continuations = usage.truncated, 0
+        while truncated and continuations < MAX_CONTINUATIONS:
+            so_far = "".join(parts)
+            segment = StreamUsage()
+            stream = trim_stream_async(so_far, self._send_stream_async(
+                continuation_prompt(prompt, so_far), system_prompt, max_tokens, segment
+            ))
+            try:
+                async for chunk in stream:
+                    parts.append(chunk)
+                    yield chunk
+            except PromptTooLargeError:
+                break
+            finally:
+                await stream.aclose()
+                usage.add(segment)
+            truncated, continuations = segment.truncated and segment.chunks > 0, continuations + 1
+        self._record_continuations(continuations, truncated)
+        if key and not truncated:
+            await asyncio.to_thread(self._cache_store, key, "".join(parts), usage.tokens)
+    
     def is_available(self) -> bool:
-        """Check if worker is available (not rate limited)"""
-        if self.stats.rate_limit_reset:
-            if datetime.now() < self.stats.rate_limit_reset:
-                return False
-            self.stats.rate_limit_reset = None
+        """Check if worker is available (circuit not open, not rate limited)"""
+        if self.breaker.is_open():
+            return False
+        self.stats.rate_limit_reset = None
         return self.stats.is_available
     
-    def record_success(self, tokens: int, response_time: float):
+    def _check_circuit(self) -> bool:
+        """
+        Refuse to send while the circuit is open. When half-open this request
+        claims the probe; returns True if it did.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(
+                f"{self.worker_type.value} circuit is {self.breaker.state.value}; not sending"
+            )
+        return self.breaker.state == CircuitState.HALF_OPEN
+    
+    def _account(self, prompt: str, system_prompt: Optional[str], completion: str,
+                 reported: Optional[TokenUsage], completion_tokens: Optional[int] = None) -> TokenUsage:
+        """Usage of a finished response: the provider's numbers if reported, else calibrated estimates"""
+        return get_token_accountant().account(
+            self.model, prompt, system_prompt or self.DEFAULT_SYSTEM_PROMPT,
+            completion, reported, completion_tokens,
+        )
+    
+    def _finish_stream(self, prompt: str, system_prompt: Optional[str], usage: StreamUsage,
+                       start_time: float):
+        """Settle a stream's token usage (reported or estimated), then record stats"""
+        reported = (TokenUsage(usage.prompt_tokens, usage.completion_tokens, usage.tokens, exact=True)
+                    if usage.exact else None)
+        final = self._account(prompt, system_prompt, "", reported, usage.completion_tokens)
+        usage.prompt_tokens = final.prompt_tokens
+        usage.completion_tokens = final.completion_tokens
+        usage.tokens = final.total_tokens
+        self.record_stream(usage, time.time() - start_time)
+    
+    def record_success(self, tokens: int, response_time: float, estimated: bool = False):
         """Record successful request"""
+        self.breaker.record_success()
         self.stats.total_requests += 1
         self.stats.successful_requests += 1
         self.stats.total_tokens += tokens
+        if estimated:
+            self.stats.estimated_tokens += tokens
         self.stats.last_used = datetime.now()
         # Update rolling average
         n = self.stats.successful_requests
         self.stats.avg_response_time = (
             (self.stats.avg_response_time * (n - 1) + response_time) / n
         )
+        # Recent-behaviour averages used by LoadBalancer scoring
+        a = self.EWMA_ALPHA
+        self.stats.ewma_latency = (
+            response_time if n == 1 else a * response_time + (1 - a) * self.stats.ewma_latency
+        )
+        self.stats.ewma_error_rate *= (1 - a)
+    
+    def record_stream(self, usage: StreamUsage, response_time: float):
+        """Record a completed stream, including time-to-first-token and throughput"""
+        ttft = usage.time_to_first_token if usage.time_to_first_token is not None else response_time
+        generation_time = response_time - ttft
+        if generation_time > 0:
+            usage.tokens_per_second = usage.completion_tokens / generation_time
+        
+        self.record_success(usage.tokens, response_time, estimated=not usage.exact)
+        self.ttft_samples.append(ttft)
+        self.stats.streamed_requests += 1
+        n = self.stats.streamed_requests
+        self.stats.avg_time_to_first_token = (
+            (self.stats.avg_time_to_first_token * (n - 1) + ttft) / n
+        )
+        self.stats.avg_tokens_per_second = (
+            (self.stats.avg_tokens_per_second * (n - 1) + usage.tokens_per_second) / n
+        )
+    
+    def ttft_percentile(self, percentile: float) -> Optional[float]:
+        """Time-to-first-token at the given percentile (0-1) of recent streams, if known"""
+        if len(self.ttft_samples) < self.TTFT_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.ttft_samples)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
     
-    def record_failure(self, error: str):
-        """Record failed request"""
+    def record_failure(self, error: BaseException):
+        """Record failed request and trip the circuit breaker if needed"""
         self.stats.total_requests += 1
         self.stats.failed_requests += 1
         self.stats.last_used = datetime.now()
+        a = self.EWMA_ALPHA
+        self.stats.ewma_error_rate = a + (1 - a) * self.stats.ewma_error_rate
         
-        # Check for rate limit errors
-        if "rate" in error.lower() or "429" in error:
-            self.stats.rate_limit_reset = datetime.now() + timedelta(minutes=1)
+        open_for = self.breaker.record_failure(
+            rate_limited=is_rate_limit_error(error),
+            retry_after=parse_retry_after(error),
+        )
+        if open_for is not None:
+            self.stats.rate_limit_reset = datetime.now() + timedelta(seconds=open_for)
 
 
 # ============================================================================
@@ -347,53 +1844,292 @@ class AIWorker(ABC):
 class GeminiWorker(AIWorker):
     """Google Gemini worker - 1M+ tokens/day free"""
     
-    MODEL_MAP = {
-        WorkerType.GEMINI_FLASH: "gemini-2.0-flash",
-        WorkerType.GEMINI_PRO: "gemini-2.5-pro-preview-05-06",
-    }
+    PROVIDER = "gemini"
+    MODEL_MAP = {
+        WorkerType.GEMINI_FLASH: "gemini-2.0-flash",
+        WorkerType.GEMINI_PRO: "gemini-2.5-pro-preview-05-06",
+    }
+    
+    def _setup(self):
+        try:
+            import google.generativeai as genai
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                raise ValueError("GOOGLE_API_KEY not set")
+            genai.configure(api_key=api_key)
+            self.api_key = api_key
+            self.genai = genai
+            self.model_name = self.MODEL_MAP.get(self.worker_type, "gemini-2.0-flash")
+            self.model = self.model_name
+        except ImportError:
+            raise ImportError("Install google-generativeai: pip install google-generativeai")
+    
+    def _get_model(self, system_prompt: str = None):
+        return self.genai.GenerativeModel(
+            self.model_name,
+            system_instruction=system_prompt or self.DEFAULT_SYSTEM_PROMPT
+        )
+    
+    def _generation_config(self, max_tokens: Optional[int]) -> Dict[str, Any]:
+        return {"max_output_tokens": max_tokens or self.max_completion_tokens()}
+    
+    @staticmethod
+    def _finish_reason(response) -> Optional[str]:
+        """Finish reason name of the first candidate ("STOP", "MAX_TOKENS", ...), if given"""
+        candidates = getattr(response, "candidates", None)
+        reason = getattr(candidates[0], "finish_reason", None) if candidates else None
+        return getattr(reason, "name", None) or (str(reason) if reason else None)
+    
+    def _handle_response(self, prompt: str, system_prompt: Optional[str], response,
+                         start_time: float, usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        elapsed = time.time() - start_time
+        
+        # usage_metadata when the response has it, calibrated estimate otherwise
+        tokens = self._account(prompt, system_prompt, response.text, usage_from_response(response))
+        self.record_success(tokens.total_tokens, elapsed, estimated=not tokens.exact)
+        if usage is not None:
+            usage.finish_reason = self._finish_reason(response)
+        
+        return response.text, tokens.total_tokens
+    
+    def _execute(self, prompt: str, system_prompt: str = None, max_tokens: Optional[int] = None,
+                 usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        start_time = time.time()
+        try:
+            response = self._get_model(system_prompt).generate_content(
+                prompt, generation_config=self._generation_config(max_tokens)
+            )
+            return self._handle_response(prompt, system_prompt, response, start_time, usage)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+    
+    async def _execute_async(self, prompt: str, system_prompt: str = None, max_tokens: Optional[int] = None,
+                             usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        start_time = time.time()
+        try:
+            response = await self._get_model(system_prompt).generate_content_async(
+                prompt, generation_config=self._generation_config(max_tokens)
+            )
+            return self._handle_response(prompt, system_prompt, response, start_time, usage)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+    
+    def _track_chunk(self, chunk, usage: StreamUsage, start_time: float) -> str:
+        text = chunk.text or ""
+        if text:
+            if usage.time_to_first_token is None:
+                usage.time_to_first_token = time.time() - start_time
+            usage.chunks += 1
+            if not usage.exact:
+                usage.completion_tokens += self.count_tokens(text)
+        reason = self._finish_reason(chunk)
+        if reason:
+            usage.finish_reason = reason
+        # usage_metadata is cumulative; the last chunk carries the totals
+        reported = usage_from_response(chunk)
+        if reported is not None:
+            usage.prompt_tokens = reported.prompt_tokens
+            usage.completion_tokens = reported.completion_tokens
+            usage.tokens = reported.total_tokens
+            usage.exact = True
+        return text
+    
+    def _execute_stream(self, prompt: str, system_prompt: str = None,
+                       usage: Optional[StreamUsage] = None,
+                       max_tokens: Optional[int] = None) -> Iterator[str]:
+        usage = usage if usage is not None else StreamUsage()
+        start_time = time.time()
+        try:
+            response = self._get_model(system_prompt).generate_content(
+                prompt, stream=True, generation_config=self._generation_config(max_tokens)
+            )
+            for chunk in response:
+                text = self._track_chunk(chunk, usage, start_time)
+                if text:
+                    yield text
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self._finish_stream(prompt, system_prompt, usage, start_time)
+    
+    async def _execute_stream_async(self, prompt: str, system_prompt: str = None,
+                                   usage: Optional[StreamUsage] = None,
+                                   max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        usage = usage if usage is not None else StreamUsage()
+        start_time = time.time()
+        try:
+            response = await self._get_model(system_prompt).generate_content_async(
+                prompt, stream=True, generation_config=self._generation_config(max_tokens)
+            )
+            async for chunk in response:
+                text = self._track_chunk(chunk, usage, start_time)
+                if text:
+                    yield text
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self._finish_stream(prompt, system_prompt, usage, start_time)
+
+
+
+from datetime import timedelta
+
+# ============================================================================
+# OPENAI-COMPATIBLE BASE (Groq, Cerebras, OpenRouter, OpenCode)
+# ============================================================================
+
+class OpenAICompatibleWorker(AIWorker):
+    """Shared request logic for providers exposing the OpenAI chat completions API"""
+    
+    BASE_URL = ""
+    DEFAULT_MODEL = ""
+    EXTRA_HEADERS: Dict[str, str] = {}
+    MODEL_MAP: Dict[WorkerType, str] = {}
+    
+    def _create_clients(self, api_key: str):
+        """Attach to the shared connection pool for this provider's host"""
+        self.api_key = api_key
+        self.client = get_openai_client(api_key, self.BASE_URL)
+        self.model = self.MODEL_MAP.get(self.worker_type, self.DEFAULT_MODEL)
+    
+    def _get_async_client(self):
+        """Get the pooled AsyncOpenAI client bound to the running event loop"""
+        return get_async_openai_client(self.api_key, self.BASE_URL)
+    
+    def _cache_params(self) -> Dict[str, Any]:
+        # max_tokens is sized per request and only caps the length, so it is not part of the key
+        return {
+            "worker": type(self).__name__,
+            "base_url": self.BASE_URL,
+            "model": self.model,
+            "temperature": 0.7,
+        }
+    
+    def _request_kwargs(self, prompt: str, system_prompt: str = None,
+                        max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Build chat completion arguments"""
+        kwargs = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt or self.DEFAULT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens or self.max_completion_tokens(),
+            "temperature": 0.7,
+        }
+        if self.EXTRA_HEADERS:
+            kwargs["extra_headers"] = self.EXTRA_HEADERS
+        return kwargs
+    
+    def _handle_response(self, prompt: str, system_prompt: Optional[str], response,
+                         start_time: float, usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        """Record stats and extract (text, tokens) from a completion"""
+        elapsed = time.time() - start_time
+        choice = response.choices[0]
+        text = choice.message.content
+        tokens = self._account(prompt, system_prompt, text or "", usage_from_response(response))
+        self.record_success(tokens.total_tokens, elapsed, estimated=not tokens.exact)
+        if usage is not None:
+            usage.finish_reason = choice.finish_reason
+        return text, tokens.total_tokens
+    
+    def _execute(self, prompt: str, system_prompt: str = None, max_tokens: Optional[int] = None,
+                 usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        start_time = time.time()
+        try:
+            response = self.client.chat.completions.create(
+                **self._request_kwargs(prompt, system_prompt, max_tokens)
+            )
+            return self._handle_response(prompt, system_prompt, response, start_time, usage)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+    
+    async def _execute_async(self, prompt: str, system_prompt: str = None, max_tokens: Optional[int] = None,
+                             usage: Optional[StreamUsage] = None) -> Tuple[str, int]:
+        start_time = time.time()
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                **self._request_kwargs(prompt, system_prompt, max_tokens)
+            )
+            return self._handle_response(prompt, system_prompt, response, start_time, usage)
+        except Exception as e:
+            self.record_failure(e)
+            raise
     
-    def _setup(self):
+    def _track_chunk(self, chunk, usage: StreamUsage, start_time: float) -> str:
+        """Update usage from one stream chunk and return its text"""
+        reported = usage_from_response(chunk)  # Final chunk: usage, or Groq's x_groq.usage
+        if reported is not None:
+            usage.prompt_tokens = reported.prompt_tokens
+            usage.completion_tokens = reported.completion_tokens
+            usage.tokens = reported.total_tokens
+            usage.exact = True
+        if not chunk.choices:
+            return ""
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            usage.finish_reason = choice.finish_reason
+        text = choice.delta.content or ""
+        if text:
+            if usage.time_to_first_token is None:
+                usage.time_to_first_token = time.time() - start_time
+            usage.chunks += 1
+            if not usage.exact:
+                usage.completion_tokens += self.count_tokens(text)
+        return text
+    
+    def _execute_stream(self, prompt: str, system_prompt: str = None,
+                       usage: Optional[StreamUsage] = None,
+                       max_tokens: Optional[int] = None) -> Iterator[str]:
+        usage = usage if usage is not None else StreamUsage()
+        start_time = time.time()
         try:
-            import google.generativeai as genai
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                raise ValueError("GOOGLE_API_KEY not set")
-            genai.configure(api_key=api_key)
-            self.genai = genai
-            self.model_name = self.MODEL_MAP.get(self.worker_type, "gemini-2.0-flash")
-        except ImportError:
-            raise ImportError("Install google-generativeai: pip install google-generativeai")
+            stream = self.client.chat.completions.create(
+                stream=True, stream_options={"include_usage": True},
+                **self._request_kwargs(prompt, system_prompt, max_tokens)
+            )
+            for chunk in stream:
+                text = self._track_chunk(chunk, usage, start_time)
+                if text:
+                    yield text
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self._finish_stream(prompt, system_prompt, usage, start_time)
     
-    def execute(self, prompt: str, system_prompt: str = None) -> Tuple[str, int]:
+    async def _execute_stream_async(self, prompt: str, system_prompt: str = None,
+                                   usage: Optional[StreamUsage] = None,
+                                   max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        usage = usage if usage is not None else StreamUsage()
         start_time = time.time()
         try:
-            model = self.genai.GenerativeModel(
-                self.model_name,
-                system_instruction=system_prompt or "You are an expert software developer."
+            stream = await self._get_async_client().chat.completions.create(
+                stream=True, stream_options={"include_usage": True},
+                **self._request_kwargs(prompt, system_prompt, max_tokens)
             )
-            response = model.generate_content(prompt)
-            elapsed = time.time() - start_time
-            
-            # Estimate tokens (Gemini doesn't always provide exact count)
-            tokens = len(prompt.split()) + len(response.text.split())
-            self.record_success(tokens, elapsed)
-            
-            return response.text, tokens
+            async for chunk in stream:
+                text = self._track_chunk(chunk, usage, start_time)
+                if text:
+                    yield text
         except Exception as e:
-            self.record_failure(str(e))
+            self.record_failure(e)
             raise
+        self._finish_stream(prompt, system_prompt, usage, start_time)
 
 
-
-from datetime import timedelta
-
 # ============================================================================
 # GROQ WORKER (Blazing fast inference)
 # ============================================================================
 
-class GroqWorker(AIWorker):
+class GroqWorker(OpenAICompatibleWorker):
     """Groq worker - Extremely fast, generous free tier"""
     
+    PROVIDER = "groq"
+    BASE_URL = "https://api.groq.com/openai/v1"
+    DEFAULT_MODEL = "llama-3.3-70b-versatile"
     MODEL_MAP = {
         WorkerType.GROQ_LLAMA70B: "llama-3.3-70b-versatile",
         WorkerType.GROQ_LLAMA8B: "llama-3.1-8b-instant",
@@ -402,79 +2138,32 @@ class GroqWorker(AIWorker):
     }
     
     def _setup(self):
-        from openai import OpenAI
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("GROQ_API_KEY not set. Get free key at: https://console.groq.com")
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.groq.com/openai/v1"
-        )
-        self.model = self.MODEL_MAP.get(self.worker_type, "llama-3.3-70b-versatile")
-    
-    def execute(self, prompt: str, system_prompt: str = None) -> Tuple[str, int]:
-        start_time = time.time()
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt or "You are an expert software developer."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=8192,
-                temperature=0.7
-            )
-            elapsed = time.time() - start_time
-            tokens = response.usage.total_tokens if response.usage else 0
-            self.record_success(tokens, elapsed)
-            return response.choices[0].message.content, tokens
-        except Exception as e:
-            self.record_failure(str(e))
-            raise
+        self._create_clients(api_key)
 
 
 # ============================================================================
 # CEREBRAS WORKER (Fast inference, very generous limits)
 # ============================================================================
 
-class CerebrasWorker(AIWorker):
+class CerebrasWorker(OpenAICompatibleWorker):
     """Cerebras worker - Fast inference with generous free tier"""
     
+    PROVIDER = "cerebras"
+    BASE_URL = "https://api.cerebras.ai/v1"
+    DEFAULT_MODEL = "llama-3.3-70b"
     MODEL_MAP = {
         WorkerType.CEREBRAS_LLAMA: "llama-3.3-70b",
         WorkerType.CEREBRAS_QWEN: "qwen-3-32b",
     }
     
     def _setup(self):
-        from openai import OpenAI
         api_key = os.getenv("CEREBRAS_API_KEY")
         if not api_key:
             raise ValueError("CEREBRAS_API_KEY not set. Get free key at: https://cloud.cerebras.ai")
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.cerebras.ai/v1"
-        )
-        self.model = self.MODEL_MAP.get(self.worker_type, "llama-3.3-70b")
-    
-    def execute(self, prompt: str, system_prompt: str = None) -> Tuple[str, int]:
-        start_time = time.time()
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt or "You are an expert software developer."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=8192,
-                temperature=0.7
-            )
-            elapsed = time.time() - start_time
-            tokens = response.usage.total_tokens if response.usage else 0
-            self.record_success(tokens, elapsed)
-            return response.choices[0].message.content, tokens
-        except Exception as e:
-            self.record_failure(str(e))
-            raise
+        self._create_clients(api_key)
 
 
 
@@ -482,9 +2171,16 @@ class CerebrasWorker(AIWorker):
 # OPENROUTER WORKER (Many free models, single API)
 # ============================================================================
 
-class OpenRouterWorker(AIWorker):
+class OpenRouterWorker(OpenAICompatibleWorker):
     """OpenRouter worker - Access to many free models via single API"""
     
+    PROVIDER = "openrouter"
+    BASE_URL = "https://openrouter.ai/api/v1"
+    DEFAULT_MODEL = "deepseek/deepseek-chat-v3-0324:free"
+    EXTRA_HEADERS = {
+        "HTTP-Referer": "https://sga-qa-system.vercel.app",
+        "X-Title": "SGA QA System"
+    }
     MODEL_MAP = {
         WorkerType.OPENROUTER_DEEPSEEK_R1: "deepseek/deepseek-r1:free",
         WorkerType.OPENROUTER_DEEPSEEK_V3: "deepseek/deepseek-chat-v3-0324:free",
@@ -497,40 +2193,11 @@ class OpenRouterWorker(AIWorker):
         super().__init__(worker_type)
     
     def _setup(self):
-        from openai import OpenAI
         key_name = f"OPENROUTER_API_KEY_{self.account_num}"
         api_key = os.getenv(key_name) or os.getenv("OPENROUTER_API_KEY")
         if not api_key:
             raise ValueError(f"{key_name} not set. Get free key at: https://openrouter.ai")
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
-        )
-        self.model = self.MODEL_MAP.get(self.worker_type, "deepseek/deepseek-chat-v3-0324:free")
-    
-    def execute(self, prompt: str, system_prompt: str = None) -> Tuple[str, int]:
-        start_time = time.time()
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt or "You are an expert software developer."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=8192,
-                temperature=0.7,
-                extra_headers={
-                    "HTTP-Referer": "https://sga-qa-system.vercel.app",
-                    "X-Title": "SGA QA System"
-                }
-            )
-            elapsed = time.time() - start_time
-            tokens = response.usage.total_tokens if response.usage else 0
-            self.record_success(tokens, elapsed)
-            return response.choices[0].message.content, tokens
-        except Exception as e:
-            self.record_failure(str(e))
-            raise
+        self._create_clients(api_key)
 
 
 
@@ -538,45 +2205,26 @@ class OpenRouterWorker(AIWorker):
 # OPENCODE (GROK) WORKER - Your existing workers
 # ============================================================================
 
-class OpenCodeWorker(AIWorker):
+class OpenCodeWorker(OpenAICompatibleWorker):
     """OpenCode (Grok) worker - Your existing accounts"""
     
+    PROVIDER = "opencode"
+    BASE_URL = "https://api.opencode.ai/v1"
+    DEFAULT_MODEL = "x-ai/grok-code-fast-1"
+    DEFAULT_SYSTEM_PROMPT = "You are Grok, an expert software developer."
+    MAX_TOKENS = 4096
+    
     def __init__(self, worker_type: WorkerType, account_num: int = 1):
         self.account_num = account_num
         super().__init__(worker_type)
     
     def _setup(self):
-        from openai import OpenAI
         key_name = f"OPENCODE_API_KEY_{self.account_num}"
         # Also check legacy key names
         api_key = os.getenv(key_name) or os.getenv("OPENCODE_API_KEY")
         if not api_key:
             raise ValueError(f"{key_name} not set")
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.opencode.ai/v1"
-        )
-        self.model = "x-ai/grok-code-fast-1"
-    
-    def execute(self, prompt: str, system_prompt: str = None) -> Tuple[str, int]:
-        start_time = time.time()
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt or "You are Grok, an expert software developer."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=4096,
-                temperature=0.7
-            )
-            elapsed = time.time() - start_time
-            tokens = response.usage.total_tokens if response.usage else 0
-            self.record_success(tokens, elapsed)
-            return response.choices[0].message.content, tokens
-        except Exception as e:
-            self.record_failure(str(e))
-            raise
+        self._create_clients(api_key)
 
 
 # ============================================================================
@@ -632,18 +2280,63 @@ class LoadBalancer:
     Strategies:
     - Round-robin: Distribute evenly across workers
     - Least-loaded: Send to worker with fewest pending tasks
-    - Best-fit: Match task type to best worker
+    - Scored: Rank by recent latency, error rate, quota headroom and load
+    - Best-fit: Match task type to best worker (scored within the match)
     - Failover: Automatically retry with fallback workers
     """
     
+    DEFAULT_LATENCY = 5.0      # Assumed latency (s) for workers with no history yet
+    PREFERENCE_PENALTY = 0.15  # Score penalty per step down a best-fit preference list
+    
     def __init__(self, workers: Dict[WorkerType, AIWorker]):
         self.workers = workers
         self.task_counts: Dict[WorkerType, int] = {w: 0 for w in workers}
         self.round_robin_index = 0
+        self.quota_reset: Dict[WorkerType, datetime] = {}
+        self._load_quota()
+    
+    def _load_quota(self):
+        """
+        Seed each worker's daily budget from the quota ledger, so a run starts
+        from what earlier runs already spent today. Workers with nothing left
+        are skipped until their provider's daily reset.
+        """
+        for worker_type, worker in self.workers.items():
+            if worker.ledger is None or worker.rate_limiter is None:
+                continue
+            requests, tokens = worker.quota_used_today()
+            if not requests and not tokens:
+                continue
+            worker.rate_limiter.preload_daily(requests, tokens)
+            self._quota_exhausted(worker_type)
+    
+    def _quota_exhausted(self, worker_type: WorkerType) -> bool:
+        """
+        True until the provider's daily reset once the worker's daily budget
+        runs out - at startup or mid-run, so tasks go elsewhere instead of
+        waiting on the daily bucket
+        """
+        limiter = self.workers[worker_type].rate_limiter
+        reset_at = self.quota_reset.get(worker_type)
+        if reset_at is not None:
+            if datetime.now() < reset_at:
+                return True
+            self.quota_reset.pop(worker_type, None)
+            if limiter is not None:
+                limiter.refill_daily()
+        if limiter is None or not limiter.daily_exhausted():
+            return False
+        _, resets_at = quota_window(self.workers[worker_type].PROVIDER)
+        self.quota_reset[worker_type] = resets_at.astimezone().replace(tzinfo=None)
+        print(f"  ⏳ {worker_type.value}: daily quota used up until {self.quota_reset[worker_type]:%H:%M}")
+        return True
     
     def get_available_workers(self) -> List[WorkerType]:
-        """Get list of available workers"""
-        return [w for w, worker in self.workers.items() if worker.is_available()]
+        """Get list of available workers (skips open circuits and exhausted daily quotas)"""
+        return [
+            w for w, worker in self.workers.items()
+            if worker.is_available() and not self._quota_exhausted(w)
+        ]
     
     def select_worker_round_robin(self, preferred_types: List[WorkerType] = None) -> Optional[WorkerType]:
         """Select worker using round-robin strategy"""
@@ -666,8 +2359,37 @@ class LoadBalancer:
         
         return min(available, key=lambda w: self.task_counts[w])
     
-    def select_worker_best_fit(self, task: Task) -> Optional[WorkerType]:
-        """Select best worker for the task based on task type"""
+    def score_worker(self, worker_type: WorkerType) -> float:
+        """
+        Score a worker - lower is better.
+        
+        Roughly the expected wait: EWMA latency scaled up by tasks already in
+        flight, and divided by recent reliability and remaining quota, so a
+        slow, failing or nearly exhausted provider drops down within a few
+        requests.
+        """
+        worker = self.workers[worker_type]
+        stats = worker.stats
+        latency = stats.ewma_latency if stats.successful_requests else self.DEFAULT_LATENCY
+        load = 1 + self.task_counts.get(worker_type, 0)
+        reliability = max(0.05, 1.0 - stats.ewma_error_rate)
+        headroom = max(0.05, worker.rate_limiter.headroom()) if worker.rate_limiter else 1.0
+        return latency * load / (reliability * headroom)
+    
+    def select_worker_scored(self, preferred_types: List[WorkerType] = None) -> Optional[WorkerType]:
+        """Select the best-scoring available worker (earlier preferences get a small bonus)"""
+        available = set(self.get_available_workers())
+        candidates = [w for w in (preferred_types or self.workers) if w in available]
+        if not candidates:
+            return None
+        penalty = self.PREFERENCE_PENALTY if preferred_types else 0.0
+        return min(
+            enumerate(candidates),
+            key=lambda item: self.score_worker(item[1]) * (1 + penalty * item[0])
+        )[1]
+    
+    def preferred_workers(self, task: Task) -> List[WorkerType]:
+        """Workers suited to the task, best first"""
         
         # Coding tasks -> Qwen Coder or DeepSeek
         coding_keywords = ["code", "implement", "function", "class", "react", "typescript"]
@@ -704,14 +2426,27 @@ class LoadBalancer:
                 WorkerType.GEMINI_FLASH,
             ]
         
-        # Filter to available workers
-        available = [w for w in preferred if w in self.workers and self.workers[w].is_available()]
+        return preferred
+    
+    def select_worker_best_fit(self, task: Task) -> Optional[WorkerType]:
+        """Select best worker for the task based on task type"""
         
-        if available:
-            return available[0]
+        # Best-scoring available worker from the preferred list
+        selected = self.select_worker_scored(self.preferred_workers(task))
+        if selected:
+            return selected
         
         # Fallback to any available worker
-        return self.select_worker_least_loaded()
+        return self.select_worker_scored()
+    
+    def select_hedge_worker(self, task: Task, primary: WorkerType) -> Optional[WorkerType]:
+        """Best backup on a different provider, so one provider's slowdown can't hit both"""
+        provider = self.workers[primary].PROVIDER
+        others = [w for w in self.workers if self.workers[w].PROVIDER != provider]
+        if not others:
+            return None
+        preferred = [w for w in self.preferred_workers(task) if w in others]
+        return self.select_worker_scored(preferred) or self.select_worker_scored(others)
     
     def record_task_assigned(self, worker_type: WorkerType):
         """Record that a task was assigned"""
@@ -737,20 +2472,55 @@ class EnhancedOrchestrator:
     - Automatic failover and retries
     - Data sanitization for security
     - Parallel task execution
+    - Streaming responses written to deliverables as they arrive
+    - Persistent response cache so re-runs don't spend quota
+    - Optional request hedging for CRITICAL tasks
+    - Optional skeleton mode: TypeScript declarations without function bodies
+    - Optional retrieval mode: BM25-ranked repository chunks instead of whole files
     - Comprehensive logging
     """
     
-    def __init__(self, project_dir: str):
+    HEDGE_DEFAULT_DELAY = 3.0  # Seconds to wait for a first token before hedging (no history yet)
+    RETRY_BASE_DELAY = 1.0     # Backoff before going back to a worker that already failed the task
+    RETRY_MAX_DELAY = 30.0
+    NON_RETRYABLE_ERRORS = ("prompt_too_large", "quota_exhausted", "auth", "client")  # Rule the worker out for the task
+    
+    def __init__(self, project_dir: str, stream: bool = False, use_cache: bool = True,
+                 hedge: bool = False, hedge_percentile: float = 0.9,
+                 context_mode: Optional[str] = None, retrieval_tokens: int = 6000,
+                 verbose: bool = False):
         self.project_dir = project_dir
+        self.verbose = verbose  # Per-prompt details, e.g. how context was condensed
+        self.context_mode = context_mode  # Overrides Task.context_mode when set
+        self.retrieval_tokens = retrieval_tokens
+        self._context_index: Optional[ContextIndex] = None
+        self._symbol_index: Optional[SymbolIndex] = None
+        self.stream = stream
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_stats = {"hedged": 0, "backup_won": 0}
+        self.condensed_contexts = 0  # Prompts whose context files were condensed to fit
         self.output_dir = os.path.join(project_dir, "ai_team_output")
+        self.response_cache: Optional[ResponseCache] = None
+        self.quota_ledger: Optional[QuotaLedger] = None
         self.workers: Dict[WorkerType, AIWorker] = {}
-        self.sanitizer = DataSanitizer()
+        self._sanitizer_sessions: Dict[str, DataSanitizer] = {}  # task id -> session
+        self.segment_cache = get_segment_cache()
+        self.file_cache = get_file_cache()
+        self._sessions_lock = threading.Lock()
         self.task_queue: List[Task] = []
         self.completed_tasks: List[Task] = []
         self.failed_tasks: List[Task] = []
         self.load_balancer: Optional[LoadBalancer] = None
         
         self._setup_directories()
+        self.quota_ledger = QuotaLedger(os.path.join(self.output_dir, "logs", "quota.sqlite3"))
+        if use_cache:
+            self.response_cache = ResponseCache(
+                os.path.join(self.output_dir, "cache", "responses.sqlite3")
+            )
+        get_token_accountant().attach_store(os.path.join(self.output_dir, "cache", "token_calibration.sqlite3"))
+        get_output_estimator().attach_store(os.path.join(self.output_dir, "cache", "output_sizes.sqlite3"))
         self._initialize_workers()
     
     def _setup_directories(self):
@@ -760,6 +2530,7 @@ class EnhancedOrchestrator:
             os.path.join(self.output_dir, "deliverables"),
             os.path.join(self.output_dir, "logs"),
             os.path.join(self.output_dir, "reviews"),
+            os.path.join(self.output_dir, "cache"),
         ]
         for d in dirs:
             os.makedirs(d, exist_ok=True)
@@ -778,6 +2549,8 @@ class EnhancedOrchestrator:
         for worker_type in all_workers:
             worker = WorkerFactory.create_worker(worker_type)
             if worker:
+                worker.cache = self.response_cache
+                worker.ledger = self.quota_ledger
                 self.workers[worker_type] = worker
                 success_count += 1
                 if RICH_AVAILABLE:
@@ -791,6 +2564,15 @@ class EnhancedOrchestrator:
         else:
             self.load_balancer = LoadBalancer(self.workers)
             print(f"\n✅ {success_count}/{len(all_workers)} workers initialized")
+            # Open provider connections in the background so the first task skips the handshake
+            prewarm(self._provider_base_urls())
+    
+    def _provider_base_urls(self) -> List[str]:
+        """Base URLs of all pooled (OpenAI-compatible) workers"""
+        return [
+            worker.BASE_URL for worker in self.workers.values()
+            if isinstance(worker, OpenAICompatibleWorker)
+        ]
     
     def _print_api_key_help(self):
         """Print help for setting up API keys"""
@@ -830,51 +2612,321 @@ class EnhancedOrchestrator:
         self.task_queue.append(task)
         self.task_queue.sort(key=lambda t: t.priority.value)
     
-    def _build_context(self, task: Task) -> str:
-        """Build context from files for a task"""
-        context_parts = []
-        for file_path in task.context_files:
-            full_path = os.path.join(self.project_dir, file_path) if not os.path.isabs(file_path) else file_path
-            if os.path.exists(full_path):
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    # Truncate very large files
-                    if len(content) > 50000:
-                        content = content[:25000] + "\n\n... [truncated] ...\n\n" + content[-25000:]
-                    context_parts.append(f"### File: {os.path.basename(file_path)}\n```\n{content}\n```\n")
-                except Exception as e:
-                    context_parts.append(f"### File: {file_path}\n[Error reading: {e}]\n")
-        return "\n".join(context_parts)
+    CONTEXT_CHUNK_CHARS = 64 * 1024
+    CONTEXT_MAX_CHARS = 50000  # Larger files keep only their head and tail
+    PACK_MAX_FILE_BYTES = 1024 * 1024  # TypeScript files condensed by structure up to this size
     
-
-    def execute_task(self, task: Task, worker_override: WorkerType = None) -> bool:
-        """Execute a single task"""
+    def _read_context_file(self, full_path: str) -> Iterator[str]:
+        """
+        Yield a context file in chunks, truncating very large ones to their
+        first and last CONTEXT_MAX_CHARS / 2 characters.
         
-        # Select worker
-        if worker_override:
-            worker_type = worker_override
-        elif self.load_balancer:
-            worker_type = self.load_balancer.select_worker_best_fit(task)
-        else:
-            worker_type = task.worker
+        A file too big to fit (more than 4 bytes per allowed character) is cut
+        by reading only its head and tail byte ranges. Anything smaller comes
+        from the shared file cache, so a file used by many tasks is read from
+        disk once, and only the tail window is buffered while truncating.
+        Binary files are skipped.
+        """
+        half = self.CONTEXT_MAX_CHARS // 2
+        if os.path.getsize(full_path) > 4 * self.CONTEXT_MAX_CHARS:
+            head, tail = read_head_tail(full_path, half, half)
+            yield head
+            yield "\n\n... [truncated] ...\n\n"
+            yield tail
+            return
         
-        if not worker_type or worker_type not in self.workers:
-            task.error = f"No available worker for task"
-            task.status = TaskStatus.FAILED
-            return False
+        head_left = half
+        tail: deque = deque()
+        tail_chars = 0
+        skipped = False
+        for chunk in self.file_cache.iter_chunks(full_path, self.CONTEXT_CHUNK_CHARS):
+            if head_left == half and looks_binary(chunk):
+                raise BinaryFileError(f"{os.path.basename(full_path)} looks binary, skipped")
+            if head_left:
+                head, chunk = chunk[:head_left], chunk[head_left:]
+                head_left -= len(head)
+                yield head
+                if not chunk:
+                    continue
+            tail.append(chunk)
+            tail_chars += len(chunk)
+            while tail_chars - len(tail[0]) >= half:
+                tail_chars -= len(tail.popleft())
+                skipped = True
+        if skipped or tail_chars > half:
+            yield "\n\n... [truncated] ...\n\n"
+            excess = tail_chars - half
+            if excess > 0:
+                tail[0] = tail[0][excess:]
+        yield from tail
+    
+    def _context_path(self, file_path: str) -> str:
+        return os.path.join(self.project_dir, file_path) if not os.path.isabs(file_path) else file_path
+    
+    def _presanitize_context(self) -> int:
+        """
+        Sanitize the context files of every queued task up front, across all
+        cores, so building each prompt is only cache lookups.
+        """
+        files = {}
+        for task in self.task_queue:
+            # Skeleton and retrieval tasks send little or none of each file whole
+            if task.sanitize_data and (self.context_mode or task.context_mode) == "full":
+                for file_path in task.context_files:
+                    full_path = self._context_path(file_path)
+                    if os.path.isfile(full_path):
+                        files[(full_path, os.path.basename(file_path))] = None
+        if not files:
+            return 0
+        added = self.segment_cache.warm(list(files), self._read_context_file)
+        if added:
+            print(f"🧩 Pre-sanitized {added} context files")
+        return added
+    
+    def _write_file_segment(self, buffer: io.StringIO, file_path: str,
+                            sanitizer: Optional[DataSanitizer]):
+        """Append one whole context file to the prompt buffer (sanitized segment if a session is given)"""
+        full_path = self._context_path(file_path)
+        if not os.path.exists(full_path):
+            return
+        label = os.path.basename(file_path)
+        if buffer.tell():
+            buffer.write("\n")
+        mark = buffer.tell()
+        try:
+            if sanitizer is not None:
+                buffer.write(
+                    self.segment_cache.get(full_path, label, self._read_context_file, sanitizer)
+                )
+            else:
+                for chunk in SanitizedSegmentCache.segment_chunks(label, self._read_context_file(full_path)):
+                    buffer.write(chunk)
+        except Exception as e:
+            buffer.seek(mark)
+            buffer.truncate()
+            error = f"### File: {file_path}\n[Error reading: {e}]\n"
+            buffer.write(sanitizer.sanitize(error) if sanitizer is not None else error)
+    
+    @property
+    def context_index(self) -> ContextIndex:
+        """Retrieval index over src/, api/ and docs/ (opened on first use)"""
+        if self._context_index is None:
+            self._context_index = ContextIndex(
+                self.project_dir, os.path.join(self.output_dir, "cache", "context_index.sqlite3")
+            )
+        return self._context_index
+    
+    @property
+    def symbol_index(self) -> SymbolIndex:
+        """TypeScript symbol tables, stored by content hash (opened on first use)"""
+        if self._symbol_index is None:
+            self._symbol_index = SymbolIndex(os.path.join(self.output_dir, "cache", "symbol_index.sqlite3"))
+        return self._symbol_index
+    
+    def _write_skeleton_segment(self, buffer: io.StringIO, file_path: str,
+                                sanitizer: Optional[DataSanitizer]):
+        """Append the declarations of a TypeScript file (other files, or unparsable ones, whole)"""
+        full_path = self._context_path(file_path)
+        if not SymbolIndex.supports(full_path) or not os.path.exists(full_path):
+            return self._write_file_segment(buffer, file_path, sanitizer)
+        try:
+            skeleton = self.symbol_index.skeleton(full_path)
+        except (OSError, ValueError):
+            return self._write_file_segment(buffer, file_path, sanitizer)
+        if not skeleton:
+            return self._write_file_segment(buffer, file_path, sanitizer)
+        segment = SanitizedSegmentCache.format_segment(
+            f"{os.path.basename(file_path)} (declarations only)", skeleton.rstrip("\n")
+        )
+        if buffer.tell():
+            buffer.write("\n")
+        buffer.write(sanitizer.sanitize(segment) if sanitizer is not None else segment)
+    
+    def _write_packed(self, buffer: io.StringIO, file_paths: List[str],
+                      sanitizer: Optional[DataSanitizer], budget: int, skeleton: bool,
+                      count_tokens: Callable[[str], int] = estimate_tokens):
+        """
+        Append context files condensed by structure to fit `budget` tokens:
+        imports, exported types, signatures, then bodies (see pack_context).
+        TypeScript files are never cut inside a declaration; other files are
+        sent whole or left out.
+        """
+        files = []
+        for file_path in file_paths:
+            full_path = self._context_path(file_path)
+            label = os.path.basename(file_path)
+            try:
+                if SymbolIndex.supports(full_path) and os.path.getsize(full_path) <= self.PACK_MAX_FILE_BYTES:
+                    text = self.file_cache.read_text(full_path)
+                    symbols = self.symbol_index.symbols_for_text(text)
+                    files.append(ContextFile(label, text, symbols, TIER_SIGNATURES if skeleton else TIER_BODIES))
+                else:
+                    files.append(ContextFile(label, "".join(self._read_context_file(full_path))))
+            except (OSError, ValueError) as e:
+                error = f"### File: {file_path}\n[Error reading: {e}]\n"
+                buffer.write(("\n" if buffer.tell() else "") + (sanitizer.sanitize(error) if sanitizer else error))
+                budget -= count_tokens(error)
         
-        worker = self.workers[worker_type]
+        headers = sum(count_tokens(SanitizedSegmentCache.format_segment(f"{f.label} (condensed)", ""))
+                      for f in files)
+        omitted = 0
+        for packed in pack_context(files, budget - headers, count_tokens=count_tokens):
+            if not packed.text and not packed.omitted:
+                continue
+            if packed.text:
+                label = f"{packed.label} (condensed)" if packed.condensed else packed.label
+                segment = SanitizedSegmentCache.format_segment(label, packed.text)
+            else:
+                segment = f"### File: {packed.label}\n[Omitted: does not fit the model's context budget]\n"
+            omitted += packed.omitted
+            if buffer.tell():
+                buffer.write("\n")
+            buffer.write(sanitizer.sanitize(segment) if sanitizer is not None else segment)
+        self.condensed_contexts += 1
+        if self.verbose:
+            print(f"  ✂ Context condensed to ~{budget} tokens ({omitted} declarations or files left out)")
+    
+    def _write_files(self, buffer: io.StringIO, file_paths: List[str],
+                     sanitizer: Optional[DataSanitizer], budget: Optional[int] = None,
+                     skeleton: bool = False, count_tokens: Callable[[str], int] = estimate_tokens):
+        """
+        Append context files whole (or as skeletons). With a token budget,
+        files that would not fit as they are, or TypeScript files too large
+        to send whole, are condensed by structure instead.
+        """
+        file_paths = [p for p in file_paths if os.path.exists(self._context_path(p))]
+        write = self._write_skeleton_segment if skeleton else self._write_file_segment
+        if budget is None:
+            for file_path in file_paths:
+                write(buffer, file_path, sanitizer)
+            return
+        
+        # Measured in a throwaway session: if the files end up condensed, their
+        # whole-file placeholders must not land in the task's session
+        trial_session = DataSanitizer() if sanitizer is not None else None
+        trial = io.StringIO()
+        for file_path in file_paths:
+            write(trial, file_path, trial_session)
+        text = trial.getvalue()
+        cut = not skeleton and any(
+            SymbolIndex.supports(p) and os.path.getsize(self._context_path(p)) > self.CONTEXT_MAX_CHARS
+            for p in file_paths
+        )
+        if count_tokens(text) <= budget and not cut:
+            if trial_session is not None and not sanitizer.adopt(trial_session.redaction_map):
+                # A trial placeholder means something else in this session: redo it in the session
+                trial = io.StringIO()
+                for file_path in file_paths:
+                    write(trial, file_path, sanitizer)
+                text = trial.getvalue()
+            if text and buffer.tell():
+                buffer.write("\n")
+            buffer.write(text)
+            return
+        self._write_packed(buffer, file_paths, sanitizer, budget, skeleton, count_tokens)
+    
+    def _write_retrieved_context(self, buffer: io.StringIO, task: Task,
+                                 sanitizer: Optional[DataSanitizer], budget: Optional[int] = None,
+                                 count_tokens: Callable[[str], int] = estimate_tokens):
+        """
+        Append the indexed chunks that best match the task, up to
+        retrieval_tokens (or what is left of `budget`). Listed context files
+        rank higher; listed files the index does not cover are included whole.
+        """
+        listed = [os.path.relpath(self._context_path(p), self.project_dir) for p in task.context_files]
+        uncovered = [file_path for file_path, rel_path in zip(task.context_files, listed)
+                     if not self.context_index.covers(rel_path)]
+        self._write_files(buffer, uncovered, sanitizer, budget, count_tokens=count_tokens)
+        
+        max_tokens = self.retrieval_tokens
+        if budget is not None:
+            max_tokens = max(0, min(max_tokens, budget - count_tokens(buffer.getvalue())))
+        chunks = self.context_index.query(
+            f"{task.title}\n{task.description}", max_tokens,
+            boost_paths=listed, count_tokens=count_tokens,
+        )
+        for chunk in sorted(chunks, key=lambda c: (c.path, c.start_line)):
+            segment = SanitizedSegmentCache.format_segment(
+                f"{chunk.path} (lines {chunk.start_line}-{chunk.end_line})", chunk.text
+            )
+            if buffer.tell():
+                buffer.write("\n")
+            buffer.write(sanitizer.sanitize(segment) if sanitizer is not None else segment)
+    
+    def _build_context(self, task: Task, sanitizer: Optional[DataSanitizer] = None,
+                       budget: Optional[int] = None,
+                       count_tokens: Callable[[str], int] = estimate_tokens) -> str:
+        """
+        Build context for a task: its files in full, only the declarations of
+        its TypeScript files in "skeleton" mode, or in "retrieval" mode the
+        best-matching repository chunks. With a sanitizer session, each whole
+        file comes from the sanitized segment cache and its placeholders are
+        adopted into the session. With a token budget, context that would not
+        fit is condensed by structure.
+        """
+        buffer = io.StringIO()
+        mode = self.context_mode or task.context_mode
+        if mode == "retrieval":
+            self._write_retrieved_context(buffer, task, sanitizer, budget, count_tokens)
+        else:
+            self._write_files(buffer, task.context_files, sanitizer, budget,
+                              skeleton=mode == "skeleton", count_tokens=count_tokens)
+        return buffer.getvalue()
+    
+
+    def _sanitizer_for(self, task: Task) -> DataSanitizer:
+        """The task's sanitizer session (kept across retries so placeholders stay stable)"""
+        with self._sessions_lock:
+            session = self._sanitizer_sessions.get(task.id)
+            if session is None:
+                session = self._sanitizer_sessions[task.id] = DataSanitizer()
+            return session
+    
+    def _end_sanitizer_session(self, task: Task):
+        """Drop a finished task's redaction maps"""
+        with self._sessions_lock:
+            self._sanitizer_sessions.pop(task.id, None)
+    
+    def _select_worker(self, task: Task, worker_override: WorkerType = None) -> Optional[WorkerType]:
+        """Pick the worker for a task attempt"""
+        if worker_override:
+            return worker_override
+        if self.load_balancer:
+            return self.load_balancer.select_worker_best_fit(task)
+        return task.worker
+    
+    @staticmethod
+    def _output_kind(task: Task) -> str:
+        return task.task_type or re.sub(r"[_-]?\d+$", "", task.id).lower()
+    
+    @staticmethod
+    def _output_count(task: Task) -> int:
+        """Deliverables a task produces: its comma-separated output paths, at least one"""
+        return max(1, sum(1 for path in task.output_path.split(",") if path.strip()))
+    
+    def _expected_output(self, task: Task) -> int:
+        """Completion tokens to ask for, from the task type, deliverables and past outputs"""
+        return get_output_estimator().estimate(self._output_kind(task), self._output_count(task))
+    
+    def _build_prompt(self, task: Task, workers: Optional[List[AIWorker]] = None,
+                      max_tokens: Optional[int] = None) -> str:
+        """
+        Build (and sanitize if needed) the full prompt for a task.
         
-        # Build prompt
-        context = self._build_context(task)
-        prompt = f"""# Task: {task.title}
+        Only the task-specific parts are sanitized here; context files arrive
+        already sanitized from the segment cache. If `workers` are given, the
+        prompt is sized to fit the smallest of their request budgets, leaving
+        room for a reply of `max_tokens`.
+        """
+        sanitizer = self._sanitizer_for(task) if task.sanitize_data else None
+        head = f"""# Task: {task.title}
 
 ## Description
 {task.description}
 
 ## Context Files
-{context if context else "No context files provided."}
+"""
+        tail = f"""
 
 ## Success Criteria
 {chr(10).join(f'- {c}' for c in task.success_criteria)}
@@ -887,79 +2939,494 @@ Please complete this task and provide:
 
 Respond with well-formatted, production-ready code.
 """
+        budget, count_tokens = None, estimate_tokens
+        if workers:
+            # Counted for the model whose tokenizer needs the most tokens
+            count_tokens = lambda text: max(w.count_tokens(text) for w in workers)
+            budget = min(w.prompt_budget(max_tokens=max_tokens) for w in workers) - count_tokens(head + tail)
+        context = self._build_context(task, sanitizer, budget, count_tokens)
+        if sanitizer is None:
+            return head + (context if context else "No context files provided.") + tail
         
-        # Sanitize if needed
-        if task.sanitize_data:
-            prompt = self.sanitizer.sanitize(prompt)
-            redaction_report = self.sanitizer.get_redaction_report()
-            if redaction_report:
-                print(f"  🔒 Redacted: {redaction_report}")
-        
-        # Execute
-        task.status = TaskStatus.IN_PROGRESS
-        if self.load_balancer:
-            self.load_balancer.record_task_assigned(worker_type)
+        prompt = (sanitizer.sanitize(head)
+                  + (context if context else "No context files provided.")
+                  + sanitizer.sanitize(tail))
+        redaction_report = sanitizer.get_redaction_report()
+        if redaction_report:
+            print(f"  🔒 Redacted: {redaction_report}")
         
+        return prompt
+    
+    def _complete_task(self, task: Task, worker_type: WorkerType, result: str, tokens: int) -> bool:
+        """
+        Restore, store and save a successful result. A failure to save is
+        local (disk, permissions, path), not the worker's: the task fails
+        without another request being sent.
+        """
         try:
-            result, tokens = worker.execute(prompt)
-            
             # Restore redacted values in result
             if task.sanitize_data:
-                result = self.sanitizer.restore(result)
+                result = self._sanitizer_for(task).restore(result)
             
             task.result = result
             task.tokens_used = tokens
             task.status = TaskStatus.COMPLETED
             task.completed_at = datetime.now()
+            if task.truncated:
+                print(f"  ⚠ {task.id}: reply still cut off after {MAX_CONTINUATIONS} follow-ups; "
+                      f"saving it marked as truncated")
             
             # Save result to file
             self._save_task_result(task, worker_type)
-            
+        except Exception as e:
+            task.error = f"Could not save result: {e}"
+            print(f"  ✗ {task.id}: {task.error}")
+            return self._fail_task(task)
+        self._end_sanitizer_session(task)
+        
+        if tokens:
+            # Cache hits (no tokens) were recorded when they were generated
+            get_output_estimator().record(
+                self._output_kind(task), self._output_count(task),
+                self.workers[worker_type].count_tokens(result),
+            )
+        return True
+    
+    def _hedge_partner(self, task: Task, worker_type: WorkerType) -> Optional[WorkerType]:
+        """Backup worker for a hedged request, or None if this task is not hedged"""
+        if not self.hedge or task.priority != TaskPriority.CRITICAL or not self.load_balancer:
+            return None
+        return self.load_balancer.select_hedge_worker(task, worker_type)
+    
+    def _hedge_delay(self, worker: AIWorker) -> float:
+        delay = worker.ttft_percentile(self.hedge_percentile)
+        return delay if delay is not None else self.HEDGE_DEFAULT_DELAY
+    
+    def _start_hedge(self, task: Task, primary: WorkerType, backup: WorkerType, delay: float):
+        self.hedge_stats["hedged"] += 1
+        if self.load_balancer:
+            self.load_balancer.record_task_assigned(backup)
+        print(f"  ⑂ {task.id}: no first token from {primary.value} after {delay:.1f}s, "
+              f"hedging with {backup.value}")
+    
+    def _hedge_winner(self, task: Task, candidates: List[WorkerType], winner: int, started: int):
+        if started > 1:
             if self.load_balancer:
-                self.load_balancer.record_task_completed(worker_type)
+                self.load_balancer.record_task_completed(candidates[1])
+            if winner == 1:
+                self.hedge_stats["backup_won"] += 1
+            print(f"  🏁 {task.id}: {candidates[winner].value} answered first")
+    
+    def _execute_hedged(self, task: Task, primary: WorkerType, backup: WorkerType,
+                        prompt: str, max_tokens: Optional[int] = None) -> Tuple[WorkerType, str, int]:
+        """
+        Stream from the primary; if no first token arrives within its usual
+        time-to-first-token percentile, also stream from the backup. The first
+        stream to produce a token wins and the other is abandoned. Both requests
+        go through the rate limiters, so the hedge is paid for in the budget.
+        """
+        candidates = [primary, backup]
+        usages = [StreamUsage(), StreamUsage()]
+        abandoned = [threading.Event(), threading.Event()]
+        events: "queue.Queue[Tuple[int, Optional[str], Optional[Exception]]]" = queue.Queue()
+        
+        def pump(i: int):
+            stream = self.workers[candidates[i]].execute_stream(prompt, usage=usages[i],
+                                                                max_tokens=max_tokens)
+            try:
+                for chunk in stream:
+                    if abandoned[i].is_set():
+                        return
+                    events.put((i, chunk, None))
+            except Exception as e:
+                events.put((i, None, e))
+                return
+            finally:
+                stream.close()
+            events.put((i, None, None))
+        
+        def start(i: int):
+            threading.Thread(target=pump, args=(i,), daemon=True).start()
+        
+        delay = self._hedge_delay(self.workers[primary])
+        deadline = time.time() + delay
+        start(0)
+        started, failed, winner = 1, set(), None
+        parts: List[str] = []
+        try:
+            while True:
+                try:
+                    # Only hedge while the primary has not answered yet
+                    hedging = started == 1 and winner is None
+                    i, chunk, error = events.get(
+                        timeout=max(0.0, deadline - time.time()) if hedging else None
+                    )
+                except queue.Empty:
+                    self._start_hedge(task, primary, backup, delay)
+                    start(1)
+                    started = 2
+                    continue
+                if winner is None:
+                    if error is not None:
+                        failed.add(i)
+                        if len(failed) == started:
+                            raise error
+                        continue
+                    winner = i
+                    abandoned[1 - i].set()
+                    self._hedge_winner(task, candidates, winner, started)
+                if i != winner:
+                    continue
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    break
+                parts.append(chunk)
+        finally:
+            for flag in abandoned:
+                flag.set()
+            if winner is None and started > 1 and self.load_balancer:
+                self.load_balancer.record_task_completed(backup)
+        
+        self._report_stream(task, usages[winner])
+        return candidates[winner], "".join(parts), usages[winner].tokens
+    
+    async def _execute_hedged_async(self, task: Task, primary: WorkerType, backup: WorkerType,
+                                    prompt: str, max_tokens: Optional[int] = None) -> Tuple[WorkerType, str, int]:
+        """Async counterpart of _execute_hedged - the losing stream is cancelled outright"""
+        candidates = [primary, backup]
+        usages = [StreamUsage(), StreamUsage()]
+        events: asyncio.Queue = asyncio.Queue()
+        
+        async def pump(i: int):
+            try:
+                async for chunk in self.workers[candidates[i]].execute_stream_async(
+                    prompt, usage=usages[i], max_tokens=max_tokens
+                ):
+                    events.put_nowait((i, chunk, None))
+            except Exception as e:
+                events.put_nowait((i, None, e))
+                return
+            events.put_nowait((i, None, None))
+        
+        delay = self._hedge_delay(self.workers[primary])
+        deadline = time.time() + delay
+        pumps = [asyncio.ensure_future(pump(0))]
+        failed, winner = set(), None
+        parts: List[str] = []
+        try:
+            while True:
+                try:
+                    hedging = len(pumps) == 1 and winner is None
+                    i, chunk, error = await asyncio.wait_for(
+                        events.get(),
+                        timeout=max(0.0, deadline - time.time()) if hedging else None
+                    )
+                except asyncio.TimeoutError:
+                    self._start_hedge(task, primary, backup, delay)
+                    pumps.append(asyncio.ensure_future(pump(1)))
+                    continue
+                if winner is None:
+                    if error is not None:
+                        failed.add(i)
+                        if len(failed) == len(pumps):
+                            raise error
+                        continue
+                    winner = i
+                    if len(pumps) > 1:
+                        pumps[1 - i].cancel()
+                    self._hedge_winner(task, candidates, winner, len(pumps))
+                if i != winner:
+                    continue
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    break
+                parts.append(chunk)
+        finally:
+            for p in pumps:
+                p.cancel()
+            if winner is None and len(pumps) > 1 and self.load_balancer:
+                self.load_balancer.record_task_completed(backup)
+        
+        self._report_stream(task, usages[winner])
+        return candidates[winner], "".join(parts), usages[winner].tokens
+    
+    def _prompt_for(self, task: Task, workers: List[AIWorker], max_tokens: int, prompts: List[str]) -> str:
+        """
+        A prompt all of `workers` can take: the first one already built for the
+        task that fits their request budgets, else a new one sized for them
+        (sanitized in the same session, so placeholders stay the same)
+        """
+        for prompt in prompts:
+            if all(w.count_tokens(prompt) <= w.prompt_budget(max_tokens=max_tokens) for w in workers):
+                return prompt
+        prompt = self._build_prompt(task, workers, max_tokens)
+        prompts.append(prompt)
+        return prompt
+    
+    def _fallback_chain(self, task: Task) -> List[WorkerType]:
+        """Workers the task may run on: the first one tried, its fallbacks, then its assigned worker"""
+        chain = [task.attempts[0].worker] + task.fallback_workers + [task.worker]
+        return [w for w in dict.fromkeys(chain) if w in self.workers]
+    
+    def _best_available(self, candidates: List[WorkerType]) -> Optional[WorkerType]:
+        """Best-scoring available worker among `candidates` (earlier ones get a small bonus)"""
+        if not candidates:
+            return None
+        if self.load_balancer:
+            return self.load_balancer.select_worker_scored(candidates)
+        return next((w for w in candidates if self.workers[w].is_available()), None)
+    
+    def _retry_delay(self, task: Task) -> float:
+        """Exponential backoff with equal jitter, growing with the task's failed attempts"""
+        delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** (task.retries - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def _next_attempt(self, task: Task, deadline: float) -> Tuple[Optional[WorkerType], float]:
+        """
+        Worker for the task's next attempt and the seconds to wait before it,
+        or (None, 0) once the task is out of retries, time or workers.
+        
+        Workers of the fallback chain that have not failed the task yet go
+        first and without a wait - another provider is not hurt by this one's
+        trouble. Once all have failed, the best of them is tried again after a
+        jittered backoff (or once its circuit reopens, if later). Workers that
+        failed with a NON_RETRYABLE_ERRORS class are not tried again.
+        """
+        if task.retries > task.max_retries:
+            return None, 0.0
+        ruled_out = {a.worker for a in task.attempts if a.error_class in self.NON_RETRYABLE_ERRORS}
+        chain = [w for w in self._fallback_chain(task) if w not in ruled_out]
+        if not chain:
+            return None, 0.0
+        
+        tried = {a.worker for a in task.attempts}
+        worker_type = self._best_available([w for w in chain if w not in tried])
+        wait = 0.0
+        if worker_type is None:
+            worker_type = (self._best_available(chain)
+                           or min(chain, key=lambda w: self.workers[w].breaker.reopens_in()))
+            wait = max(self._retry_delay(task), self.workers[worker_type].breaker.reopens_in())
+        if time.monotonic() + wait >= deadline:
+            return None, 0.0
+        return worker_type, wait
+    
+    def _start_attempt(self, task: Task, worker_type: WorkerType, waited: float) -> TaskAttempt:
+        attempt = TaskAttempt(worker_type, waited=waited)
+        task.attempts.append(attempt)
+        task.status = TaskStatus.IN_PROGRESS
+        if self.load_balancer:
+            self.load_balancer.record_task_assigned(worker_type)
+        return attempt
+    
+    def _finish_attempt(self, task: Task, attempt: TaskAttempt, error: Optional[BaseException] = None):
+        """Record an attempt's latency and, if it failed, its error class"""
+        attempt.latency = (datetime.now() - attempt.started_at).total_seconds()
+        if self.load_balancer:
+            self.load_balancer.record_task_completed(attempt.worker)
+        if error is not None:
+            attempt.error_class = classify_error(error)
+            attempt.error = task.error = str(error)
+            task.retries += 1
+    
+    def _plan_retry(self, task: Task, deadline: float) -> Tuple[Optional[WorkerType], float]:
+        """_next_attempt after a failure, reported; marks the task failed if there is none"""
+        failed = task.attempts[-1]
+        worker_type, wait = self._next_attempt(task, deadline)
+        if worker_type is None:
+            self._fail_task(task)
+            return None, 0.0
+        print(f"  ↻ {failed.error_class} from {failed.worker.value} after {failed.latency:.1f}s; "
+              f"retrying with {worker_type.value}" + (f" in {wait:.1f}s" if wait else "") + "...")
+        task.status = TaskStatus.RETRYING
+        return worker_type, wait
+    
+    def _fail_task(self, task: Task) -> bool:
+        task.status = TaskStatus.FAILED
+        self._end_sanitizer_session(task)
+        return False
+    
+    def execute_task(self, task: Task, worker_override: WorkerType = None) -> bool:
+        """
+        Execute a single task, retrying on failure.
+        
+        The prompt is built and sanitized once; retries reuse it unless a
+        fallback's request budget is too small for it. Failed attempts move
+        along the task's ranked fallback chain (see _next_attempt) until one
+        succeeds or the task runs out of retries (max_retries) or time
+        (time_budget). Each attempt is kept in task.attempts.
+        """
+        worker_type = self._select_worker(task, worker_override)
+        
+        if not worker_type or worker_type not in self.workers:
+            task.error = f"No available worker for task"
+            return self._fail_task(task)
+        
+        deadline = time.monotonic() + task.time_budget
+        max_tokens = self._expected_output(task)
+        prompts: List[str] = []
+        wait = 0.0
+        while True:
+            worker = self.workers[worker_type]
+            backup = self._hedge_partner(task, worker_type)
             
-            return True
+            # Sized for the smaller model if hedged, leaving room for the expected reply
+            prompt = self._prompt_for(task, [worker] + ([self.workers[backup]] if backup else []),
+                                      max_tokens, prompts)
             
-        except Exception as e:
-            task.error = str(e)
-            task.retries += 1
+            attempt = self._start_attempt(task, worker_type, wait)
+            try:
+                if backup:
+                    winner, result, tokens = self._execute_hedged(task, worker_type, backup, prompt, max_tokens)
+                elif self.stream:
+                    winner = worker_type
+                    result, tokens = self._execute_streaming(task, worker, worker_type, prompt, max_tokens)
+                else:
+                    winner, usage = worker_type, StreamUsage()
+                    result, tokens = worker.execute(prompt, max_tokens=max_tokens, usage=usage)
+                    task.truncated = usage.truncated
+            except Exception as e:
+                self._finish_attempt(task, attempt, e)
+                worker_type, wait = self._plan_retry(task, deadline)
+                if worker_type is None:
+                    return False
+                time.sleep(wait)
+                continue
             
-            if self.load_balancer:
-                self.load_balancer.record_task_completed(worker_type)
+            self._finish_attempt(task, attempt)
+            return self._complete_task(task, winner, result, tokens)
+    
+    async def execute_task_async(self, task: Task, worker_override: WorkerType = None) -> bool:
+        """Execute a single task on the event loop (async counterpart of execute_task)"""
+        
+        worker_type = self._select_worker(task, worker_override)
+        
+        if not worker_type or worker_type not in self.workers:
+            task.error = f"No available worker for task"
+            return self._fail_task(task)
+        
+        deadline = time.monotonic() + task.time_budget
+        max_tokens = self._expected_output(task)
+        prompts: List[str] = []
+        wait = 0.0
+        while True:
+            worker = self.workers[worker_type]
+            backup = self._hedge_partner(task, worker_type)
+            prompt = self._prompt_for(task, [worker] + ([self.workers[backup]] if backup else []),
+                                      max_tokens, prompts)
             
-            # Try fallback workers
-            if task.retries < task.max_retries and task.fallback_workers:
-                for fallback in task.fallback_workers:
-                    if fallback in self.workers and self.workers[fallback].is_available():
-                        print(f"  ↻ Retrying with {fallback.value}...")
-                        task.status = TaskStatus.RETRYING
-                        return self.execute_task(task, worker_override=fallback)
+            attempt = self._start_attempt(task, worker_type, wait)
+            try:
+                if backup:
+                    winner, result, tokens = await self._execute_hedged_async(
+                        task, worker_type, backup, prompt, max_tokens
+                    )
+                elif self.stream:
+                    winner = worker_type
+                    result, tokens = await self._execute_streaming_async(task, worker, worker_type, prompt, max_tokens)
+                else:
+                    winner, usage = worker_type, StreamUsage()
+                    result, tokens = await worker.execute_async(prompt, max_tokens=max_tokens, usage=usage)
+                    task.truncated = usage.truncated
+            except Exception as e:
+                self._finish_attempt(task, attempt, e)
+                worker_type, wait = self._plan_retry(task, deadline)
+                if worker_type is None:
+                    return False
+                await asyncio.sleep(wait)
+                continue
             
-            task.status = TaskStatus.FAILED
-            return False
+            self._finish_attempt(task, attempt)
+            return self._complete_task(task, winner, result, tokens)
+    
+    def _deliverable_path(self, task: Task) -> str:
+        return os.path.join(self.output_dir, "deliverables", f"{task.id}.md")
+    
+    def _write_result_header(self, f, task: Task, worker_type: WorkerType):
+        f.write(f"# Task: {task.title}\n\n")
+        f.write(f"**ID:** {task.id}\n")
+        f.write(f"**Worker:** {worker_type.value}\n")
+        f.write(f"**Status:** {task.status.value}\n")
+        f.write(f"**Tokens Used:** {task.tokens_used}\n")
+        f.write(f"**Completed:** {task.completed_at.isoformat() if task.completed_at else 'N/A'}\n")
+        if task.truncated:
+            f.write(f"**Truncated:** yes - still cut off at max_tokens after {MAX_CONTINUATIONS} "
+                    f"follow-ups; the result is incomplete\n")
+        f.write("\n")
+        f.write("---\n\n")
+        f.write("## Result\n\n")
     
     def _save_task_result(self, task: Task, worker_type: WorkerType):
         """Save task result to file"""
-        output_file = os.path.join(self.output_dir, "deliverables", f"{task.id}.md")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"# Task: {task.title}\n\n")
-            f.write(f"**ID:** {task.id}\n")
-            f.write(f"**Worker:** {worker_type.value}\n")
-            f.write(f"**Status:** {task.status.value}\n")
-            f.write(f"**Tokens Used:** {task.tokens_used}\n")
-            f.write(f"**Completed:** {task.completed_at.isoformat() if task.completed_at else 'N/A'}\n\n")
-            f.write("---\n\n")
-            f.write("## Result\n\n")
+        with open(self._deliverable_path(task), 'w', encoding='utf-8') as f:
+            self._write_result_header(f, task, worker_type)
             f.write(task.result or "No result")
     
-    def run_all_tasks(self, parallel: bool = False, max_workers: int = 3):
-        """Execute all tasks in the queue"""
+    def _report_stream(self, task: Task, usage: StreamUsage):
+        """Report a finished stream; notes on the task whether its reply is still cut off"""
+        task.truncated = usage.truncated
+        ttft = usage.time_to_first_token
+        print(f"  ⚡ {task.id}: first token {ttft:.2f}s, {usage.tokens_per_second:.1f} tok/s"
+              if ttft is not None else f"  ⚡ {task.id}: no tokens streamed")
+    
+    def _execute_streaming(self, task: Task, worker: AIWorker, worker_type: WorkerType,
+                           prompt: str, max_tokens: Optional[int] = None) -> Tuple[str, int]:
+        """
+        Stream a response, appending chunks to the deliverable as they arrive
+        (with placeholders already restored).
+        
+        The file is rewritten by _save_task_result once the task completes, with
+        the final status and token count.
+        """
+        usage = StreamUsage()
+        parts: List[str] = []
+        restorer = self._sanitizer_for(task).stream_restorer() if task.sanitize_data else None
+        with open(self._deliverable_path(task), 'w', encoding='utf-8') as f:
+            self._write_result_header(f, task, worker_type)
+            f.flush()
+            for chunk in worker.execute_stream(prompt, usage=usage, max_tokens=max_tokens):
+                parts.append(chunk)
+                f.write(restorer.feed(chunk) if restorer else chunk)
+                f.flush()
+            if restorer:
+                f.write(restorer.flush())
+        self._report_stream(task, usage)
+        return "".join(parts), usage.tokens
+    
+    async def _execute_streaming_async(self, task: Task, worker: AIWorker, worker_type: WorkerType,
+                                       prompt: str, max_tokens: Optional[int] = None) -> Tuple[str, int]:
+        """Async counterpart of _execute_streaming"""
+        usage = StreamUsage()
+        parts: List[str] = []
+        restorer = self._sanitizer_for(task).stream_restorer() if task.sanitize_data else None
+        with open(self._deliverable_path(task), 'w', encoding='utf-8') as f:
+            self._write_result_header(f, task, worker_type)
+            f.flush()
+            async for chunk in worker.execute_stream_async(prompt, usage=usage, max_tokens=max_tokens):
+                parts.append(chunk)
+                f.write(restorer.feed(chunk) if restorer else chunk)
+                f.flush()
+            if restorer:
+                f.write(restorer.flush())
+        self._report_stream(task, usage)
+        return "".join(parts), usage.tokens
+    
+    def run_all_tasks(self, parallel: bool = False, max_workers: Optional[int] = None):
+        """
+        Execute all tasks in the queue.
+        
+        In parallel mode each provider runs at its own adaptive concurrency
+        limit; max_workers only caps the number of threads (default: enough
+        for every provider's maximum, up to 64).
+        """
         
         print(f"\n{'='*60}")
         print(f"🚀 Executing {len(self.task_queue)} tasks...")
         print(f"{'='*60}\n")
         
         if parallel and len(self.task_queue) > 1:
+            self._presanitize_context()
             self._run_parallel(max_workers)
         else:
             self._run_sequential()
@@ -968,6 +3435,57 @@ Respond with well-formatted, production-ready code.
         self._generate_summary()
     
 
+    async def run_all_tasks_async(self, max_concurrency: int = 256):
+        """
+        Execute all tasks concurrently on a single event loop.
+        
+        Unlike run_all_tasks(parallel=True), requests are not tied to threads,
+        so hundreds can be in flight at once across all providers.
+        
+        Usage:
+            asyncio.run(orchestrator.run_all_tasks_async())
+        """
+        
+        print(f"\n{'='*60}")
+        print(f"🚀 Executing {len(self.task_queue)} tasks (async, up to {max_concurrency} in flight)...")
+        print(f"{'='*60}\n")
+        
+        await asyncio.to_thread(self._presanitize_context)
+        try:
+            await self._run_async(max_concurrency)
+        finally:
+            await aclose_async_clients()  # Its connections cannot outlive this loop
+        
+        # Generate summary
+        self._generate_summary()
+    
+    async def _run_async(self, max_concurrency: int):
+        """Run tasks concurrently, bounded by a semaphore"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # Warm this loop's connection pools while the first prompts are being built
+        warmup = asyncio.ensure_future(prewarm_async(self._provider_base_urls()))
+        
+        async def run_one(task: Task):
+            async with semaphore:
+                try:
+                    success = await self.execute_task_async(task)
+                except Exception as e:
+                    print(f"  ✗ {task.title} error: {e}")
+                    task.error = str(e)
+                    task.status = TaskStatus.FAILED
+                    self.failed_tasks.append(task)
+                    return
+            if success:
+                print(f"  ✓ {task.title} completed")
+                self.completed_tasks.append(task)
+            else:
+                print(f"  ✗ {task.title} failed")
+                self.failed_tasks.append(task)
+        
+        await asyncio.gather(*(run_one(task) for task in self.task_queue))
+        await warmup
+
     def _run_sequential(self):
         """Run tasks sequentially"""
         for i, task in enumerate(self.task_queue):
@@ -983,8 +3501,12 @@ Respond with well-formatted, production-ready code.
                 print(f"  [red]✗ Failed: {task.error[:100]}...[/red]" if RICH_AVAILABLE else f"  ✗ Failed: {task.error[:100]}...")
                 self.failed_tasks.append(task)
     
-    def _run_parallel(self, max_workers: int):
-        """Run tasks in parallel using thread pool"""
+    def _run_parallel(self, max_workers: Optional[int] = None):
+        """Run tasks in parallel; per-provider concurrency limits decide what is in flight"""
+        if max_workers is None:
+            providers = {worker.PROVIDER for worker in self.workers.values()}
+            capacity = sum(get_concurrency_limit(p).maximum for p in providers)
+            max_workers = max(1, min(64, capacity, len(self.task_queue)))
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {executor.submit(self.execute_task, task): task for task in self.task_queue}
             
@@ -1016,13 +3538,25 @@ Respond with well-formatted, production-ready code.
             "failed": len(self.failed_tasks),
             "total_tokens": total_tokens,
             "workers_used": list(set(str(w) for w in self.workers.keys())),
+            "token_accounting": get_token_accountant().stats(),
+            "output_estimates": get_output_estimator().stats(),
             "tasks": [
                 {
                     "id": t.id,
                     "title": t.title,
                     "status": t.status.value,
                     "tokens": t.tokens_used,
-                    "error": t.error
+                    "error": t.error,
+                    "truncated": t.truncated,
+                    "attempts": [
+                        {
+                            "worker": a.worker.value,
+                            "waited": round(a.waited, 2),
+                            "latency": round(a.latency, 2),
+                            "error_class": a.error_class,
+                        }
+                        for a in t.attempts
+                    ],
                 }
                 for t in self.task_queue
             ]
@@ -1047,17 +3581,63 @@ Respond with well-formatted, production-ready code.
         print(f"  Summary File:    {summary_file}")
         print(f"{'='*60}\n")
         
+        # Print adaptive concurrency per provider
+        providers = sorted({worker.PROVIDER for worker in self.workers.values()})
+        if providers:
+            limits = ", ".join(f"{p}={get_concurrency_limit(p).limit:.1f}" for p in providers)
+            print(f"⚙  Concurrency limits: {limits}\n")
+        if self.hedge_stats["hedged"]:
+            print(f"⑂  Hedged: {self.hedge_stats['hedged']} requests "
+                  f"(backup answered first {self.hedge_stats['backup_won']}x)\n")
+        failed_attempts = [a.error_class for t in self.task_queue for a in t.attempts if a.error_class]
+        if failed_attempts:
+            classes = ", ".join(f"{c}={failed_attempts.count(c)}" for c in sorted(set(failed_attempts)))
+            retried = sum(1 for t in self.task_queue if len(t.attempts) > 1)
+            print(f"↻  Failed attempts: {len(failed_attempts)} ({classes}); {retried} tasks retried\n")
+        truncated = [t.id for t in self.completed_tasks if t.truncated]
+        if truncated:
+            print(f"⚠  Saved still cut off at max_tokens: {', '.join(truncated)}\n")
+        if self.condensed_contexts:
+            print(f"✂  Context condensed to fit the model in {self.condensed_contexts} prompts\n")
+        if self.segment_cache.hits:
+            print(f"🧩 Context segments: {self.segment_cache.hits} reused, "
+                  f"{self.segment_cache.misses} sanitized\n")
+        file_stats = self.file_cache.stats()
+        if file_stats["hits"]:
+            print(f"📄 Context files: {file_stats['misses']} read from disk, "
+                  f"{file_stats['hits']} served from memory\n")
+        token_stats = summary["token_accounting"]
+        if token_stats["exact"] or token_stats["estimated"]:
+            factors = ", ".join(f"{m}={f:.2f}" for m, f in sorted(token_stats["factors"].items()))
+            print(f"🔢 Token counts: {token_stats['exact']} responses from provider usage, "
+                  f"{token_stats['estimated']} estimated"
+                  + (f" (calibration: {factors})" if factors else "") + "\n")
+        
         # Print worker stats
         print("🤖 WORKER STATISTICS")
         print("-" * 60)
         for worker_type, worker in self.workers.items():
             stats = worker.stats
-            if stats.total_requests > 0:
-                success_rate = (stats.successful_requests / stats.total_requests) * 100
+            if stats.total_requests > 0 or stats.cache_hits > 0:
+                success_rate = (
+                    (stats.successful_requests / stats.total_requests) * 100
+                    if stats.total_requests > 0 else 100.0
+                )
                 print(f"  {worker_type.value}:")
                 print(f"    Requests: {stats.total_requests} ({success_rate:.1f}% success)")
-                print(f"    Tokens:   {stats.total_tokens:,}")
+                print(f"    Tokens:   {stats.total_tokens:,}"
+                      + (f" ({stats.estimated_tokens:,} estimated)" if stats.estimated_tokens else ""))
                 print(f"    Avg Time: {stats.avg_response_time:.2f}s")
+                if stats.cache_hits > 0:
+                    print(f"    Cached:   {stats.cache_hits} responses")
+                if stats.rate_limit_waits > 0:
+                    print(f"    Throttled: {stats.rate_limit_waits}x ({stats.rate_limit_wait_time:.1f}s waiting)")
+                if stats.continuations > 0 or stats.truncated_responses > 0:
+                    print(f"    Continued: {stats.continuations} follow-ups for cut-off replies"
+                          + (f" ({stats.truncated_responses} still cut off)" if stats.truncated_responses else ""))
+                if stats.streamed_requests > 0:
+                    print(f"    TTFT:     {stats.avg_time_to_first_token:.2f}s")
+                    print(f"    Speed:    {stats.avg_tokens_per_second:.1f} tok/s")
     
     def get_worker_status(self) -> Dict[str, Any]:
         """Get status of all workers"""
@@ -1071,6 +3651,13 @@ Respond with well-formatted, production-ready code.
                     if worker.stats.total_requests > 0 else 0
                 ),
                 "tokens_used": worker.stats.total_tokens,
+                "circuit": worker.breaker.state.value,
+                "ewma_latency": worker.stats.ewma_latency,
+                "ewma_error_rate": worker.stats.ewma_error_rate,
+                "concurrency_limit": worker.concurrency.current_limit,
+                "quota_used_today": worker.quota_used_today(),
+                "avg_time_to_first_token": worker.stats.avg_time_to_first_token,
+                "avg_tokens_per_second": worker.stats.avg_tokens_per_second,
             }
         return status
 
@@ -1092,6 +3679,7 @@ class TaskTemplates:
         """Create a task for building a React component"""
         return Task(
             id=f"REACT_{component_name.upper()}",
+            task_type="component",
             title=f"Create React Component: {component_name}",
             description=f"""Create a React TypeScript component for: {description}
 
@@ -1128,6 +3716,7 @@ Requirements:
         """Create a task for building an API endpoint"""
         return Task(
             id=f"API_{endpoint_name.upper()}",
+            task_type="endpoint",
             title=f"Create API Endpoint: {endpoint_name}",
             description=f"""Create a Vercel serverless API endpoint for: {description}
 
@@ -1140,6 +3729,7 @@ Requirements:
 """,
             worker=WorkerType.GROQ_LLAMA70B,
             context_files=context_files or [],
+            context_mode="skeleton",  # Endpoints need the types and signatures they call, not bodies
             output_path=f"api/{endpoint_name}.ts",
             success_criteria=[
                 "Endpoint compiles without errors",
@@ -1162,6 +3752,7 @@ Requirements:
         focus = focus_areas or ["bugs", "performance", "security", "best practices"]
         return Task(
             id=f"REVIEW_{hashlib.md5(file_path.encode()).hexdigest()[:8]}",
+            task_type="review",
             title=f"Code Review: {os.path.basename(file_path)}",
             description=f"""Review the following code for:
 {chr(10).join(f'- {f}' for f in focus)}
@@ -1326,8 +3917,19 @@ def main():
     
     print(f"📁 Project: {project_dir}")
     
-    # Initialize orchestrator
-    orchestrator = EnhancedOrchestrator(project_dir)
+    # Initialize orchestrator (--stream writes deliverables as tokens arrive,
+    # --no-cache always goes to the providers, --hedge backs up slow CRITICAL tasks,
+    # --skeleton sends declarations only, --retrieve builds context from the repository index,
+    # --verbose reports per-prompt details)
+    orchestrator = EnhancedOrchestrator(
+        project_dir,
+        stream="--stream" in sys.argv,
+        use_cache="--no-cache" not in sys.argv,
+        hedge="--hedge" in sys.argv,
+        context_mode=("retrieval" if "--retrieve" in sys.argv
+                      else "skeleton" if "--skeleton" in sys.argv else None),
+        verbose="--verbose" in sys.argv,
+    )
     
     # Check command line arguments
     if len(sys.argv) > 1:
@@ -1364,6 +3966,13 @@ Usage:
   python enhanced_orchestrator.py --test           Run a quick test
   python enhanced_orchestrator.py --status         Show worker status
 
+  Add --stream to any mode to stream responses into the deliverable files.
+  Add --no-cache to bypass the response cache in ai_team_output/cache.
+  Add --hedge to send CRITICAL tasks to a second provider when the first is slow.
+  Add --skeleton to send only the declarations of TypeScript context files.
+  Add --retrieve to send the best-matching code chunks instead of whole context files.
+  Add --verbose to report per-prompt details, such as how context was condensed.
+
 Or import and use programmatically:
 
   from enhanced_orchestrator import EnhancedOrchestrator, Task, WorkerType
@@ -1379,6 +3988,9 @@ Or import and use programmatically:
   
   orchestrator.add_task(task)
   orchestrator.run_all_tasks()
+
+  # Or keep many requests in flight on one event loop:
+  asyncio.run(orchestrator.run_all_tasks_async())
 """)
 
 
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Shared Context File Cache
+=======================================
+One in-memory cache of context files for the whole process, shared by every
+orchestrator (EnhancedOrchestrator, the legacy Orchestrator and
+ChatbotOrchestrator).
+
+Many tasks list the same context files (the CHAT_TYPES_001 outputs, shared
+api/_lib modules), and every task and retry used to read them from disk again.
+Entries are validated on each read by the file's (size, mtime), so an edited
+file is picked up at once, and the cache is capped by total size with
+least-recently-used files evicted first. Files larger than MAX_FILE_BYTES are
+never cached; they are streamed from disk each time.
+
+read_head_tail() reads just the first and last characters of a large file
+(seeking straight to the tail), so a huge generated bundle or log costs a few
+kilobytes of I/O instead of a full read.
+
+Usage:
+    from file_cache import get_file_cache, read_text
+
+    content = read_text("src/types/chat.ts")
+    for chunk in get_file_cache().iter_chunks(path, 64 * 1024):
+        ...
+"""
+
+import os
+import codecs
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024   # 128 MB of file text across all entries
+MAX_FILE_BYTES = 8 * 1024 * 1024        # Larger files are streamed, not cached
+DEFAULT_CHUNK_CHARS = 64 * 1024
+BINARY_SNIFF_BYTES = 8192               # A NUL byte in this much of the head means binary
+
+
+class BinaryFileError(ValueError):
+    """Raised instead of decoding a file that looks binary"""
+    pass
+
+
+def looks_binary(sample) -> bool:
+    """NUL bytes (or characters) never appear in the text files we send as context"""
+    return (b"\x00" if isinstance(sample, bytes) else "\x00") in sample[:BINARY_SNIFF_BYTES]
+
+
+def read_head_tail(path: str, head_chars: int, tail_chars: int,
+                   encoding: str = "utf-8") -> Tuple[str, str]:
+    """
+    First `head_chars` and last `tail_chars` characters of a file, reading
+    only those byte ranges. The head is cut before any incomplete trailing
+    sequence and the tail starts at the next character boundary, so neither
+    splits a multi-byte character. Raises BinaryFileError for binary files.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+
+        data = f.read(min(size, max(head_chars, BINARY_SNIFF_BYTES)))
+        if looks_binary(data):
+            raise BinaryFileError(f"{os.path.basename(path)} looks binary, skipped")
+        decoder = codecs.getincrementaldecoder(encoding)()
+        head = decoder.decode(data)
+        # Multi-byte text: keep reading until there are enough characters
+        while len(head) < head_chars and f.tell() < size:
+            head += decoder.decode(f.read(head_chars - len(head)))
+        head = head[:head_chars]
+
+        window = min(size, tail_chars)
+        while True:
+            f.seek(size - window)
+            data = f.read(window)
+            start = 0
+            if window < size:
+                # Skip UTF-8 continuation bytes (0b10xxxxxx) to land on a character start
+                while start < min(4, len(data)) and data[start] & 0xC0 == 0x80:
+                    start += 1
+            tail = data[start:].decode(encoding)
+            if len(tail) >= tail_chars or window == size:
+                return head, tail[-tail_chars:] if tail_chars else ""
+            window = min(size, window * 2)
+
+
+class FileCache:
+    """LRU cache of decoded text files, invalidated by (size, mtime)"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_file_bytes: int = MAX_FILE_BYTES,
+                 encoding: str = "utf-8"):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.encoding = encoding
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # absolute path -> (size, mtime_ns, text), oldest first
+        self._entries: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, path: str, st: os.stat_result) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[:2] != (st.st_size, st.st_mtime_ns):
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[2]
+
+    def _store(self, path: str, st: os.stat_result, text: str):
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old[0]
+            self._entries[path] = (st.st_size, st.st_mtime_ns, text)
+            self.total_bytes += st.st_size
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (size, _, _) = self._entries.popitem(last=False)
+                self.total_bytes -= size
+
+    def read_text(self, path: str) -> str:
+        """Whole file as text (from memory if unchanged since it was cached)"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        text = self._cached(path, st)
+        if text is not None:
+            return text
+        with open(path, "r", encoding=self.encoding) as f:
+            text = f.read()
+        if st.st_size <= self.max_file_bytes:
+            self._store(path, st, text)
+        return text
+
+    def iter_chunks(self, path: str, chunk_chars: int = DEFAULT_CHUNK_CHARS) -> Iterator[str]:
+        """
+        File text in chunks of `chunk_chars`: slices of the cached text, or
+        straight from disk for files too large to cache.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        if st.st_size > self.max_file_bytes:
+            with open(path, "r", encoding=self.encoding) as f:
+                yield from iter(lambda: f.read(chunk_chars), "")
+            return
+        text = self.read_text(path)
+        for start in range(0, len(text), chunk_chars):
+            yield text[start:start + chunk_chars]
+
+    def invalidate(self, path: Optional[str] = None):
+        """Forget one file, or everything"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.total_bytes = 0
+                return
+            entry = self._entries.pop(os.path.abspath(path), None)
+            if entry is not None:
+                self.total_bytes -= entry[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, cached bytes, hits and misses"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_file_cache = FileCache()
+
+
+def get_file_cache() -> FileCache:
+    """The process-wide context file cache"""
+    return _file_cache
+
+
+def read_text(path: str) -> str:
+    """Read a text file through the process-wide cache"""
+    return _file_cache.read_text(path)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Shared HTTP Connection Pool
+=========================================
+One keep-alive, HTTP/2-capable transport per provider host, shared by every
+OpenAI-compatible client in the process (Groq, Cerebras, OpenRouter, OpenCode).
+
+Without this each worker (and each call in run_task/quick_task) builds its own
+client and pays for DNS, TCP and TLS again. With it, requests to the same host
+reuse warm connections and are multiplexed over HTTP/2 when `h2` is installed.
+
+Usage:
+    from http_pool import get_openai_client, prewarm
+
+    prewarm(["https://api.groq.com/openai/v1"])   # background handshake
+    client = get_openai_client(api_key, "https://api.groq.com/openai/v1")
+
+    # Async clients belong to the running loop and are closed before it ends
+    client = get_async_openai_client(api_key, "https://api.groq.com/openai/v1")
+"""
+
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+
+# Pool sizing - generous enough for the async engine, small enough for free tiers
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 120.0
+CONNECT_TIMEOUT = 10.0
+REQUEST_TIMEOUT = 600.0
+
+_lock = threading.Lock()
+_http_clients: Dict[str, object] = {}
+_async_http_clients: Dict[str, Tuple[object, object]] = {}
+_openai_clients: Dict[Tuple[str, str], object] = {}
+_async_openai_clients: Dict[Tuple[str, str], Tuple[object, object]] = {}
+_closers: Dict[object, "asyncio.Task"] = {}  # Async client -> task that closes it with its loop
+
+
+def _host_key(base_url: str) -> str:
+    """Pool key for a base URL: scheme://host[:port]"""
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _client_options() -> dict:
+    import httpx
+    return {
+        "http2": http2_available(),
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+    }
+
+
+def get_http_client(base_url: str):
+    """Get the shared blocking httpx.Client for a host"""
+    import httpx
+    key = _host_key(base_url)
+    with _lock:
+        client = _http_clients.get(key)
+        if client is None:
+            client = httpx.Client(**_client_options())
+            _http_clients[key] = client
+        return client
+
+
+def get_async_http_client(base_url: str):
+    """
+    Get the shared httpx.AsyncClient for a host.
+
+    Async connections belong to the event loop that opened them, so a new
+    client is created if called from a different loop than last time. Each
+    client is closed on its own loop before that loop ends: by
+    aclose_async_clients(), or when asyncio.run cancels leftover tasks.
+    """
+    import httpx
+    key = _host_key(base_url)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entry = _async_http_clients.get(key)
+        if entry is None or entry[0] is not loop:
+            client = httpx.AsyncClient(**_client_options())
+            _closers[client] = loop.create_task(_close_at_shutdown(client))
+            entry = (loop, client)
+            _async_http_clients[key] = entry
+        return entry[1]
+
+
+async def _close_at_shutdown(client):
+    """Wait until cancelled (asyncio.run does so at shutdown), then close the client"""
+    try:
+        await asyncio.Event().wait()
+    finally:
+        with _lock:
+            _closers.pop(client, None)
+        await client.aclose()
+
+
+def get_openai_client(api_key: str, base_url: str):
+    """Get a cached OpenAI client for (key, base URL) that uses the shared pool"""
+    from openai import OpenAI
+    key = (api_key, base_url)
+    with _lock:
+        client = _openai_clients.get(key)
+    if client is None:
+        client = OpenAI(api_key=api_key, base_url=base_url, http_client=get_http_client(base_url))
+        with _lock:
+            client = _openai_clients.setdefault(key, client)
+    return client
+
+
+def get_async_openai_client(api_key: str, base_url: str):
+    """Get a cached AsyncOpenAI client for (key, base URL) on the running loop"""
+    from openai import AsyncOpenAI
+    key = (api_key, base_url)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entry = _async_openai_clients.get(key)
+    if entry is None or entry[0] is not loop:
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=get_async_http_client(base_url),
+        )
+        entry = (loop, client)
+        with _lock:
+            _async_openai_clients[key] = entry
+    return entry[1]
+
+
+def _warm(base_url: str):
+    """Open a pooled connection to a host; any HTTP response means it is warm"""
+    try:
+        get_http_client(base_url).head(base_url)
+    except Exception:
+        pass  # Pre-warming is best effort - the real request will report errors
+
+
+def prewarm(base_urls: Iterable[str], background: bool = True) -> List[threading.Thread]:
+    """
+    Open connections to each distinct host so the first task skips the handshake.
+
+    Runs in daemon threads by default; pass background=False to wait.
+    """
+    hosts = {_host_key(url): url for url in base_urls if url}
+    threads = []
+    for url in hosts.values():
+        thread = threading.Thread(target=_warm, args=(url,), daemon=True)
+        thread.start()
+        threads.append(thread)
+    if not background:
+        for thread in threads:
+            thread.join()
+    return threads
+
+
+async def prewarm_async(base_urls: Iterable[str]):
+    """Async counterpart of prewarm() for the event-loop pools"""
+    hosts = {_host_key(url): url for url in base_urls if url}
+
+    async def warm(url: str):
+        try:
+            await get_async_http_client(url).head(url)
+        except Exception:
+            pass
+
+    await asyncio.gather(*(warm(url) for url in hosts.values()))
+
+
+async def aclose_async_clients():
+    """Close the running loop's async clients now rather than at loop shutdown"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        for pools in (_async_http_clients, _async_openai_clients):
+            for key in [k for k, (owner, _) in pools.items() if owner is loop]:
+                del pools[key]
+        closers = {client: task for client, task in _closers.items() if task.get_loop() is loop}
+        for client in closers:
+            del _closers[client]
+    for client, task in closers.items():
+        task.cancel()
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+
+def close_all():
+    """Close every blocking pooled client (see aclose_async_clients for async ones)"""
+    with _lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+        _openai_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
@@ -24,6 +24,9 @@ from enum import Enum
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from file_cache import read_text
+from symbol_index import SymbolIndex
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -65,6 +68,7 @@ class Task:
     fallback_models: List[str]
     context_files: List[str]
     prompt: str
+    context_mode: str = "full"  # "skeleton" sends only the declarations of .ts/.tsx context files
 
 
 # Define all tasks
@@ -188,6 +192,7 @@ Include loading state helpers if needed."""
         preferred_model="google/gemini-2.0-flash",
         fallback_models=["groq/llama-3.3-70b-versatile"],
         context_files=["src/services/chatApi.ts", "src/types/chat.ts"],
+        context_mode="skeleton",
         prompt="""Create a React hook for managing chat functionality.
 
 The hook should provide:
@@ -324,6 +329,7 @@ Use Tailwind CSS with horizontal scrolling on mobile."""
             "src/components/chat/SuggestedPrompts.tsx",
             "src/hooks/useChat.ts"
         ],
+        context_mode="skeleton",
         prompt="""Create the main ChatInterface component that combines all chat components.
 
 Props:
@@ -363,6 +369,7 @@ Make it work in all three variants."""
         preferred_model="qwen/qwen-2.5-coder-32b-instruct:free",
         fallback_models=["deepseek/deepseek-chat-v3-0324:free"],
         context_files=["src/types/chat.ts", "api/_lib/aiService.ts"],
+        context_mode="skeleton",
         prompt="""Create an intent classifier for the chat system.
 
 Function: classifyIntent(message: string, context?: ConversationContext): Promise<ClassificationResult>
@@ -436,6 +443,7 @@ Return formatted results with counts and summaries."""
         preferred_model="google/gemini-2.5-pro",
         fallback_models=["deepseek/deepseek-r1:free"],
         context_files=["api/_lib/aiService.ts", "src/types/chat.ts"],
+        context_mode="skeleton",
         prompt="""Create a knowledge base service for document search (RAG).
 
 Functions:
@@ -487,6 +495,7 @@ Search using keyword matching and TF-IDF for now."""
         preferred_model="deepseek/deepseek-r1:free",
         fallback_models=["qwen/qwen-2.5-72b-instruct:free"],
         context_files=["api/_lib/aiService.ts", "src/types.ts"],
+        context_mode="skeleton",
         prompt="""Create a draft generator service for creating form drafts.
 
 Functions:
@@ -630,6 +639,7 @@ Include examples of good responses where helpful."""
             "api/chat/_lib/knowledgeBase.ts",
             "api/_lib/aiService.ts"
         ],
+        context_mode="skeleton",
         prompt="""Create the core chat service that orchestrates all chat functionality.
 
 Class: ChatService
@@ -674,6 +684,7 @@ Use aiService for AI generation."""
         preferred_model="cerebras/llama-3.3-70b",
         fallback_models=["groq/llama-3.1-8b-instant"],
         context_files=["api/chat/_lib/chatService.ts", "api/_lib/auth.ts"],
+        context_mode="skeleton",
         prompt="""Create the main chat API endpoint.
 
 Endpoint: POST /api/chat/message
@@ -716,6 +727,7 @@ Use Vercel edge runtime if possible for speed."""
         preferred_model="groq/llama-3.1-8b-instant",
         fallback_models=["cerebras/llama-3.3-70b"],
         context_files=["api/chat/_lib/chatService.ts"],
+        context_mode="skeleton",
         prompt="""Create the chat history API endpoint.
 
 Endpoints:
@@ -877,6 +889,9 @@ class ChatbotOrchestrator:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.completed_tasks: List[str] = []
         self.failed_tasks: List[str] = []
+        self.symbol_index = SymbolIndex(
+            str(self.project_root / "ai_team_output" / "cache" / "symbol_index.sqlite3")
+        )
 
     def get_tasks_for_phase(self, phase: TaskPhase) -> List[Task]:
         """Get all tasks for a specific phase"""
@@ -890,12 +905,16 @@ class ChatbotOrchestrator:
         return True
 
     def load_context_files(self, task: Task) -> str:
-        """Load content from context files"""
+        """Load content from context files (shared cache, so dependents reuse earlier reads)"""
         context = []
         for file_path in task.context_files:
             full_path = self.project_root / file_path
             if full_path.exists():
-                content = full_path.read_text(encoding='utf-8')
+                if task.context_mode == "skeleton" and SymbolIndex.supports(file_path):
+                    content = self.symbol_index.skeleton(str(full_path))
+                    context.append(f"=== {file_path} (declarations only) ===\n{content}\n")
+                    continue
+                content = read_text(str(full_path))
                 context.append(f"=== {file_path} ===\n{content}\n")
         return "\n".join(context)
 
@@ -5,6 +5,7 @@ Claude Code delegates tasks to AI workers (Grok, Qwen, DeepSeek, Gemini)
 Handles secure data sanitization and task coordination.
 """
 
+import io
 import os
 import sys
 import json
@@ -20,6 +21,9 @@ from enum import Enum
 from dotenv import load_dotenv
 load_dotenv()
 
+from file_cache import get_file_cache
+from stream_scan import replace_stream
+
 # Rich console for pretty output
 try:
     from rich.console import Console
@@ -76,43 +80,86 @@ class DataSanitizer:
         'SGAQualityAssurance': 'QASite',
     }
 
+    CHUNK_SIZE = 64 * 1024  # Characters read per chunk by create_context_safe
+    OVERLAP = 4096          # Held back and rescanned so values split across chunks are caught
+
+    _compiled: Dict[str, tuple] = {}
+
+    @classmethod
+    def _get_regex(cls, level: str):
+        """All patterns as one alternation of named groups, with each group's replacement"""
+        if level not in cls._compiled:
+            replacements = {name: replacement for name, (_, replacement) in cls.PII_PATTERNS.items()}
+            alternatives = [f"(?P<{name}>{pattern})" for name, (pattern, _) in cls.PII_PATTERNS.items()]
+            if level == "high":
+                # Longest term first, so SGAQualityAssurance is not cut short by SGA
+                for i, term in enumerate(sorted(cls.COMPANY_TERMS, key=len, reverse=True)):
+                    alternatives.append(f"(?P<term_{i}>{re.escape(term)})")
+                    replacements[f"term_{i}"] = cls.COMPANY_TERMS[term]
+            cls._compiled[level] = (re.compile("|".join(alternatives)), replacements)
+        return cls._compiled[level]
+
+    @classmethod
+    def _replace(cls, text: str, matches: list, replacements: Dict[str, str], start: int, end: int) -> str:
+        parts = []
+        last = start
+        for match in matches:
+            parts.append(text[last:match.start()])
+            parts.append(replacements[match.lastgroup])
+            last = match.end()
+        parts.append(text[last:end])
+        return "".join(parts)
+
     @classmethod
     def sanitize(cls, text: str, level: str = "standard") -> str:
-        """Sanitize text based on security level"""
+        """Sanitize text based on security level (one scan for all patterns)"""
         if level == "none":
             return text
 
-        result = text
-
-        # Replace PII patterns
-        for name, (pattern, replacement) in cls.PII_PATTERNS.items():
-            result = re.sub(pattern, replacement, result)
+        regex, replacements = cls._get_regex(level)
+        return regex.sub(lambda m: replacements[m.lastgroup], text)
 
-        # For high security, also anonymize company terms
-        if level == "high":
-            for term, replacement in cls.COMPANY_TERMS.items():
-                result = result.replace(term, replacement)
+    @classmethod
+    def sanitize_stream(cls, chunks, write, level: str = "standard"):
+        """
+        Sanitize text arriving in chunks, passing the result to `write` as it
+        goes (see stream_scan.replace_stream), so memory stays at about one
+        chunk however large the input is
+        """
+        if level == "none":
+            for chunk in chunks:
+                write(chunk)
+            return
 
-        return result
+        regex, replacements = cls._get_regex(level)
+        replace_stream(chunks, regex,
+                       lambda text, matches, start, end: cls._replace(text, matches, replacements, start, end),
+                       write, cls.OVERLAP)
 
     @classmethod
     def create_context_safe(cls, file_paths: List[str], base_dir: str) -> str:
-        """Read files and create sanitized context for AI workers"""
-        context_parts = []
+        """
+        Read files (through the shared file cache) and create sanitized context
+        for AI workers, streaming each file in chunks
+        """
+        context = io.StringIO()
 
         for file_path in file_paths:
             full_path = os.path.join(base_dir, file_path) if not os.path.isabs(file_path) else file_path
             if os.path.exists(full_path):
+                if context.tell():
+                    context.write("\n")
+                mark = context.tell()
                 try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    # Sanitize the content
-                    safe_content = cls.sanitize(content)
-                    context_parts.append(f"### File: {os.path.basename(file_path)}\n```\n{safe_content}\n```\n")
+                    context.write(f"### File: {os.path.basename(file_path)}\n```\n")
+                    cls.sanitize_stream(get_file_cache().iter_chunks(full_path, cls.CHUNK_SIZE), context.write)
+                    context.write("\n```\n")
                 except Exception as e:
-                    context_parts.append(f"### File: {file_path}\n[Error reading: {e}]\n")
+                    context.seek(mark)
+                    context.truncate()
+                    context.write(f"### File: {file_path}\n[Error reading: {e}]\n")
 
-        return "\n".join(context_parts)
+        return context.getvalue()
 
 
 class AIWorker:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Output Size Estimates
+===================================
+How many completion tokens a task is likely to need, so each request can ask
+for that as max_tokens instead of a blanket 8192. On Groq's free tier
+(tpm: 6000) a blanket reservation alone fills most of a minute's budget;
+sized requests leave room for more of them, and a short task stops the
+provider from holding a long generation slot for it.
+
+An estimate is per deliverable (output file) and per task type. Until a type
+has MIN_SAMPLES finished outputs it comes from a fixed prior; after that it is
+the 90th percentile of that type's recent outputs per deliverable, plus
+HEADROOM. Output sizes are kept in SQLite, so later runs start from history.
+
+Usage:
+    from output_budget import get_output_estimator
+
+    estimator = get_output_estimator()
+    max_tokens = estimator.estimate("endpoint", deliverables=1)
+    ...
+    estimator.record("endpoint", 1, completion_tokens)
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from contextlib import closing
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+HISTORY = 50                # Recent outputs per task type used for estimates
+MIN_SAMPLES = 3             # Below this, the prior is used
+PERCENTILE = 0.9
+HEADROOM = 1.25             # Margin over the percentile, so few outputs are cut short
+MIN_OUTPUT_TOKENS = 1024
+
+BASE_TOKENS = 512           # Explanation and assumptions around the code
+DEFAULT_PER_DELIVERABLE = 2048
+PER_DELIVERABLE = {
+    "component": 2560,
+    "endpoint": 2048,
+    "review": 1536,
+}
+
+
+class OutputEstimator:
+    """Expected completion tokens per task type, learned from past outputs"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path: Optional[str] = None
+        self._history: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        if path:
+            self.attach_store(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def attach_store(self, path: str):
+        """Load recent output sizes from (and record new ones to) a SQLite database"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outputs (
+                    id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    deliverables INTEGER NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    recorded_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outputs_kind ON outputs(kind, id)")
+            rows = conn.execute("""
+                SELECT kind, deliverables, tokens FROM (
+                    SELECT kind, deliverables, tokens, id,
+                           ROW_NUMBER() OVER (PARTITION BY kind ORDER BY id DESC) AS recent
+                    FROM outputs
+                ) WHERE recent <= ? ORDER BY id
+            """, (HISTORY,)).fetchall()
+        with self._lock:
+            # Task types with outputs in this process so far keep their own history
+            known = set(self._history)
+            for kind, deliverables, tokens in rows:
+                if kind not in known:
+                    self._history.setdefault(kind, deque(maxlen=HISTORY)).append(
+                        tokens / max(1, deliverables)
+                    )
+
+    def estimate(self, kind: str, deliverables: int = 1) -> int:
+        """Completion tokens to ask for: learned per-deliverable size, or the prior"""
+        deliverables = max(1, deliverables)
+        with self._lock:
+            samples = sorted(self._history.get(kind, ()))
+        if len(samples) >= MIN_SAMPLES:
+            per_deliverable = samples[min(len(samples) - 1, int(PERCENTILE * len(samples)))]
+            expected = per_deliverable * HEADROOM * deliverables
+        else:
+            expected = BASE_TOKENS + PER_DELIVERABLE.get(kind, DEFAULT_PER_DELIVERABLE) * deliverables
+        return max(MIN_OUTPUT_TOKENS, int(expected))
+
+    def record(self, kind: str, deliverables: int, completion_tokens: int):
+        """Add the size of a finished output to its task type's history"""
+        if completion_tokens <= 0:
+            return
+        deliverables = max(1, deliverables)
+        with self._lock:
+            self._history.setdefault(kind, deque(maxlen=HISTORY)).append(
+                completion_tokens / deliverables
+            )
+        if not self.path:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO outputs (kind, deliverables, tokens, recorded_at) VALUES (?, ?, ?, ?)",
+                (kind, deliverables, completion_tokens, time.time()),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Outputs on record and current single-deliverable estimate per task type"""
+        with self._lock:
+            kinds = {kind: len(samples) for kind, samples in self._history.items()}
+        return {kind: {"samples": n, "estimate": self.estimate(kind)} for kind, n in sorted(kinds.items())}
+
+
+_output_estimator = OutputEstimator()
+
+
+def get_output_estimator() -> OutputEstimator:
+    """The process-wide output size estimator"""
+    return _output_estimator
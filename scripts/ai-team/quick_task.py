@@ -59,8 +59,8 @@ def run_with_gemini(prompt: str) -> str:
 
 def run_with_openai_compatible(prompt: str, api_key: str, base_url: str, model: str) -> str:
     """Run with OpenAI-compatible API"""
-    from openai import OpenAI
-    client = OpenAI(api_key=api_key, base_url=base_url)
+    from http_pool import get_openai_client
+    client = get_openai_client(api_key, base_url)
     response = client.chat.completions.create(
         model=model,
         messages=[
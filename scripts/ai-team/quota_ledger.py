@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Daily Quota Ledger
+================================
+Persistent count of requests and tokens sent per provider, API key and model,
+bucketed by each provider's daily quota window.
+
+WorkerStats and the in-memory rate limiters start from zero on every run, so
+without this a second run the same day believes it has full free-tier quota and
+only finds out otherwise through 429s. The ledger is a SQLite database in WAL
+mode, shared safely by concurrent orchestrator processes. API keys are stored
+as short SHA-256 fingerprints, never in clear text.
+
+Usage:
+    from quota_ledger import QuotaLedger, key_fingerprint
+
+    ledger = QuotaLedger("ai_team_output/logs/quota.sqlite3")
+    key_id = key_fingerprint(api_key)
+    ledger.record("groq", key_id, "llama-3.3-70b-versatile", tokens=812)
+    requests, tokens = ledger.usage("groq", key_id, "llama-3.3-70b-versatile")
+"""
+
+import os
+import sqlite3
+import hashlib
+from contextlib import closing
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional, Tuple
+
+
+# Daily quotas reset at local midnight in these zones (everyone else: 00:00 UTC)
+RESET_TIMEZONES = {
+    "gemini": "America/Los_Angeles",
+}
+RETENTION_DAYS = 14  # Older windows are pruned on open
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """Stable, non-reversible id for an API key"""
+    if not api_key:
+        return "-"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def _reset_zone(provider: str) -> tzinfo:
+    name = RESET_TIMEZONES.get(provider)
+    if name:
+        try:
+            from zoneinfo import ZoneInfo
+            return ZoneInfo(name)
+        except Exception:
+            pass  # No tz database available - fall back to UTC
+    return timezone.utc
+
+
+def quota_window(provider: str, now: Optional[datetime] = None) -> Tuple[str, datetime]:
+    """Current daily window for a provider: (label, UTC time it resets)"""
+    local = (now or datetime.now(timezone.utc)).astimezone(_reset_zone(provider))
+    start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=1)  # Wall-clock midnight, so DST days are handled
+    return start.date().isoformat(), end.astimezone(timezone.utc)
+
+
+class QuotaLedger:
+    """SQLite-backed per-window usage counters"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS usage (
+                    provider TEXT NOT NULL,
+                    key_id TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    window TEXT NOT NULL,
+                    requests INTEGER NOT NULL DEFAULT 0,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (provider, key_id, model, window)
+                )
+            """)
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).date().isoformat()
+            conn.execute("DELETE FROM usage WHERE window < ?", (cutoff,))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, provider: str, key_id: str, model: str, requests: int = 1, tokens: int = 0):
+        """Add usage to the provider's current window"""
+        window, _ = quota_window(provider)
+        now = datetime.now(timezone.utc).timestamp()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO usage (provider, key_id, model, window, requests, tokens, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (provider, key_id, model, window) DO UPDATE SET "
+                "requests = requests + excluded.requests, "
+                "tokens = tokens + excluded.tokens, "
+                "updated_at = excluded.updated_at",
+                (provider, key_id, model or "", window, requests, max(0, tokens), now),
+            )
+
+    def usage(self, provider: str, key_id: str, model: Optional[str] = None) -> Tuple[int, int]:
+        """(requests, tokens) used in the current window; model=None sums every model on the key"""
+        window, _ = quota_window(provider)
+        query = ("SELECT COALESCE(SUM(requests), 0), COALESCE(SUM(tokens), 0) FROM usage "
+                 "WHERE provider = ? AND key_id = ? AND window = ?")
+        params = [provider, key_id, window]
+        if model is not None:
+            query += " AND model = ?"
+            params.append(model)
+        with closing(self._connect()) as conn:
+            requests, tokens = conn.execute(query, params).fetchone()
+        return requests, tokens
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Persistent Response Cache
+=======================================
+Content-addressed on-disk cache for provider responses, so re-running a task
+set does not spend free-tier quota on prompts that were already answered.
+
+Entries are keyed by a SHA-256 of the worker, model, system prompt, sanitized
+prompt and sampling parameters. Storage is a SQLite database in WAL mode, which
+makes it safe for several orchestrator processes to share. The cache is capped
+by total response size (least-recently-used entries are evicted first) and
+entries expire after a TTL.
+
+Usage:
+    from response_cache import ResponseCache
+
+    cache = ResponseCache("ai_team_output/cache/responses.sqlite3")
+    key = cache.make_key(model="llama-3.3-70b", prompt=prompt, temperature=0.7)
+    hit = cache.get(key)
+    if hit is None:
+        cache.put(key, response_text, tokens, model="llama-3.3-70b")
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024     # 256 MB of response text
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60    # 7 days
+EVICT_TO_FRACTION = 0.9                   # Evict down to 90% of the cap
+
+
+class ResponseCache:
+    """SQLite-backed LRU + TTL cache of (response, tokens) by content hash"""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection (one per call keeps threads and processes independent)"""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Hash everything that determines a response into a stable cache key"""
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """Return (response, tokens) for a live entry, refreshing its LRU position"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT response, tokens, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, tokens, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return response, tokens
+
+    def put(self, key: str, response: str, tokens: int, model: str = None):
+        """Store a response and evict expired / least-recently-used entries over the cap"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, model, response, tokens, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, response, tokens, size, now, now),
+                )
+                self._evict(conn, now)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * EVICT_TO_FRACTION)
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self):
+        """Remove every entry"""
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and total stored bytes"""
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": entries, "bytes": size}
+
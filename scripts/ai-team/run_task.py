@@ -15,6 +15,8 @@ from dotenv import load_dotenv
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv(os.path.join(project_root, '.env'))
 
+from http_pool import get_openai_client
+
 def get_worker(worker_name: str):
     """Get the appropriate AI worker"""
 
@@ -25,22 +27,19 @@ def get_worker(worker_name: str):
         return ("gemini", genai.GenerativeModel("gemini-2.0-flash"))
 
     elif worker_name in ["grok1", "grok2"]:
-        from openai import OpenAI
         key_num = "1" if worker_name == "grok1" else "2"
         api_key = os.getenv(f"OPENCODE_API_KEY_{key_num}")
-        client = OpenAI(api_key=api_key, base_url="https://api.opencode.ai/v1")
+        client = get_openai_client(api_key, "https://api.opencode.ai/v1")
         return ("grok", client)
 
     elif worker_name == "qwen":
-        from openai import OpenAI
         api_key = os.getenv("OPENROUTER_API_KEY_1")
-        client = OpenAI(api_key=api_key, base_url="https://openrouter.ai/api/v1")
+        client = get_openai_client(api_key, "https://openrouter.ai/api/v1")
         return ("qwen", client)
 
     elif worker_name == "deepseek":
-        from openai import OpenAI
         api_key = os.getenv("OPENROUTER_API_KEY_2")
-        client = OpenAI(api_key=api_key, base_url="https://openrouter.ai/api/v1")
+        client = get_openai_client(api_key, "https://openrouter.ai/api/v1")
         return ("deepseek", client)
 
     else:
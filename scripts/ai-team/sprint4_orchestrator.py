@@ -19,6 +19,8 @@ from typing import Dict, List, Optional, Any
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
+from continuation import MAX_CONTINUATIONS, continuation_prompt, stitch
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -46,8 +48,8 @@ class AIAgent:
         """Assign a workstream to this agent"""
         self.workstreams.append(workstream_id)
 
-    def call_api(self, prompt: str, system_prompt: str = None) -> Dict[str, Any]:
-        """Call the AI agent's API"""
+    def _request(self, prompt: str, system_prompt: str = None):
+        """URL, headers and JSON body of one API call"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -85,22 +87,42 @@ class AIAgent:
                 "temperature": 0.7,
                 "max_tokens": 8192
             }
+        return url, headers, data
+
+    def _post(self, prompt: str, system_prompt: str = None):
+        """One API call: (text, tokens, stopped at the token limit)"""
+        url, headers, data = self._request(prompt, system_prompt)
+        response = requests.post(url, headers=headers, json=data, timeout=120)
+        response.raise_for_status()
+        result = response.json()
+
+        # Extract response text based on provider
+        if "generativelanguage.googleapis.com" in self.api_endpoint:
+            candidate = result["candidates"][0]
+            text = candidate["content"]["parts"][0]["text"]
+            tokens = result.get("usageMetadata", {}).get("totalTokenCount", 0)
+            truncated = candidate.get("finishReason") == "MAX_TOKENS"
+        else:
+            choice = result["choices"][0]
+            text = choice["message"]["content"]
+            tokens = result.get("usage", {}).get("total_tokens", 0)
+            truncated = choice.get("finish_reason") == "length"
+        return text, tokens, truncated
 
+    def call_api(self, prompt: str, system_prompt: str = None) -> Dict[str, Any]:
+        """Call the AI agent's API, continuing a response cut off at the token limit"""
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=120)
-            response.raise_for_status()
-            result = response.json()
-
-            # Extract response text based on provider
-            if "generativelanguage.googleapis.com" in self.api_endpoint:
-                text = result["candidates"][0]["content"]["parts"][0]["text"]
-                tokens = result.get("usageMetadata", {}).get("totalTokenCount", 0)
-            else:
-                text = result["choices"][0]["message"]["content"]
-                tokens = result.get("usage", {}).get("total_tokens", 0)
+            text, tokens, truncated = self._post(prompt, system_prompt)
+            continuations = 0
+            while truncated and continuations < MAX_CONTINUATIONS:
+                more, more_tokens, truncated = self._post(continuation_prompt(prompt, text), system_prompt)
+                text, tokens = stitch(text, more), tokens + more_tokens
+                continuations += 1
+                truncated = truncated and bool(more)
 
             self.total_tokens += tokens
-            return {"success": True, "text": text, "tokens": tokens}
+            return {"success": True, "text": text, "tokens": tokens,
+                    "continuations": continuations, "truncated": truncated}
 
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -353,6 +375,10 @@ Begin implementation now:"""
         if result["success"]:
             self.log(f"✅ {agent.name} completed {ws_id} in {elapsed_time:.1f}s")
             self.log(f"   Tokens used: {result['tokens']}")
+            if result["continuations"]:
+                self.log(f"   Continued {result['continuations']}x after hitting the token limit")
+            if result["truncated"]:
+                self.log(f"   ⚠️  {ws_id} output is still cut off at the token limit", "WARN")
 
             # Save deliverable
             agent_dir = self.deliverables_dir / agent.name.lower().replace(" ", "_").split("_")[0]
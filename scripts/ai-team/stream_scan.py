@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Chunked Regex Replacement
+=======================================
+Regex replacement over text that arrives in chunks (a context file read
+64 KB at a time), used by the sanitizers of both orchestrators. Memory stays
+at about one chunk plus the overlap, however large the input.
+
+The last `overlap` characters of each window are held back and scanned again
+with the next chunk, so a value split across two chunks is still caught; a
+match that reaches the end of the window is held back whole. One character of
+already-written text is kept as left context, so \\b anchors behave as they do
+on the whole text. Windows are replaced in order, so a `replace` that numbers
+values by first appearance numbers them exactly as one pass over the whole
+text would.
+
+Usage:
+    from stream_scan import replace_stream
+
+    replace_stream(chunks, regex, replace, out.write)
+    # replace(text, matches, start, end) -> text[start:end] with matches replaced
+"""
+
+import re
+from typing import Any, Callable, Iterable, List
+
+
+OVERLAP = 4096  # Longest value sure to be caught across a chunk boundary
+
+Replace = Callable[[str, List["re.Match"], int, int], str]
+
+
+def replace_stream(chunks: Iterable[str], regex: "re.Pattern", replace: Replace,
+                   write: Callable[[str], Any], overlap: int = OVERLAP):
+    """Pass `chunks` to `write` with every match of `regex` swapped by `replace`"""
+    buffer = ""
+    start = 0  # buffer[:start] is already written (kept as left context for \b)
+    for chunk in chunks:
+        buffer += chunk
+        cut = len(buffer) - overlap
+        if cut <= start:
+            continue
+        matches = []
+        for match in regex.finditer(buffer, start):
+            if match.start() >= cut:
+                break
+            if match.end() >= len(buffer) and match.start() > start:
+                cut = match.start()  # May continue in the next chunk
+                break
+            matches.append(match)
+            cut = max(cut, match.end())
+        write(replace(buffer, matches, start, cut))
+        buffer, start = buffer[cut - 1:], 1
+    if len(buffer) > start:
+        write(replace(buffer, list(regex.finditer(buffer, start)), start, len(buffer)))
@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - TypeScript Symbol Index
+=====================================
+Symbol table of the imports, exports, interfaces, types and function / class
+signatures of .ts/.tsx files, for "skeleton" context: a task that only needs
+to know what a module exposes gets its declarations without the bodies, which
+is usually a tenth of the tokens of the whole file.
+
+Parsing is a small lexical scanner (strings, comments, template literals and
+regex literals are skipped; brackets are balanced) that splits a file into
+top-level statements and classifies each one. It is not a type checker, and a
+file it cannot split sensibly simply yields fewer symbols.
+
+Parsed symbol tables are stored in a SQLite database (WAL mode) keyed by a
+SHA-256 of the file content, so an unchanged file is never parsed twice, across
+runs and processes, and files with identical content share an entry.
+
+pack_context() fits several files into a token budget by structure rather
+than by position: imports first, then exported types, then every signature,
+then function bodies, so a file is never cut off in the middle of a function.
+
+Usage:
+    from symbol_index import SymbolIndex
+
+    index = SymbolIndex("ai_team_output/cache/symbol_index.sqlite3")
+    print(index.skeleton("src/types/chat.ts"))
+    for symbol in index.symbols("api/_lib/aiService.ts"):
+        print(symbol.kind, symbol.name, symbol.start_line, symbol.end_line)
+"""
+
+import os
+import re
+import json
+import time
+import bisect
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from file_cache import get_file_cache
+
+
+PARSER_VERSION = 1              # Bump when parsing changes, so stored tables are rebuilt
+EXTENSIONS = {".ts", ".tsx", ".mts", ".cts"}
+ROOTS = ("src", "api")
+SKIP_DIRS = {"node_modules", ".git", "dist", "build", ".next", ".vercel", "coverage"}
+MAX_FILE_BYTES = 1024 * 1024
+MEMORY_ENTRIES = 512            # Parsed tables kept in memory per index
+SHORT_VALUE_LINES = 3           # Non-function constants up to this long are kept whole
+
+# Structural priorities for fitting context into a token budget, filled in this order
+TIER_IMPORTS, TIER_EXPORTED_TYPES, TIER_SIGNATURES, TIER_BODIES = range(4)
+
+# A "/" after one of these starts a regex literal rather than a division
+_REGEX_PREFIX = set("(,=:[!&|?{};+-*%<>~^")
+# A statement does not end at a newline after / before one of these
+_CONTINUE_AFTER = set("=,|&+-*/%?:<.([{!~^")
+_CONTINUE_BEFORE = set(".|&?:=+-*/%,)]}>{")
+_CONTINUE_WORDS = re.compile(r"(?:as|extends|implements|satisfies|keyof|in|instanceof)\b")
+
+_DECLARATION = re.compile(
+    r"(?P<export>export\s+(?:default\s+)?)?(?:declare\s+)?(?:abstract\s+)?"
+    r"(?P<keyword>interface|type|const\s+enum|enum|namespace|module|global"
+    r"|(?:async\s+)?function\s*\*?|class|const|let|var)\b\s*(?P<name>[A-Za-z_$][\w$]*)?"
+)
+_TYPE_KEYWORDS = {"interface", "type", "enum", "namespace", "module", "global"}
+
+
+@dataclass
+class Symbol:
+    """One top-level declaration (lines are 1-based, inclusive)"""
+    kind: str            # import | export | type | function | class | const
+    name: str
+    exported: bool
+    start_line: int
+    end_line: int
+    signature: str       # The declaration with bodies and long initializers elided
+
+
+@dataclass
+class _Statement:
+    start: int
+    end: int
+    groups: List[Tuple[str, int, int]]   # Top-level bracket groups: (opener, open offset, close offset)
+
+
+# ----------------------------------------------------------------------
+# Lexical scanning
+# ----------------------------------------------------------------------
+
+def _skip_string(text: str, i: int) -> int:
+    """Offset after the string literal starting at i (strings end at a newline)"""
+    quote, n = text[i], len(text)
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        if c == "\n":
+            return i
+        i += 1
+    return n
+
+
+def _skip_regex(text: str, i: int) -> int:
+    """Offset after the regex literal starting at i"""
+    n, in_class = len(text), False
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            return i
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            i += 1
+            while i < n and (text[i].isalnum() or text[i] == "_"):
+                i += 1   # Flags
+            return i
+        i += 1
+    return n
+
+
+def _skip_template(text: str, i: int) -> int:
+    """Offset after the template literal starting at i, including ${...} expressions"""
+    n = len(text)
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "`":
+            return i + 1
+        if c == "$" and text.startswith("${", i):
+            i = _skip_expression(text, i + 2)
+            continue
+        i += 1
+    return n
+
+
+def _skip_expression(text: str, i: int) -> int:
+    """Offset after the "}" that closes a template ${ expression starting at i"""
+    n, depth = len(text), 0
+    while i < n:
+        c = text[i]
+        if c in "\"'":
+            i = _skip_string(text, i)
+            continue
+        if c == "`":
+            i = _skip_template(text, i)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+    return n
+
+
+def _code_chars(text: str) -> List[Tuple[int, str]]:
+    """
+    (offset, char) for every significant character: whitespace and comments
+    are dropped (newlines kept), and each string, template or regex literal
+    becomes one quote character at its start offset.
+    """
+    chars: List[Tuple[int, str]] = []
+    n, i, prev = len(text), 0, ""
+    while i < n:
+        c = text[i]
+        if c == "\n":
+            chars.append((i, c))
+            i += 1
+        elif c.isspace():
+            i += 1
+        elif text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif c in "\"'`" or (c == "/" and (not prev or prev in _REGEX_PREFIX)):
+            if c == "`":
+                end = _skip_template(text, i)
+            elif c == "/":
+                end = _skip_regex(text, i)
+            else:
+                end = _skip_string(text, i)
+            chars.append((i, '"'))
+            prev, i = '"', end
+        else:
+            chars.append((i, c))
+            prev = c
+            i += 1
+    return chars
+
+
+def _statements(text: str) -> List[_Statement]:
+    """Split code into top-level statements (ending at ";" or a line break that ends one)"""
+    chars = _code_chars(text)
+    # Index of the next character that is not a newline, for each position
+    following = [len(chars)] * (len(chars) + 1)
+    for k in range(len(chars) - 1, -1, -1):
+        following[k] = k if chars[k][1] != "\n" else following[k + 1]
+    statements: List[_Statement] = []
+    depth, start, last = 0, None, ""
+    stack: List[Tuple[str, int]] = []
+    groups: List[Tuple[str, int, int]] = []
+    end = 0
+
+    def close():
+        nonlocal start, groups
+        statements.append(_Statement(start, end, groups))
+        start, groups = None, []
+
+    for k, (i, c) in enumerate(chars):
+        if c == "\n":
+            if start is None or depth or last in _CONTINUE_AFTER:
+                continue
+            if following[k] == len(chars):
+                continue
+            offset, next_char = chars[following[k]]
+            if next_char in _CONTINUE_BEFORE:
+                continue
+            if _CONTINUE_WORDS.match(text, offset) or text[end - 2:end] == "=>":
+                continue
+            close()
+            continue
+        if start is None:
+            start = i
+        if c in "([{":
+            stack.append((c, i))
+            depth += 1
+        elif c in ")]}" and stack:
+            opener, open_offset = stack.pop()
+            depth -= 1
+            if depth == 0:
+                groups.append((opener, open_offset, i))
+        end = i + 1
+        last = c
+        if c == ";" and depth == 0:
+            close()
+    if start is not None:
+        close()
+    return statements
+
+
+# ----------------------------------------------------------------------
+# Classification
+# ----------------------------------------------------------------------
+
+def _body(statement: _Statement, text: str) -> Optional[Tuple[int, int]]:
+    """(open, close) of a final { } group the statement ends with, if any"""
+    if not statement.groups:
+        return None
+    opener, open_offset, close_offset = statement.groups[-1]
+    if opener != "{" or text[close_offset + 1:statement.end].strip(" \t\n;"):
+        return None
+    return open_offset, close_offset
+
+
+def _top_level_index(text: str, statement: _Statement, token: str) -> int:
+    """Offset of the first `token` outside every bracket group, or -1"""
+    position = statement.start
+    for _, open_offset, close_offset in statement.groups:
+        found = _find_code(text, token, position, open_offset)
+        if found >= 0:
+            return found
+        position = close_offset + 1
+    return _find_code(text, token, position, statement.end)
+
+
+def _find_code(text: str, token: str, start: int, end: int) -> int:
+    for offset, _ in _code_chars(text[start:end]):
+        if text.startswith(token, start + offset):
+            if token == "=" and text[start + offset + 1:start + offset + 2] in ("=", ">"):
+                continue
+            if token == "=" and text[start + offset - 1:start + offset] in "=!<>":
+                continue
+            return start + offset
+    return -1
+
+
+def _collapse(signature: str) -> str:
+    return "\n".join(line.rstrip() for line in signature.strip().splitlines())
+
+
+def _elide_body(text: str, statement: _Statement) -> Optional[str]:
+    body = _body(statement, text)
+    if body is None:
+        return None
+    return _collapse(text[statement.start:body[0]]) + " { ... }"
+
+
+def _class_skeleton(text: str, statement: _Statement) -> str:
+    body = _body(statement, text)
+    if body is None:
+        return _collapse(text[statement.start:statement.end])
+    inner = text[body[0] + 1:body[1]]
+    members = []
+    for member in _statements(inner):
+        source = inner[member.start:member.end]
+        if source.startswith(("private", "#", "protected")):
+            continue
+        member_body = _body(member, inner)
+        if member_body is not None and "(" in inner[member.start:member_body[0]]:
+            members.append(_collapse(inner[member.start:member_body[0]]) + ";")
+            continue
+        equals = _top_level_index(inner, member, "=")
+        if equals >= 0:
+            members.append(_collapse(inner[member.start:equals]) + ";")
+        else:
+            members.append(_collapse(source).rstrip(";") + ";")
+    header = _collapse(text[statement.start:body[0]])
+    if not members:
+        return header + " {}"
+    return header + " {\n" + "\n".join("  " + m.replace("\n", "\n  ") for m in members) + "\n}"
+
+
+def _const_signature(text: str, statement: _Statement) -> Tuple[str, str]:
+    """(kind, signature) for a const/let/var statement"""
+    source = text[statement.start:statement.end]
+    elided = _elide_body(text, statement)
+    if elided is not None and elided[:-len(" { ... }")].rstrip().endswith("=>"):
+        return "function", elided
+    arrow = _top_level_index(text, statement, "=>")
+    if arrow >= 0:
+        return "function", _collapse(text[statement.start:arrow]) + " => ..."
+    if source.count("\n") < SHORT_VALUE_LINES:
+        return "const", _collapse(source)
+    equals = _top_level_index(text, statement, "=")
+    if equals < 0:
+        return "const", _collapse(source)
+    return "const", _collapse(text[statement.start:equals]) + " = ..."
+
+
+def parse_typescript(text: str) -> List[Symbol]:
+    """Top-level symbols of a TypeScript / TSX module, in source order"""
+    newlines = [i for i, c in enumerate(text) if c == "\n"]
+
+    def line_of(offset: int) -> int:
+        return bisect.bisect_left(newlines, offset) + 1
+
+    symbols: List[Symbol] = []
+    for statement in _statements(text):
+        source = text[statement.start:statement.end]
+        lines = (line_of(statement.start), line_of(max(statement.start, statement.end - 1)))
+
+        if source.startswith("import"):
+            symbols.append(Symbol("import", "", False, *lines, _collapse(source)))
+            continue
+        if re.match(r"export\s*(?:\*|\{|type\s*\{)", source) or re.match(r"export\s*=", source):
+            symbols.append(Symbol("export", "", True, *lines, _collapse(source)))
+            continue
+
+        match = _DECLARATION.match(source)
+        if not match:
+            if source.startswith("export default"):
+                symbols.append(Symbol("export", "default", True, *lines, _collapse(source)))
+            continue
+        exported = bool(match.group("export"))
+        keyword = match.group("keyword").split()[-1].rstrip("*")
+        name = match.group("name") or ("default" if exported else "")
+
+        if keyword in _TYPE_KEYWORDS:
+            symbols.append(Symbol("type", name, exported, *lines, _collapse(source)))
+        elif keyword == "function":
+            signature = _elide_body(text, statement) or _collapse(source)
+            symbols.append(Symbol("function", name, exported, *lines, signature))
+        elif keyword == "class":
+            symbols.append(Symbol("class", name, exported, *lines, _class_skeleton(text, statement)))
+        else:
+            kind, signature = _const_signature(text, statement)
+            symbols.append(Symbol(kind, name, exported, *lines, signature))
+    return symbols
+
+
+def render_skeleton(symbols: Iterable[Symbol]) -> str:
+    """
+    Skeleton text: imports, then every type and class declaration and the
+    signatures of exported functions and constants, in source order.
+    """
+    imports, declarations = [], []
+    for symbol in symbols:
+        if symbol.kind == "import":
+            imports.append(symbol.signature)
+        elif symbol.kind in ("type", "class", "export") or symbol.exported:
+            declarations.append(symbol.signature)
+    parts = []
+    if imports:
+        parts.append("\n".join(imports))
+    if declarations:
+        parts.append("\n\n".join(declarations))
+    return "\n\n".join(parts) + "\n" if parts else ""
+
+
+# ----------------------------------------------------------------------
+# Budgeted packing
+# ----------------------------------------------------------------------
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def symbol_tier(symbol: Symbol) -> int:
+    """Packing priority of a symbol's signature"""
+    if symbol.kind == "import":
+        return TIER_IMPORTS
+    if symbol.exported and symbol.kind in ("type", "export"):
+        return TIER_EXPORTED_TYPES
+    return TIER_SIGNATURES
+
+
+@dataclass
+class ContextFile:
+    """A file offered to pack_context (symbols is None for files sent whole or not at all)"""
+    label: str
+    text: str
+    symbols: Optional[List[Symbol]] = None
+    max_tier: int = TIER_BODIES     # TIER_SIGNATURES for declarations only
+
+
+@dataclass
+class PackedFile:
+    label: str
+    text: str           # What fitted ("" if nothing did)
+    omitted: int        # Declarations (or whole files) left out
+    condensed: bool     # True unless the file is sent exactly as on disk
+
+
+def _symbol_source(lines: List[str], symbol: Symbol) -> str:
+    return "\n".join(lines[symbol.start_line - 1:symbol.end_line])
+
+
+def pack_context(files: List[ContextFile], budget: int,
+                 count_tokens: Optional[Callable[[str], int]] = None) -> List[PackedFile]:
+    """
+    Fit files into `budget` tokens by priority across all of them: imports,
+    exported types, signatures, then bodies (a body is only added after its
+    signature, and replaces it). Files without symbols are one body-priority
+    unit. Units that do not fit are skipped, so smaller ones later still can.
+    """
+    count_tokens = count_tokens or _estimate_tokens
+    lines = [f.text.splitlines() if f.symbols is not None else None for f in files]
+    # (tier, file, position, symbol or -1 for a whole file, is_body, cost)
+    units = []
+    for i, f in enumerate(files):
+        if f.symbols is None:
+            units.append((TIER_BODIES, i, 0, -1, False, count_tokens(f.text)))
+            continue
+        for j, symbol in enumerate(f.symbols):
+            tier = symbol_tier(symbol)
+            if tier > f.max_tier:
+                continue
+            cost = count_tokens(symbol.signature)
+            units.append((tier, i, j, j, False, cost))
+            source = _symbol_source(lines[i], symbol)
+            if f.max_tier >= TIER_BODIES and source.strip() != symbol.signature.strip():
+                units.append((TIER_BODIES, i, j, j, True, count_tokens(source) - cost))
+
+    remaining = budget
+    chosen, used = set(), [0] * len(files)
+    for _, i, _, j, is_body, cost in sorted(units, key=lambda u: u[:3] + (u[4],)):
+        if is_body and (i, j, False) not in chosen:
+            continue
+        if cost <= remaining:
+            chosen.add((i, j, is_body))
+            remaining -= cost
+            used[i] += cost
+
+    packed = []
+    for i, f in enumerate(files):
+        file_units = [(u[1], u[3], u[4]) for u in units if u[1] == i]
+        complete = all(unit in chosen for unit in file_units) and f.max_tier >= TIER_BODIES
+        if f.symbols is None:
+            packed.append(PackedFile(f.label, f.text if complete else "", 0 if complete else 1, False))
+            continue
+        if complete:
+            # Everything fitted: send the file itself (comments and all) if that fits too
+            extra = count_tokens(f.text) - used[i]
+            if extra <= remaining:
+                remaining -= extra
+                packed.append(PackedFile(f.label, f.text, 0, False))
+                continue
+        imports, declarations, omitted = [], [], 0
+        for j, symbol in enumerate(f.symbols):
+            if (i, j, True) in chosen:
+                text = _symbol_source(lines[i], symbol)
+            elif (i, j, False) in chosen:
+                text = symbol.signature
+            else:
+                omitted += 1
+                continue
+            (imports if symbol.kind == "import" else declarations).append(text)
+        parts = ["\n".join(imports)] if imports else []
+        if declarations:
+            parts.append("\n\n".join(declarations))
+        if omitted:
+            parts.append(f"// ... {omitted} declaration(s) omitted to fit the context budget")
+        packed.append(PackedFile(f.label, "\n\n".join(parts), omitted, True))
+    return packed
+
+
+# ----------------------------------------------------------------------
+# Persistent index
+# ----------------------------------------------------------------------
+
+class SymbolIndex:
+    """Symbol tables of TypeScript files, stored on disk by content hash"""
+
+    def __init__(self, path: str, memory_entries: int = MEMORY_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.parsed = 0
+        self.loaded = 0
+        self._memory: "OrderedDict[str, List[Symbol]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS symbols (
+                    hash TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    symbols TEXT NOT NULL,
+                    indexed_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def supports(path: str) -> bool:
+        """True for the file types the index can parse"""
+        return os.path.splitext(path)[1].lower() in EXTENSIONS
+
+    def _remember(self, digest: str, symbols: List[Symbol]):
+        with self._lock:
+            self._memory[digest] = symbols
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def symbols_for_text(self, text: str) -> List[Symbol]:
+        """Symbol table for TypeScript source, parsed at most once per content"""
+        digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+        with self._lock:
+            symbols = self._memory.get(digest)
+            if symbols is not None:
+                self._memory.move_to_end(digest)
+                return symbols
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT symbols FROM symbols WHERE hash = ? AND version = ?", (digest, PARSER_VERSION)
+            ).fetchone()
+        if row is not None:
+            symbols = [Symbol(**entry) for entry in json.loads(row[0])]
+            self.loaded += 1
+        else:
+            symbols = parse_typescript(text)
+            self.parsed += 1
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO symbols (hash, version, symbols, indexed_at) VALUES (?, ?, ?, ?)",
+                    (digest, PARSER_VERSION, json.dumps([asdict(s) for s in symbols]), time.time()),
+                )
+        self._remember(digest, symbols)
+        return symbols
+
+    def symbols(self, path: str) -> List[Symbol]:
+        """Symbol table of a file (read through the shared file cache)"""
+        return self.symbols_for_text(get_file_cache().read_text(path))
+
+    def skeleton(self, path: str) -> str:
+        """Declarations-only view of a file"""
+        return render_skeleton(self.symbols(path))
+
+    def index_tree(self, project_dir: str, roots: Iterable[str] = ROOTS) -> int:
+        """Index every TypeScript file under the roots; returns how many were parsed"""
+        before = self.parsed
+        for root in roots:
+            for dirpath, dirnames, filenames in os.walk(os.path.join(project_dir, root)):
+                dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+                for name in filenames:
+                    full_path = os.path.join(dirpath, name)
+                    if not self.supports(name):
+                        continue
+                    try:
+                        if os.path.getsize(full_path) <= MAX_FILE_BYTES:
+                            self.symbols(full_path)
+                    except (OSError, UnicodeDecodeError):
+                        continue
+        return self.parsed - before
+
+    def stats(self) -> Dict[str, int]:
+        """Stored tables, and tables parsed / loaded from disk by this process"""
+        with closing(self._connect()) as conn:
+            stored, = conn.execute(
+                "SELECT COUNT(*) FROM symbols WHERE version = ?", (PARSER_VERSION,)
+            ).fetchone()
+        return {"stored": stored, "parsed": self.parsed, "loaded": self.loaded}
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Check hedged requests with scripted workers (no API keys needed).
+A backup request is only sent while the primary has produced no token;
+a primary that answers in time but streams past the hedge delay must not
+start one, or a second provider is paid for a hedge that never happened.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+
+from enhanced_orchestrator import (
+    AIWorker, EnhancedOrchestrator, LoadBalancer, Task, TaskPriority, WorkerType,
+)
+
+HEDGE_DELAY = 0.5
+
+
+class ScriptedWorker(AIWorker):
+    """Streams `chunks` after `first_token` seconds, `gap` seconds apart"""
+    PROVIDER = "scripted"
+
+    def __init__(self, worker_type: WorkerType, first_token: float, chunks: int = 10, gap: float = 0.1):
+        self.first_token = first_token
+        self.chunks = [f"line {i}\n" for i in range(chunks)]
+        self.gap = gap
+        self.calls = 0
+        super().__init__(worker_type)
+
+    def _setup(self):
+        self.model = "scripted"
+
+    def _execute(self, prompt, system_prompt=None, max_tokens=None, usage=None):
+        raise NotImplementedError("scripted workers only stream")
+
+    def _execute_stream(self, prompt, system_prompt=None, usage=None, max_tokens=None):
+        self.calls += 1
+        start = time.time()
+        time.sleep(self.first_token)
+        usage.time_to_first_token = time.time() - start
+        for chunk in self.chunks:
+            yield chunk
+            time.sleep(self.gap)
+        usage.tokens = len(self.chunks)
+
+    async def _execute_stream_async(self, prompt, system_prompt=None, usage=None, max_tokens=None):
+        self.calls += 1
+        start = time.time()
+        await asyncio.sleep(self.first_token)
+        usage.time_to_first_token = time.time() - start
+        for chunk in self.chunks:
+            yield chunk
+            await asyncio.sleep(self.gap)
+        usage.tokens = len(self.chunks)
+
+
+def setup(output_dir: str, primary_ttft: float, backup_ttft: float):
+    """Orchestrator with only the two scripted workers"""
+    primary, backup = WorkerType.GROQ_LLAMA70B, WorkerType.GEMINI_FLASH
+    orchestrator = EnhancedOrchestrator(output_dir, use_cache=False, hedge=True)
+    orchestrator.HEDGE_DEFAULT_DELAY = HEDGE_DELAY
+    orchestrator.workers = {
+        primary: ScriptedWorker(primary, primary_ttft),
+        backup: ScriptedWorker(backup, backup_ttft),
+    }
+    orchestrator.load_balancer = LoadBalancer(orchestrator.workers)
+    task = Task(id="HEDGE_001", title="Hedge check", description="Scripted reply",
+                worker=primary, priority=TaskPriority.CRITICAL)
+    return orchestrator, task, primary, backup
+
+
+def run(orchestrator, task, primary, backup, use_async: bool):
+    if use_async:
+        return asyncio.run(orchestrator._execute_hedged_async(task, primary, backup, "prompt"))
+    return orchestrator._execute_hedged(task, primary, backup, "prompt")
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for use_async in (False, True):
+            mode = "async" if use_async else "sync"
+
+            print(f"\nPrimary answers before the hedge delay, streams past it ({mode})")
+            orchestrator, task, primary, backup = setup(tmp, primary_ttft=0.1, backup_ttft=0.1)
+            winner, text, _ = run(orchestrator, task, primary, backup, use_async)
+            results.append(check("primary wins with its whole reply",
+                                 winner == primary and text.count("\n") == 10))
+            results.append(check("backup is never called", orchestrator.workers[backup].calls == 0))
+            results.append(check("no hedge counted", orchestrator.hedge_stats["hedged"] == 0))
+            results.append(check("backup has no task assigned",
+                                 orchestrator.load_balancer.task_counts[backup] == 0))
+
+            print(f"\nPrimary silent past the hedge delay ({mode})")
+            orchestrator, task, primary, backup = setup(tmp, primary_ttft=2.0, backup_ttft=0.1)
+            winner, text, _ = run(orchestrator, task, primary, backup, use_async)
+            results.append(check("backup is called and wins",
+                                 winner == backup and orchestrator.workers[backup].calls == 1))
+            results.append(check("one hedge counted, won by the backup",
+                                 orchestrator.hedge_stats == {"hedged": 1, "backup_won": 1}))
+            results.append(check("backup's task is released",
+                                 orchestrator.load_balancer.task_counts[backup] == 0))
+
+    print()
+    if all(results):
+        print("All checks passed")
+    else:
+        print(f"{results.count(False)} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
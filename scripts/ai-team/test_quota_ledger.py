@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Check what the daily quota ledger records (no API keys needed).
+Only requests that were actually sent are written to it. A request the
+local rate limiter refuses, e.g. because the daily budget is used up,
+must not count, or every later run believes the provider is further into
+its quota than it is. Nor may it keep the circuit breaker's half-open
+probe, which would block the worker after quota is back.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+from enhanced_orchestrator import (
+    AIWorker, CircuitState, DailyQuotaExhaustedError, RateLimiter, WorkerType,
+)
+from quota_ledger import QuotaLedger
+
+
+class EchoWorker(AIWorker):
+    """Answers every prompt with itself; counts the requests that reach it"""
+    PROVIDER = "echo"
+
+    def __init__(self, worker_type: WorkerType):
+        self.calls = 0
+        super().__init__(worker_type)
+
+    def _setup(self):
+        self.model = "echo"
+
+    def _execute(self, prompt, system_prompt=None, max_tokens=None, usage=None):
+        self.calls += 1
+        return prompt, 10
+
+
+def refused(run) -> bool:
+    """True if `run` fails with DailyQuotaExhaustedError"""
+    try:
+        run()
+    except DailyQuotaExhaustedError:
+        return True
+    return False
+
+
+def half_open(worker: AIWorker):
+    """Circuit whose open period has passed, so the next request is the probe"""
+    worker.breaker.state = CircuitState.OPEN
+    worker.breaker.open_until = 0
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = EchoWorker(WorkerType.GROQ_LLAMA70B)
+        worker.ledger = QuotaLedger(os.path.join(tmp, "quota.sqlite3"))
+        worker.rate_limiter = RateLimiter("echo/echo#1", {"rpd": 1})
+        used = lambda: worker.ledger.usage(worker.PROVIDER, worker.key_id, worker.model)[0]
+
+        print("Daily budget of one request\n")
+        results.append(check("first stream is sent and recorded",
+                             "".join(worker.execute_stream("hello")) == "hello" and used() == 1))
+
+        stream = lambda: "".join(worker.execute_stream("again"))
+        results.append(check("second stream is refused", refused(stream)))
+        results.append(check("refused stream is not recorded", used() == 1))
+
+        async def stream_async():
+            return "".join([chunk async for chunk in worker.execute_stream_async("again")])
+        results.append(check("async stream is refused", refused(lambda: asyncio.run(stream_async()))))
+        results.append(check("refused async stream is not recorded", used() == 1))
+
+        results.append(check("request is refused", refused(lambda: worker.execute("again"))))
+        results.append(check("refused request is not recorded", used() == 1))
+        results.append(check("only the first request reached the provider", worker.calls == 1))
+
+        print("\nRefused while the circuit is half-open\n")
+        for name, run in (("stream", stream), ("async stream", lambda: asyncio.run(stream_async())),
+                          ("request", lambda: worker.execute("again"))):
+            half_open(worker)
+            results.append(check(f"refused {name} gives back the probe",
+                                 refused(run) and not worker.breaker.is_open()))
+
+    print()
+    if all(results):
+        print("All checks passed")
+    else:
+        print(f"{results.count(False)} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Check that streamed sanitizing matches sanitizing the whole text.
+Context segments are sanitized whole when pre-warmed (parallel/async runs)
+and streamed in chunks otherwise; both must give the same prompt text, or
+prompts and response cache keys differ between runs.
+"""
+
+import os
+import sys
+import tempfile
+
+from enhanced_orchestrator import DataSanitizer, SanitizedSegmentCache
+from file_cache import get_file_cache
+from orchestrator import DataSanitizer as LegacySanitizer
+
+
+def sample_text() -> str:
+    """A few windows long, with values near the start, past 30 KB and on chunk edges"""
+    filler = "const value = computeSomething(input);  // ordinary code line\n"
+    parts = ["// call 555-123-4567 for access\n"]
+    parts += [filler] * 500                                  # ~31 KB
+    parts += ["const admin = 'ops@example.com';\n", "const host = '10.0.0.12';\n"]
+    parts += [filler] * 2000                                 # well past one 64 KB chunk
+    parts += ["// again: 555-123-4567, ops@example.com, other@example.org\n"]
+    parts += ["password = 'hunter2-secret'\n", "SGAQualityAssurance on sgagroupcomau\n"]
+    return "".join(parts)
+
+
+def chunked(text: str, size: int):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def check(name: str, expected: str, actual: str) -> bool:
+    ok = expected == actual
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def main():
+    text = sample_text()
+    results = []
+    print(f"Sanitizing {len(text):,} characters\n")
+
+    for level in ("standard", "high"):
+        whole = DataSanitizer().sanitize(text, level)
+        for size in (1000, 4096, 64 * 1024):
+            parts = []
+            DataSanitizer().sanitize_stream(chunked(text, size), parts.append, level)
+            results.append(check(f"sanitize_stream == sanitize ({level}, {size}-char chunks)",
+                                 whole, "".join(parts)))
+
+        legacy = LegacySanitizer.sanitize(text, level)
+        parts = []
+        LegacySanitizer.sanitize_stream(chunked(text, 1000), parts.append, level)
+        results.append(check(f"legacy sanitize_stream == sanitize ({level})", legacy, "".join(parts)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sample.ts")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        read = lambda p: get_file_cache().iter_chunks(p, 64 * 1024)
+
+        warmed = SanitizedSegmentCache()
+        warmed.warm([(path, "sample.ts")], read)
+        streamed = SanitizedSegmentCache()
+        results.append(check(
+            "segment cache: warm() == get()",
+            warmed.get(path, "sample.ts", read, DataSanitizer()),
+            streamed.get(path, "sample.ts", read, DataSanitizer()),
+        ))
+
+    print()
+    if all(results):
+        print("All checks passed")
+    else:
+        print(f"{results.count(False)} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+SGA AI Team - Token Accounting
+==============================
+Token counts that quota planning can rely on. Whenever a response carries the
+provider's own usage metadata (Gemini usage_metadata, OpenAI-compatible usage,
+Groq's x_groq.usage on the last stream chunk) that is what gets recorded;
+otherwise, and before a request is sent, tokens come from an offline estimator.
+
+The estimator counts word, number, punctuation and whitespace pieces, which
+follows BPE tokenizers far more closely on code than splitting on whitespace,
+and scales the count by a per-model calibration factor. Each response with
+real usage moves that model's factor towards actual / estimated prompt tokens
+(an EWMA); with a store attached the factors are kept in SQLite, so later runs
+start calibrated. Piece counts of large texts - mostly context files - are
+cached by content hash.
+
+Usage:
+    from token_accounting import get_token_accountant, usage_from_response
+
+    accountant = get_token_accountant()
+    planned = accountant.count_prompt(prompt, system_prompt, model)
+    usage = usage_from_response(response)
+    if usage is not None:
+        accountant.calibrate(model, prompt, system_prompt, usage.prompt_tokens)
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+MESSAGE_OVERHEAD = 4            # Role and separator tokens per chat message
+HASH_MIN_CHARS = 2048           # Shorter texts are cheaper to count than to hash
+MAX_CACHED_COUNTS = 4096
+CALIBRATION_ALPHA = 0.2         # Weight of the newest sample in a model's factor
+CALIBRATION_BOUNDS = (0.5, 2.5)  # Ignore samples this far off (truncated or odd prompts)
+
+_PIECE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d\x80-\U0010ffff]+|[\x80-\U0010ffff]|\s+")
+
+
+@dataclass
+class TokenUsage:
+    """Token usage of one response"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    exact: bool = False     # True if reported by the provider, False if estimated
+
+
+def _field(source: Any, name: str) -> Any:
+    if source is None:
+        return None
+    if isinstance(source, dict):
+        return source.get(name)
+    return getattr(source, name, None)
+
+
+def usage_from_response(response: Any) -> Optional[TokenUsage]:
+    """
+    Provider-reported usage of a response or stream chunk, or None if it has
+    none: Gemini usage_metadata, OpenAI-compatible usage, or Groq's x_groq.usage.
+    """
+    metadata = _field(response, "usage_metadata")
+    if metadata is not None:
+        prompt = _field(metadata, "prompt_token_count") or 0
+        completion = _field(metadata, "candidates_token_count") or 0
+        total = _field(metadata, "total_token_count") or prompt + completion
+        if total:
+            return TokenUsage(prompt, completion, total, exact=True)
+
+    usage = _field(response, "usage") or _field(_field(response, "x_groq"), "usage")
+    if usage is not None:
+        prompt = _field(usage, "prompt_tokens") or 0
+        completion = _field(usage, "completion_tokens") or 0
+        total = _field(usage, "total_tokens") or prompt + completion
+        if total:
+            return TokenUsage(prompt, completion, total, exact=True)
+    return None
+
+
+def count_pieces(text: str) -> int:
+    """
+    Uncalibrated token estimate: one token per short word, number group or
+    punctuation pair, more for long identifiers, one per non-ASCII character
+    and per line break or indentation run. Single spaces merge into the word
+    that follows them.
+    """
+    tokens = 0
+    for piece in _PIECE.findall(text):
+        first = piece[0]
+        if first.isalpha() and first.isascii():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif first.isdigit():
+            tokens += (len(piece) + 2) // 3
+        elif first.isspace():
+            tokens += 0 if piece == " " else 1
+        elif not first.isascii():
+            tokens += 1
+        else:
+            tokens += (len(piece) + 1) // 2
+    return tokens
+
+
+def _model_family(model: str) -> str:
+    """Calibration key: the model name without provider prefix or :free/:beta suffix"""
+    model = (model or "").lower()
+    return model.rsplit("/", 1)[-1].split(":", 1)[0]
+
+
+class TokenAccountant:
+    """Calibrated offline token counts, with piece counts cached by content hash"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path: Optional[str] = None
+        self.factors: Dict[str, float] = {}
+        self.samples: Dict[str, int] = {}
+        self.exact_responses = 0
+        self.estimated_responses = 0
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self.attach_store(path)
+
+    # ------------------------------------------------------------------
+    # Calibration store
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def attach_store(self, path: str):
+        """Load calibration factors from (and save them to) a SQLite database"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS calibration (
+                    model TEXT PRIMARY KEY,
+                    factor REAL NOT NULL,
+                    samples INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            rows = conn.execute("SELECT model, factor, samples FROM calibration").fetchall()
+        with self._lock:
+            for model, factor, samples in rows:
+                # Samples taken in this process so far win over the stored ones
+                if model not in self.factors:
+                    self.factors[model] = factor
+                    self.samples[model] = samples
+
+    def _save(self, model: str, factor: float, samples: int):
+        if not self.path:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO calibration (model, factor, samples, updated_at) VALUES (?, ?, ?, ?)",
+                (model, factor, samples, time.time()),
+            )
+
+    # ------------------------------------------------------------------
+    # Counting
+    # ------------------------------------------------------------------
+
+    def pieces(self, text: str) -> int:
+        """count_pieces(text), cached by content hash for large texts"""
+        if len(text) < HASH_MIN_CHARS:
+            return count_pieces(text)
+        digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+        with self._lock:
+            count = self._counts.get(digest)
+            if count is not None:
+                self._counts.move_to_end(digest)
+                return count
+        count = count_pieces(text)
+        with self._lock:
+            self._counts[digest] = count
+            while len(self._counts) > MAX_CACHED_COUNTS:
+                self._counts.popitem(last=False)
+        return count
+
+    def factor(self, model: str) -> float:
+        return self.factors.get(_model_family(model), 1.0)
+
+    def count(self, text: str, model: str = "") -> int:
+        """Estimated tokens of `text` for `model`"""
+        if not text:
+            return 0
+        return max(1, round(self.pieces(text) * self.factor(model)))
+
+    def count_prompt(self, prompt: str, system_prompt: Optional[str] = None, model: str = "") -> int:
+        """Estimated prompt tokens of a request (system and user message) before it is sent"""
+        messages = 2 if system_prompt else 1
+        return (self.count(prompt, model) + self.count(system_prompt or "", model)
+                + MESSAGE_OVERHEAD * messages)
+
+    def calibrate(self, model: str, prompt: str, system_prompt: Optional[str], actual_prompt_tokens: int):
+        """Fold a provider-reported prompt token count into the model's factor"""
+        messages = 2 if system_prompt else 1
+        pieces = self.pieces(prompt) + self.pieces(system_prompt or "")
+        actual = actual_prompt_tokens - MESSAGE_OVERHEAD * messages
+        if pieces <= 0 or actual <= 0:
+            return
+        ratio = actual / pieces
+        if not CALIBRATION_BOUNDS[0] <= ratio <= CALIBRATION_BOUNDS[1]:
+            return
+        key = _model_family(model)
+        with self._lock:
+            samples = self.samples.get(key, 0)
+            factor = ratio if samples == 0 else (
+                CALIBRATION_ALPHA * ratio + (1 - CALIBRATION_ALPHA) * self.factors[key]
+            )
+            self.factors[key] = factor
+            self.samples[key] = samples + 1
+        self._save(key, factor, samples + 1)
+
+    def account(self, model: str, prompt: str, system_prompt: Optional[str], completion: str,
+                reported: Optional[TokenUsage], completion_tokens: Optional[int] = None) -> TokenUsage:
+        """
+        Usage to record for a finished response: the provider's numbers if it
+        reported any (calibrating the estimator with them), else estimates.
+        `completion_tokens` is an estimate already made, e.g. chunk by chunk.
+        """
+        if reported is not None and reported.exact:
+            self.exact_responses += 1
+            if reported.prompt_tokens:
+                self.calibrate(model, prompt, system_prompt, reported.prompt_tokens)
+            return reported
+        self.estimated_responses += 1
+        prompt_tokens = self.count_prompt(prompt, system_prompt, model)
+        if completion_tokens is None:
+            completion_tokens = self.count(completion, model)
+        return TokenUsage(prompt_tokens, completion_tokens, prompt_tokens + completion_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Responses counted exactly vs estimated, and calibration factors per model"""
+        with self._lock:
+            return {
+                "exact": self.exact_responses,
+                "estimated": self.estimated_responses,
+                "factors": {model: round(f, 3) for model, f in self.factors.items()},
+            }
+
+
+_token_accountant = TokenAccountant()
+
+
+def get_token_accountant() -> TokenAccountant:
+    """The process-wide token accountant"""
+    return _token_accountant